@@ -21,3 +21,7 @@
 # SOFTWARE.
 
 from rouge.metrics import *
+from rouge.vocabulary import *
+from rouge.corpus import *
+from rouge.accumulator import *
+from rouge.cache import *
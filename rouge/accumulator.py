@@ -0,0 +1,262 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Mergeable accumulation of the sufficient statistics of sentence pairs, so that a corpus
+can be scored in shards, on any number of machines, and reduced to exact system scores.
+"""
+
+import array
+import base64
+import json
+import math
+import sys
+import zlib
+
+from rouge.metrics import RougeScore, RougeStats
+from rouge.metrics import score_from_stats
+
+__all__ = [
+    "RougeAccumulator",
+    "save_accumulators",
+    "load_accumulators",
+    "merge_accumulator_files",
+]
+
+# Bumped when the layout of the files changes.
+FORMAT_VERSION = 1
+
+_FIELDS = ("hits", "ref_total", "cand_total")
+
+
+def _encode_values(values):
+    """
+    Encode an array of doubles as compressed little-endian bytes in base64.
+
+    >>> _decode_values(_encode_values(array.array('d', [1.0, 2.5]))).tolist()
+    [1.0, 2.5]
+
+    :param values: array.array('d').
+    :return: str.
+    """
+    if sys.byteorder == "big":
+        values = array.array("d", values)
+        values.byteswap()
+    return base64.b64encode(zlib.compress(values.tobytes())).decode("ascii")
+
+
+def _decode_values(text):
+    """
+    Decode an array encoded by _encode_values().
+
+    :param text: str.
+    :return: array.array('d').
+    """
+    values = array.array("d")
+    values.frombytes(zlib.decompress(base64.b64decode(text)))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class RougeAccumulator:
+    """
+    Accumulate the RougeStats of sentence pairs of a metric, as returned by the *_stats
+    functions of rouge.metrics, and reduce them to system scores.
+
+    Accumulators of the shards of a corpus are merged into the accumulator of the corpus.
+    The stats of every pair are kept, so the results do not depend on how the corpus
+    was sharded, and the macro average can be computed for any alpha.
+
+    >>> accumulator = RougeAccumulator()
+    >>> accumulator.update([RougeStats(1, 2, 3), RougeStats(2, 2, 4)])
+    >>> shard = RougeAccumulator()
+    >>> shard.add(RougeStats(0, 4, 1))
+    >>> len(accumulator.merge(shard))
+    3
+    >>> accumulator.micro_average().recall
+    0.375
+    """
+
+    def __init__(self):
+        self.weight = None
+        self._columns = tuple(array.array("d") for _ in _FIELDS)
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    def _check_weight(self, weight):
+        if not len(self):
+            self.weight = weight
+        elif weight != self.weight:
+            raise ValueError("stats must have the same weight")
+
+    def add(self, stats):
+        """
+        Add the stats of a pair.
+
+        :param stats: RougeStats.
+        :raise ValueError: If the weight of stats is not that of the accumulator.
+        """
+        self._check_weight(stats.weight)
+        for column, value in zip(self._columns, stats):
+            column.append(value)
+
+    def update(self, stats):
+        """
+        Add the stats of many pairs.
+
+        :param stats: an iterable of RougeStats.
+        """
+        for pair_stats in stats:
+            self.add(pair_stats)
+
+    def merge(self, other):
+        """
+        Add the stats of another accumulator, after those of this one.
+
+        :param other: RougeAccumulator.
+        :return: this accumulator.
+        :raise ValueError: If the weights of the accumulators differ.
+        """
+        if len(other):
+            self._check_weight(other.weight)
+            for column, other_column in zip(self._columns, other._columns):
+                column.extend(other_column)
+        return self
+
+    def stats(self):
+        """
+        Return the stats of the pairs, in the order they were added.
+
+        :return: a list of RougeStats.
+        """
+        return [RougeStats(*values, self.weight) for values in zip(*self._columns)]
+
+    def totals(self):
+        """
+        Return the stats of the pairs pooled, summed exactly.
+
+        :return: RougeStats.
+        """
+        return RougeStats(*(math.fsum(column) for column in self._columns), self.weight)
+
+    def micro_average(self, alpha=None):
+        """
+        Compute the score of the pooled stats.
+
+        :param alpha: weight on the recall (default 0.5).
+        :return: RougeScore.
+        """
+        return score_from_stats(self.totals(), alpha)
+
+    def macro_average(self, alpha=None):
+        """
+        Compute the average of the scores of the pairs, summed exactly.
+
+        :param alpha: weight on the recall (default 0.5).
+        :return: RougeScore.
+        """
+        if not len(self):
+            return RougeScore(0.0, 0.0, 0.0)
+        scores = [score_from_stats(stats, alpha) for stats in self.stats()]
+        return RougeScore(*(math.fsum(values) / len(scores) for values in zip(*scores)))
+
+    def to_dict(self):
+        """
+        Serialize the accumulator into a dict that can be dumped to json.
+
+        :return: dict.
+        """
+        data = {"weight": self.weight, "count": len(self)}
+        for name, column in zip(_FIELDS, self._columns):
+            data[name] = _encode_values(column)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Make an accumulator from the result of to_dict().
+
+        :param data: dict.
+        :return: RougeAccumulator.
+        :raise ValueError: If the data is inconsistent.
+        """
+        accumulator = cls()
+        accumulator.weight = data["weight"]
+        accumulator._columns = tuple(_decode_values(data[name]) for name in _FIELDS)
+        if any(len(column) != data["count"] for column in accumulator._columns):
+            raise ValueError("corrupted accumulator")
+        return accumulator
+
+
+def save_accumulators(path, accumulators):
+    """
+    Save accumulators of several metrics into a json file.
+
+    :param path: the file to write.
+    :param accumulators: a dict of RougeAccumulator by metric.
+    """
+    data = {
+        "version": FORMAT_VERSION,
+        "accumulators": {
+            name: accumulator.to_dict() for name, accumulator in accumulators.items()
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def load_accumulators(path):
+    """
+    Load the accumulators saved by save_accumulators().
+
+    :param path: the file to read.
+    :return: a dict of RougeAccumulator by metric.
+    :raise ValueError: If the file has another format version.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(
+            "unsupported accumulator format %r in %s" % (data.get("version"), path)
+        )
+    return {
+        name: RougeAccumulator.from_dict(accumulator)
+        for name, accumulator in data["accumulators"].items()
+    }
+
+
+def merge_accumulator_files(paths):
+    """
+    Load and merge the accumulators of shards, in the order of paths.
+    A metric missing from some shards is merged from the others.
+
+    :param paths: an iterable of files written by save_accumulators().
+    :return: a dict of RougeAccumulator by metric.
+    """
+    merged = {}
+    for path in paths:
+        for name, accumulator in load_accumulators(path).items():
+            merged.setdefault(name, RougeAccumulator()).merge(accumulator)
+    return merged
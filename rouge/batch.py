@@ -0,0 +1,509 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Vectorized ROUGE over a whole corpus of sentence pairs using numpy.
+"""
+
+import itertools
+
+import numpy as np
+
+from rouge.metrics import RougeScore, RougeStats
+from rouge.metrics import score_from_stats
+from rouge.metrics import _is_interned
+from rouge.vocabulary import Vocabulary
+
+# Keys are int64. Leave one bit for tagging the side of a key.
+_MAX_KEY = 1 << 62
+
+__all__ = [
+    "rouge_n_batch",
+    "rouge_n_batch_stats",
+    "rouge_l_batch",
+    "rouge_l_batch_stats",
+    "pad_sentences",
+    "scores_from_stats",
+    "macro_average",
+    "micro_average",
+]
+
+
+def _encode_corpus(sentences, vocabulary):
+    """
+    Concatenate the token ids of sentences into one flat array.
+
+    :param sentences: a list of sentences, either interned or not.
+    :param vocabulary: the Vocabulary to intern plain tokens.
+    :return: a 2-tuple, the flat int64 array of ids and the int64 array of lengths.
+    """
+    lengths = np.fromiter(map(len, sentences), dtype=np.int64, count=len(sentences))
+    if sentences and all(map(_is_interned, sentences)):
+        typecodes = {sentence.typecode for sentence in sentences}
+        if len(typecodes) == 1:
+            buffer = b"".join(sentence.tobytes() for sentence in sentences)
+            ids = np.frombuffer(buffer, dtype=np.dtype(typecodes.pop()))
+            return ids.astype(np.int64), lengths
+    tokens = itertools.chain.from_iterable(sentences)
+    if not all(map(_is_interned, sentences)):
+        tokens = map(vocabulary.intern, tokens)
+    ids = np.fromiter(tokens, dtype=np.int64, count=int(lengths.sum()))
+    return ids, lengths
+
+
+def _dense_ids(keys):
+    """
+    Map each of keys to a dense id. Equal keys get the same id.
+
+    >>> _dense_ids(np.array([9, 2, 9]))
+    (array([1, 0, 1]), 2)
+
+    :param keys: an int64 array.
+    :return: a 2-tuple, the int64 array of ids and the number of distinct ids.
+    """
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return inverse.reshape(-1), len(unique)
+
+
+def _combine(first, first_size, second, second_size):
+    """
+    Map each pair (first[i], second[i]) to an int key, equal pairs to equal keys,
+    where first[i] is in [0, first_size) and second[i] is in [0, second_size).
+
+    The key is first[i] * second_size + second[i] if that fits in int64.
+    Otherwise first, and then second if still needed, is made dense so that it does.
+
+    >>> _combine(np.array([0, 1, 0]), 2, np.array([5, 5, 5]), 6)
+    (array([ 5, 11,  5]), 12)
+
+    :param first: an int64 array.
+    :param first_size: int.
+    :param second: an int64 array of the same length.
+    :param second_size: int.
+    :return: a 2-tuple, the int64 array of keys and the upper bound of them.
+    """
+    if first_size * second_size >= _MAX_KEY:
+        first, first_size = _dense_ids(first)
+    if first_size * second_size >= _MAX_KEY:
+        second, second_size = _dense_ids(second)
+    return first * second_size + second, first_size * second_size
+
+
+def _ngram_keys(ids, vocab_size, n):
+    """
+    Assign each n-gram starting in ids an int key. Equal n-grams get the same key.
+    The n-grams may cross sentence boundaries and must be masked by the caller.
+
+    >>> _ngram_keys(np.array([0, 1, 0, 1]), 2, 2)
+    (array([1, 2, 1]), 4)
+
+    :param ids: an int64 array of token ids in [0, vocab_size).
+    :param vocab_size: int.
+    :param n: N for ngrams.
+    :return: a 2-tuple, the int64 array of len(ids) - n + 1 keys and the upper bound of them.
+    """
+    keys, size = ids, vocab_size
+    for k in range(1, n):
+        keys, size = _combine(keys[:-1], size, ids[k:], vocab_size)
+    return keys, size
+
+
+def _divide_or_zero(numerator, denominator):
+    """
+    Vectorized version of rouge.metrics._divide_or_zero().
+
+    >>> _divide_or_zero(np.array([1, 1]), np.array([2, 0]))
+    array([0.5, 0. ])
+
+    :param numerator: an array.
+    :param denominator: an array.
+    :return: a float64 array.
+    """
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    result = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
+
+
+def _f1_measure(numerator, r_denominator, p_denominator, alpha=None):
+    """
+    Vectorized version of rouge.metrics._f1_measure().
+    The results are bitwise equal to the scalar version.
+
+    >>> _f1_measure(np.array([1, 1]), np.array([2, 0]), np.array([3, 1]), 0.5)
+    RougeScore(recall=array([0.5, 0. ]), precision=array([0.33333333, 1.        ]), f1_measure=array([0.4, 0. ]))
+
+    :param numerator: an array.
+    :param r_denominator: an array.
+    :param p_denominator: an array.
+    :param alpha: the weighting factor.
+    :return: RougeScore of arrays.
+    :raise ValueError: If alpha is not between [0, 1].
+    """
+    if alpha is None:
+        alpha = 0.5
+    if not 0.0 <= alpha <= 1.0:
+        raise ValueError("alpha must be between [0, 1]")
+    recall = _divide_or_zero(numerator, r_denominator)
+    precision = _divide_or_zero(numerator, p_denominator)
+    f1 = _divide_or_zero(
+        precision * recall, (1 - alpha) * precision + alpha * recall
+    )
+    return RougeScore(recall, precision, f1)
+
+
+def rouge_n_batch(summaries, references, n, alpha=None, vocabulary=None):
+    """
+    Calculate sentence level ROUGE-N for every pair of summaries and references at once.
+
+    The n-grams of the whole corpus are packed into int64 keys, and the clipped counts of
+    all pairs are found by sorting (pair, n-gram) keys once, with no Python loop per pair.
+    The scores are the same as calling rouge_n_sentence_level() on each pair.
+
+    >>> summaries = ['the gunman police killed'.split(), 'a b'.split()]
+    >>> references = ['the police killed the gunman'.split(), 'a'.split()]
+    >>> rouge_n_batch(summaries, references, 1).recall
+    array([0.8, 1. ])
+
+    :param summaries: a list of sentences.
+    :param references: a list of sentences.
+    :param n: n for ngram.
+    :param alpha: weight on the recall (default 0.5).
+    :param vocabulary: the Vocabulary to intern tokens. Not needed if the sentences
+    are already interned. Default is a new one.
+    :return: RougeScore of float64 arrays, recall, precision and f1 measure.
+    """
+    stats = rouge_n_batch_stats(summaries, references, n, vocabulary)
+    return scores_from_stats(stats, alpha)
+
+
+def rouge_n_batch_stats(summaries, references, n, vocabulary=None):
+    """
+    Like rouge_n_batch(), but return the sufficient statistics of each pair.
+
+    :param summaries: a list of sentences.
+    :param references: a list of sentences.
+    :param n: n for ngram.
+    :param vocabulary: the Vocabulary to intern tokens. Not needed if the sentences
+    are already interned. Default is a new one.
+    :return: RougeStats of arrays.
+    """
+    if len(summaries) != len(references):
+        raise ValueError("summaries and references must have the same length")
+    if vocabulary is None:
+        vocabulary = Vocabulary()
+    num_pairs = len(summaries)
+    summary_ids, summary_lengths = _encode_corpus(summaries, vocabulary)
+    reference_ids, reference_lengths = _encode_corpus(references, vocabulary)
+    ids = np.concatenate([summary_ids, reference_ids])
+    lengths = np.concatenate([summary_lengths, reference_lengths])
+    if len(ids) and ids.min() < 0:
+        raise ValueError("token ids must be non-negative")
+
+    # Give both sides the same n-gram keys, then keep the n-grams inside a sentence.
+    gram_keys, gram_size = _ngram_keys(ids, int(ids.max()) + 1 if len(ids) else 0, n)
+    ends = np.cumsum(lengths)
+    starts = np.arange(len(gram_keys))
+    positions = np.flatnonzero(starts + n <= np.repeat(ends, lengths)[: len(gram_keys)])
+    gram_keys = gram_keys[positions]
+    if num_pairs * gram_size >= _MAX_KEY:
+        gram_keys, gram_size = _dense_ids(gram_keys)
+    pair_index = np.repeat(np.tile(np.arange(num_pairs), 2), lengths)[positions]
+    keys = pair_index * gram_size + gram_keys
+
+    # Count each distinct (pair, n-gram, side) with one sort. The runs of a (pair, n-gram)
+    # found on both sides are adjacent, the summary one first. Clip them and sum by pair.
+    keys = np.sort(keys * 2 + (positions >= len(summary_ids)))
+    run_starts = np.flatnonzero(np.diff(keys, prepend=-1))
+    run_counts = np.diff(np.append(run_starts, len(keys)))
+    run_keys = keys[run_starts] >> 1
+    both = np.flatnonzero(run_keys[1:] == run_keys[:-1])
+    hits = np.bincount(
+        run_keys[both] // gram_size,
+        weights=np.minimum(run_counts[both], run_counts[both + 1]),
+        minlength=num_pairs,
+    )
+
+    recall_denominator = np.maximum(reference_lengths - n + 1, 0)
+    precision_denominator = np.maximum(summary_lengths - n + 1, 0)
+    return RougeStats(hits.astype(np.int64), recall_denominator, precision_denominator)
+
+
+def pad_sentences(sentences, vocabulary=None, pad_id=-1):
+    """
+    Turn a list of sentences into a padded matrix of token ids, as accepted by rouge_l_batch().
+    Summaries and references must be padded with the same vocabulary.
+
+    >>> ids, lengths = pad_sentences(['a b'.split(), 'b'.split()])
+    >>> ids
+    array([[ 0,  1],
+           [ 1, -1]])
+    >>> lengths
+    array([2, 1])
+
+    :param sentences: a list of sentences, either interned or not.
+    :param vocabulary: the Vocabulary to intern tokens. Default is a new one.
+    :param pad_id: int, the id to pad with.
+    :return: a 2-tuple, the int64 matrix of ids and the int64 array of lengths.
+    """
+    if vocabulary is None:
+        vocabulary = Vocabulary()
+    ids, lengths = _encode_corpus(sentences, vocabulary)
+    width = int(lengths.max()) if len(lengths) else 0
+    matrix = np.full((len(sentences), width), pad_id, dtype=np.int64)
+    matrix[np.arange(width) < lengths[:, None]] = ids
+    return matrix, lengths
+
+
+def _match_masks_batch(x, x_lengths, y, y_lengths):
+    """
+    Compute the bit-parallel match masks of each token of x against y, row by row.
+    Bit j of word k of masks[b, i] is set iff x[b, i] == y[b, 64 * k + j].
+    Padding never matches.
+
+    :param x: a matrix of ids, one sequence per row.
+    :param x_lengths: an array of the lengths of the rows of x.
+    :param y: a matrix of ids, one sequence per row.
+    :param y_lengths: an array of the lengths of the rows of y.
+    :return: an uint64 array of shape (batch size, x.shape[1], number of words).
+    """
+    batch_size, n = x.shape
+    num_words = max(1, -(-y.shape[1] // 64))
+    masks = np.zeros((batch_size, n, num_words), dtype=np.uint64)
+
+    y_rows, y_columns = np.nonzero(np.arange(y.shape[1]) < y_lengths[:, None])
+    if not len(y_rows):
+        return masks
+    tokens, y_tokens = np.unique(y[y_rows, y_columns], return_inverse=True)
+    # Both factors are bounded by the number of tokens in y, so the key cannot overflow.
+    keys, slots = np.unique(y_rows * len(tokens) + y_tokens, return_inverse=True)
+    table = np.zeros((len(keys), num_words), dtype=np.uint64)
+    bits = np.left_shift(np.uint64(1), (y_columns % 64).astype(np.uint64))
+    np.bitwise_or.at(table, (slots, y_columns // 64), bits)
+
+    x_rows, x_columns = np.nonzero(np.arange(n) < x_lengths[:, None])
+    x_values = x[x_rows, x_columns]
+    x_tokens = np.searchsorted(tokens, x_values).clip(max=len(tokens) - 1)
+    found = tokens[x_tokens] == x_values
+    x_rows, x_columns, x_tokens = x_rows[found], x_columns[found], x_tokens[found]
+    x_keys = x_rows * len(tokens) + x_tokens
+    positions = np.searchsorted(keys, x_keys).clip(max=len(keys) - 1)
+    found = keys[positions] == x_keys
+    masks[x_rows[found], x_columns[found]] = table[positions[found]]
+    return masks
+
+
+def _lcs_length_batch(x, x_lengths, y, y_lengths):
+    """
+    Compute the LCS length of each row of x and y at once.
+
+    This is the bit-parallel algorithm of rouge.metrics._lcs_length_from_masks(),
+    vectorized over the rows. The big int of a row is split into 64-bit words,
+    and the addition carries from word to word.
+
+    >>> x = np.array([[0, 1, 2, 3], [0, 0, -1, -1]])
+    >>> y = np.array([[2, 3, 1], [0, -1, -1]])
+    >>> _lcs_length_batch(x, np.array([4, 2]), y, np.array([3, 1]))
+    array([2, 1])
+
+    :param x: a matrix of ids, one sequence per row.
+    :param x_lengths: an array of the lengths of the rows of x.
+    :param y: a matrix of ids, one sequence per row.
+    :param y_lengths: an array of the lengths of the rows of y.
+    :return: an int64 array.
+    """
+    lcs = np.zeros(len(x), dtype=np.int64)
+    # Rows are grouped by the number of words their big int needs, and sorted by
+    # decreasing length of x so that the rows still running are a prefix.
+    words = np.maximum(1, -(-y_lengths // 64))
+    for num_words in np.unique(words):
+        rows = np.nonzero(words == num_words)[0]
+        rows = rows[np.argsort(-x_lengths[rows], kind="stable")]
+        lcs[rows] = _lcs_length_rows(x[rows], x_lengths[rows], y[rows, :num_words * 64], y_lengths[rows])
+    return lcs
+
+
+def _lcs_length_rows(x, x_lengths, y, y_lengths):
+    """
+    Compute the LCS length of each row of x and y at once, where x_lengths is decreasing.
+
+    :param x: a matrix of ids, one sequence per row.
+    :param x_lengths: a decreasing array of the lengths of the rows of x.
+    :param y: a matrix of ids, one sequence per row.
+    :param y_lengths: an array of the lengths of the rows of y.
+    :return: an int64 array.
+    """
+    masks = _match_masks_batch(x, x_lengths, y, y_lengths)
+    num_words = masks.shape[2]
+
+    # The lowest y_lengths bits of each row are set.
+    bits = np.arange(num_words * 64) < y_lengths[:, None]
+    full = np.packbits(bits, axis=-1, bitorder="little").view("<u8").astype(np.uint64)
+
+    v = full.copy()
+    active = len(v)
+    for i in range(x_lengths[0] if len(x_lengths) else 0):
+        while x_lengths[active - 1] <= i:
+            active -= 1
+        u = v[:active] & masks[:active, i]
+        carry = np.zeros(active, dtype=np.uint64)
+        for k in range(num_words):
+            total = v[:active, k] + u[:, k]
+            next_carry = total < u[:, k]
+            total += carry
+            next_carry |= total < carry
+            v[:active, k] = (total | (v[:active, k] - u[:, k])) & full[:active, k]
+            carry = next_carry.astype(np.uint64)
+
+    ones = np.unpackbits(v.view(np.uint8), axis=-1).sum(axis=-1, dtype=np.int64)
+    return y_lengths - ones
+
+
+def rouge_l_batch(summaries, summary_lengths, references, reference_lengths, alpha=None):
+    """
+    Calculate sentence level ROUGE-L for a batch of sentence pairs at once.
+    The scores are the same as calling rouge_l_sentence_level() on each pair.
+    See pad_sentences() for making the inputs from sentences.
+
+    >>> vocab = Vocabulary()
+    >>> summaries, summary_lengths = pad_sentences([[1, 2, 3], [4]], vocab)
+    >>> references, reference_lengths = pad_sentences([[3, 1, 2, 5], [4, 4]], vocab)
+    >>> rouge_l_batch(summaries, summary_lengths, references, reference_lengths).precision
+    array([0.66666667, 1.        ])
+
+    :param summaries: a matrix of token ids, one padded summary sentence per row.
+    :param summary_lengths: an array of the lengths of the summaries.
+    :param references: a matrix of token ids, one padded reference sentence per row.
+    :param reference_lengths: an array of the lengths of the references.
+    :param alpha: weight on the recall (default 0.5).
+    :return: RougeScore of float64 arrays, recall, precision and f1 measure.
+    """
+    stats = rouge_l_batch_stats(summaries, summary_lengths, references, reference_lengths)
+    return scores_from_stats(stats, alpha)
+
+
+def rouge_l_batch_stats(summaries, summary_lengths, references, reference_lengths):
+    """
+    Like rouge_l_batch(), but return the sufficient statistics of each pair.
+
+    :param summaries: a matrix of token ids, one padded summary sentence per row.
+    :param summary_lengths: an array of the lengths of the summaries.
+    :param references: a matrix of token ids, one padded reference sentence per row.
+    :param reference_lengths: an array of the lengths of the references.
+    :return: RougeStats of arrays.
+    """
+    summaries = np.asarray(summaries)
+    references = np.asarray(references)
+    summary_lengths = np.asarray(summary_lengths, dtype=np.int64)
+    reference_lengths = np.asarray(reference_lengths, dtype=np.int64)
+    if not len(summaries) == len(summary_lengths) == len(references) == len(reference_lengths):
+        raise ValueError("all inputs must have the same batch size")
+    lcs_lengths = _lcs_length_batch(
+        summaries, summary_lengths, references, reference_lengths
+    )
+    return RougeStats(lcs_lengths, reference_lengths, summary_lengths)
+
+
+def _stats_arrays(stats):
+    """
+    Turn the sufficient statistics of many scores into arrays.
+
+    :param stats: RougeStats of arrays, or an iterable of RougeStats.
+        They must all have the same weight.
+    :return: RougeStats of arrays.
+    :raise ValueError: If the weights are not the same.
+    """
+    if isinstance(stats, RougeStats):
+        weight = stats.weight
+        hits, ref_total, cand_total = (np.asarray(values) for values in stats[:3])
+    else:
+        stats = list(stats)
+        weights = {record.weight for record in stats}
+        if len(weights) > 1:
+            raise ValueError("stats must have the same weight")
+        weight = weights.pop() if weights else None
+        values = np.array([record[:3] for record in stats]).reshape(-1, 3)
+        hits, ref_total, cand_total = values.T
+    return RougeStats(hits, ref_total, cand_total, weight)
+
+
+def scores_from_stats(stats, alpha=None):
+    """
+    Vectorized version of rouge.metrics.score_from_stats().
+
+    >>> stats = [RougeStats(1, 2, 3), RougeStats(2, 2, 4)]
+    >>> scores_from_stats(stats, alpha=0.5).recall
+    array([0.5, 1. ])
+
+    :param stats: RougeStats of arrays, or an iterable of RougeStats.
+    :param alpha: weight on the recall (default 0.5).
+    :return: RougeScore of float64 arrays, recall, precision and f1 measure.
+    :raise ValueError: If alpha is not between [0, 1].
+    """
+    stats = _stats_arrays(stats)
+    if stats.weight is None:
+        return _f1_measure(stats.hits, stats.ref_total, stats.cand_total, alpha)
+    recall, precision, _ = _f1_measure(stats.hits, stats.ref_total, stats.cand_total)
+    # Normalize with the inverse weight function, like rouge.metrics._divide_and_normalize().
+    recall = np.power(recall, 1 / stats.weight)
+    precision = np.power(precision, 1 / stats.weight)
+    if alpha is None:
+        alpha = 0.5
+    f1 = _divide_or_zero(precision * recall, (1 - alpha) * precision + alpha * recall)
+    return RougeScore(recall, precision, f1)
+
+
+def macro_average(stats, alpha=None):
+    """
+    Average the scores of many sufficient statistics.
+
+    >>> stats = [RougeStats(1, 2, 3), RougeStats(2, 2, 4)]
+    >>> macro_average(stats).recall
+    0.75
+
+    :param stats: RougeStats of arrays, or an iterable of RougeStats.
+    :param alpha: weight on the recall (default 0.5).
+    :return: RougeScore of floats, recall, precision and f1 measure.
+    """
+    scores = scores_from_stats(stats, alpha)
+    return RougeScore(*(float(values.mean()) if len(values) else 0.0 for values in scores))
+
+
+def micro_average(stats, alpha=None):
+    """
+    Pool the hits and totals of many sufficient statistics into a single score.
+
+    >>> stats = [RougeStats(1, 2, 3), RougeStats(2, 2, 4)]
+    >>> micro_average(stats).recall
+    0.75
+    >>> micro_average(stats).precision
+    0.42857142857142855
+
+    :param stats: RougeStats of arrays, or an iterable of RougeStats.
+    :param alpha: weight on the recall (default 0.5).
+    :return: RougeScore of floats, recall, precision and f1 measure.
+    """
+    stats = _stats_arrays(stats)
+    totals = (values.sum().item() for values in stats[:3])
+    return score_from_stats(RougeStats(*totals, stats.weight), alpha)
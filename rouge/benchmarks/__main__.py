@@ -0,0 +1,105 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Run the benchmarks, save the results and fail if they regressed from a baseline.
+
+    # Record a baseline.
+    python -m rouge.benchmarks -o baseline.json
+    # Compare a change with it.
+    python -m rouge.benchmarks --baseline baseline.json
+"""
+import argparse
+import logging
+import sys
+
+from rouge.metrics import set_engine
+from rouge.benchmarks.runner import LEVELS, METRICS
+from rouge.benchmarks.runner import compare, load_results, run_benchmarks, save_results
+from rouge.benchmarks.workloads import default_workloads
+
+logger = logging.getLogger(__name__)
+
+
+def _print_result(name, result):
+    print(
+        "%-36s %12.1f pairs/s %14.1f tokens/s %10.1f KiB"
+        % (
+            name,
+            result["pairs_per_second"],
+            result["tokens_per_second"],
+            result["peak_memory"] / 1024,
+        ),
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="benchmark the ROUGE metrics.")
+    parser.add_argument('-w', '--workload', nargs='+', choices=['testdata', 'long', 'duplicate'],
+                        help='the workloads to run. Default is all')
+    parser.add_argument('-m', '--metric', nargs='+', choices=list(METRICS),
+                        help='the metrics to run. Default is all')
+    parser.add_argument('-l', '--level', nargs='+', choices=LEVELS,
+                        help='the levels to run. Default is those of each workload')
+    parser.add_argument('--scale', type=float, help='multiply the size of the workloads')
+    parser.add_argument('--testdata', help='the directory of responses.txt and references.txt')
+    parser.add_argument('--repeat', type=int, help='number of timed runs of each benchmark')
+    parser.add_argument('--engine', help='the engine of the LCS kernels')
+    parser.add_argument('-o', '--output', help='save the results to this json file')
+    parser.add_argument('--baseline', help='a json file of results to compare with')
+    parser.add_argument('--threshold', type=float,
+                        help='max relative loss of throughput before failing')
+    parser.add_argument('--memory_threshold', type=float,
+                        help='max relative growth of the peak memory before failing. Default is --threshold')
+    args = parser.parse_args()
+
+    if args.engine:
+        set_engine(args.engine)
+    workloads = default_workloads(args.scale, args.testdata)
+    if args.workload:
+        workloads = [workload for workload in workloads if workload.name in args.workload]
+    results = run_benchmarks(
+        workloads, args.metric, args.level, args.repeat, callback=_print_result
+    )
+    if args.output:
+        save_results(args.output, results)
+
+    if args.baseline:
+        regressions = compare(
+            results, load_results(args.baseline), args.threshold, args.memory_threshold
+        )
+        for regression in regressions:
+            print(
+                "REGRESSION %s %s: %.1f -> %.1f (%.1f%% worse)"
+                % (
+                    regression.benchmark,
+                    regression.measure,
+                    regression.baseline,
+                    regression.value,
+                    regression.change * 100,
+                )
+            )
+        if regressions:
+            sys.exit(1)
+        print("no regression from %s" % args.baseline)
@@ -0,0 +1,275 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Time the metrics on workloads, save the results and compare them with a baseline.
+"""
+import collections
+import functools
+import json
+import platform
+import time
+import tracemalloc
+
+from rouge import metrics
+from rouge.benchmarks.workloads import SENTENCE, SUMMARY, CORPUS
+from rouge.benchmarks.workloads import make_summaries
+from rouge.corpus import score_corpus
+
+__all__ = [
+    "METRICS",
+    "LEVELS",
+    "Regression",
+    "run_benchmarks",
+    "save_results",
+    "load_results",
+    "compare",
+]
+
+
+def _score_corpus(names, summaries, references):
+    # In this process, so that the time is that of the scoring and not of the pool.
+    return score_corpus(summaries, references, names, workers=1)
+
+
+def _metric(sentence_fn, summary_fn, *corpus_names):
+    return {
+        SENTENCE: sentence_fn,
+        SUMMARY: summary_fn,
+        CORPUS: functools.partial(_score_corpus, corpus_names),
+    }
+
+
+# The function of each metric at each level. The corpus level scores all the pairs
+# of a workload with score_corpus().
+METRICS = {
+    "rouge_n_1": _metric(
+        functools.partial(metrics.rouge_n_sentence_level, n=1),
+        functools.partial(metrics.rouge_n_summary_level, n=1),
+        "rouge_n_1",
+    ),
+    "rouge_n_2": _metric(
+        functools.partial(metrics.rouge_n_sentence_level, n=2),
+        functools.partial(metrics.rouge_n_summary_level, n=2),
+        "rouge_n_2",
+    ),
+    "rouge_n_multi": _metric(
+        metrics.rouge_n_multi_sentence_level,
+        metrics.rouge_n_multi_summary_level,
+        *("rouge_n_%d" % n for n in metrics.DEFAULT_NGRAM_ORDERS)
+    ),
+    "rouge_l": _metric(metrics.rouge_l_sentence_level, metrics.rouge_l_summary_level, "rouge_l"),
+    "rouge_w": _metric(metrics.rouge_w_sentence_level, metrics.rouge_w_summary_level, "rouge_w"),
+    "rouge_s": _metric(metrics.rouge_s_sentence_level, metrics.rouge_s_summary_level, "rouge_s"),
+    "rouge_su": _metric(
+        metrics.rouge_su_sentence_level, metrics.rouge_su_summary_level, "rouge_su"
+    ),
+}
+LEVELS = (SENTENCE, SUMMARY, CORPUS)
+
+DEFAULT_REPEAT = 3
+# Each timed run scores the workload over and over for at least this many seconds.
+DEFAULT_MIN_TIME = 0.2
+# A benchmark regresses if it is this fraction slower, or uses this fraction more memory.
+DEFAULT_THRESHOLD = 0.2
+FORMAT_VERSION = 1
+# Peak memory that grows by less than this many bytes is noise, like a cache being filled.
+_MEMORY_SLACK = 1 << 16
+
+# A measure of a benchmark that regressed past the threshold.
+# change is the relative change, positive for the worse.
+Regression = collections.namedtuple("Regression", "benchmark measure baseline value change")
+
+
+def _benchmark_name(workload, metric, level):
+    return "%s/%s/%s" % (workload, metric, level)
+
+
+def _make_cases(workload, level):
+    """
+    :return: the pairs a metric is called on at the level.
+    """
+    if level == SENTENCE:
+        return workload.pairs
+    if level == SUMMARY:
+        return make_summaries(workload)
+    return [tuple(map(list, zip(*workload.pairs)))]
+
+
+def _score_all(score_fn, cases):
+    for summary, reference in cases:
+        score_fn(summary, reference)
+
+
+def _best_time(score_fn, cases, repeat, min_time):
+    """
+    :return: the least time of repeat runs, which is the least disturbed by other processes.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        loops = 0
+        start = time.perf_counter()
+        while True:
+            _score_all(score_fn, cases)
+            loops += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / loops)
+    return best
+
+
+def _peak_memory(score_fn, cases):
+    """
+    :return: the peak of the memory allocated while scoring the cases, in bytes.
+    """
+    tracemalloc.start()
+    try:
+        _score_all(score_fn, cases)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmarks(
+    workloads, metric_names=None, levels=None, repeat=None, min_time=None, callback=None
+):
+    """
+    Score every pair of each workload with each metric at each level.
+    The throughput is in sentence pairs and tokens per second at every level.
+
+    The time is measured without tracing, since tracemalloc slows down the allocations.
+    The peak memory is measured by another run, after the caches are warm.
+
+    :param workloads: a list of Workload.
+    :param metric_names: a list of keys of METRICS. Default is all.
+    :param levels: a list of LEVELS. Default is the levels of each workload.
+    :param repeat: int. The number of timed runs. Default is DEFAULT_REPEAT.
+    :param min_time: float. The min seconds of a timed run. Default is DEFAULT_MIN_TIME.
+    :param callback: called with the name and the result of each benchmark when it is done.
+    :return: a dict of results by the name of the benchmark, "workload/metric/level".
+    """
+    if metric_names is None:
+        metric_names = list(METRICS)
+    if repeat is None:
+        repeat = DEFAULT_REPEAT
+    if min_time is None:
+        min_time = DEFAULT_MIN_TIME
+    results = {}
+    for workload in workloads:
+        pairs = len(workload.pairs)
+        tokens = sum(len(summary) + len(reference) for summary, reference in workload.pairs)
+        for level in workload.levels if levels is None else levels:
+            cases = _make_cases(workload, level)
+            for metric in metric_names:
+                score_fn = METRICS[metric][level]
+                seconds = _best_time(score_fn, cases, repeat, min_time)
+                result = {
+                    "pairs": pairs,
+                    "tokens": tokens,
+                    "seconds": seconds,
+                    "pairs_per_second": pairs / seconds,
+                    "tokens_per_second": tokens / seconds,
+                    "peak_memory": _peak_memory(score_fn, cases),
+                }
+                name = _benchmark_name(workload.name, metric, level)
+                results[name] = result
+                if callback is not None:
+                    callback(name, result)
+    return results
+
+
+def save_results(path, results):
+    """
+    Save the results in json, with the versions they were measured with.
+
+    :param path: the json file.
+    :param results: the results of run_benchmarks().
+    """
+    data = {
+        "version": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "engine": metrics.get_engine().name,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """
+    :param path: a json file of save_results().
+    :return: the results of run_benchmarks().
+    :raise ValueError: if the file is of an unsupported version.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError("unsupported benchmark file version: %r" % data.get("version"))
+    return data["results"]
+
+
+def compare(results, baseline, threshold=None, memory_threshold=None):
+    """
+    Find the benchmarks that regressed from the baseline.
+    The benchmarks of only one side are not compared.
+
+    >>> baseline = {'a': {'pairs': 1, 'tokens': 2, 'pairs_per_second': 10.0, 'peak_memory': 0}}
+    >>> results = {'a': {'pairs': 1, 'tokens': 2, 'pairs_per_second': 5.0, 'peak_memory': 0}}
+    >>> compare(results, baseline)
+    [Regression(benchmark='a', measure='pairs_per_second', baseline=10.0, value=5.0, change=0.5)]
+
+    :param results: the results of run_benchmarks().
+    :param baseline: the results to compare with.
+    :param threshold: float. The max relative loss of throughput. Default is DEFAULT_THRESHOLD.
+    :param memory_threshold: float. The max relative growth of the peak memory.
+        Default is threshold.
+    :return: a list of Regression.
+    :raise ValueError: if a benchmark of both sides was not run on the same workload.
+    """
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLD
+    if memory_threshold is None:
+        memory_threshold = threshold
+    regressions = []
+    for name in sorted(results.keys() & baseline.keys()):
+        result, expected = results[name], baseline[name]
+        if (result["pairs"], result["tokens"]) != (expected["pairs"], expected["tokens"]):
+            raise ValueError("the workload of %s differs from the baseline" % name)
+
+        speed, expected_speed = result["pairs_per_second"], expected["pairs_per_second"]
+        slowdown = 1 - speed / expected_speed
+        if slowdown > threshold:
+            regressions.append(
+                Regression(name, "pairs_per_second", expected_speed, speed, slowdown)
+            )
+
+        memory, expected_memory = result["peak_memory"], expected["peak_memory"]
+        if memory - expected_memory > max(expected_memory * memory_threshold, _MEMORY_SLACK):
+            growth = memory / expected_memory - 1 if expected_memory else float("inf")
+            regressions.append(
+                Regression(name, "peak_memory", expected_memory, memory, growth)
+            )
+    return regressions
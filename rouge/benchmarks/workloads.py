@@ -0,0 +1,188 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+The sentence pairs the metrics are benchmarked on.
+"""
+import collections
+import os
+import random
+
+__all__ = [
+    "Workload",
+    "TESTDATA_DIR",
+    "load_testdata",
+    "long_documents",
+    "high_duplicates",
+    "default_workloads",
+    "make_summaries",
+]
+
+# The summary level groups summary_size consecutive pairs into a pair of summaries.
+# levels are those benchmarked by default, see rouge.benchmarks.runner.LEVELS.
+Workload = collections.namedtuple("Workload", "name pairs summary_size levels")
+
+TESTDATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "testdata"
+)
+RESPONSES = "responses.txt"
+REFERENCES = "references.txt"
+
+SENTENCE = "sentence"
+SUMMARY = "summary"
+CORPUS = "corpus"
+
+DEFAULT_SUMMARY_SIZE = 10
+DEFAULT_VOCAB_SIZE = 5000
+DEFAULT_LONG_COUNT = 500
+DEFAULT_LONG_LENGTH = 60
+DEFAULT_DUPLICATE_COUNT = 10000
+DEFAULT_DISTINCT_PAIRS = 200
+
+
+def _break_into_words(line):
+    """
+    Like rouge_score.py, split a tokenized line at spaces.
+    """
+    return line.strip().split(" ")
+
+
+def load_testdata(directory=None, limit=None, summary_size=None):
+    """
+    Load the responses and references of the testdata as sentence pairs.
+
+    :param directory: Default is TESTDATA_DIR, which is in the source tree.
+    :param limit: int. If given, only the first limit pairs are loaded.
+    :param summary_size: Default is DEFAULT_SUMMARY_SIZE.
+    :return: Workload.
+    """
+    if directory is None:
+        directory = TESTDATA_DIR
+    if summary_size is None:
+        summary_size = DEFAULT_SUMMARY_SIZE
+    with open(os.path.join(directory, RESPONSES)) as responses, open(
+        os.path.join(directory, REFERENCES)
+    ) as references:
+        pairs = [
+            (_break_into_words(response), _break_into_words(reference))
+            for response, reference in zip(responses, references)
+        ]
+    return Workload("testdata", pairs[:limit], summary_size, (SENTENCE, SUMMARY))
+
+
+def _zipf_sentence(rng, length, weights):
+    return [str(token) for token in rng.choices(range(len(weights)), weights, k=length)]
+
+
+def _zipf_weights(vocab_size):
+    # Token frequencies of natural text roughly follow Zipf's law.
+    return [1 / rank for rank in range(1, vocab_size + 1)]
+
+
+def long_documents(count=None, length=None, vocab_size=None, summary_size=None, seed=0):
+    """
+    Make pairs of long random sentences, grouped into long summaries.
+    Lengths vary uniformly up to twice the mean length.
+
+    :param count: int. The number of pairs. Default is DEFAULT_LONG_COUNT.
+    :param length: int. The mean length of a sentence. Default is DEFAULT_LONG_LENGTH.
+    :param vocab_size: int. Default is DEFAULT_VOCAB_SIZE.
+    :param summary_size: Default is DEFAULT_SUMMARY_SIZE.
+    :param seed: the random seed.
+    :return: Workload.
+    """
+    if count is None:
+        count = DEFAULT_LONG_COUNT
+    if length is None:
+        length = DEFAULT_LONG_LENGTH
+    if vocab_size is None:
+        vocab_size = DEFAULT_VOCAB_SIZE
+    if summary_size is None:
+        summary_size = DEFAULT_SUMMARY_SIZE
+    rng = random.Random(seed)
+    weights = _zipf_weights(vocab_size)
+    pairs = [
+        tuple(_zipf_sentence(rng, rng.randint(1, 2 * length), weights) for _ in range(2))
+        for _ in range(count)
+    ]
+    return Workload("long", pairs, summary_size, (SENTENCE, SUMMARY))
+
+
+def high_duplicates(pairs, count=None, distinct=None, summary_size=None, seed=0):
+    """
+    Draw many pairs out of a few distinct ones, like a corpus of generic responses.
+    This is also benchmarked at the corpus level, where each distinct pair is scored once.
+
+    :param pairs: a list of sentence pairs to draw the distinct ones from.
+    :param count: int. The number of pairs. Default is DEFAULT_DUPLICATE_COUNT.
+    :param distinct: int. The number of distinct pairs. Default is DEFAULT_DISTINCT_PAIRS.
+    :param summary_size: Default is DEFAULT_SUMMARY_SIZE.
+    :param seed: the random seed.
+    :return: Workload.
+    """
+    if count is None:
+        count = DEFAULT_DUPLICATE_COUNT
+    if distinct is None:
+        distinct = DEFAULT_DISTINCT_PAIRS
+    if summary_size is None:
+        summary_size = DEFAULT_SUMMARY_SIZE
+    rng = random.Random(seed)
+    pool = rng.sample(pairs, min(distinct, len(pairs)))
+    pairs = rng.choices(pool, k=count)
+    return Workload("duplicate", pairs, summary_size, (SENTENCE, SUMMARY, CORPUS))
+
+
+def default_workloads(scale=None, directory=None):
+    """
+    Make the testdata, long document and high duplicate workloads.
+
+    :param scale: float. Multiply the number of pairs of each workload. Default is 1.
+        The testdata is cut, but never extended.
+    :param directory: the testdata directory. Default is TESTDATA_DIR.
+    :return: a list of Workload.
+    """
+    if scale is None:
+        scale = 1
+    testdata = load_testdata(directory)
+    testdata = testdata._replace(pairs=testdata.pairs[: max(1, round(len(testdata.pairs) * scale))])
+    return [
+        testdata,
+        long_documents(count=max(1, round(DEFAULT_LONG_COUNT * scale))),
+        high_duplicates(testdata.pairs, count=max(1, round(DEFAULT_DUPLICATE_COUNT * scale))),
+    ]
+
+
+def make_summaries(workload):
+    """
+    Group the pairs of a workload into pairs of summaries.
+
+    >>> make_summaries(Workload('', [('a', 'b'), ('c', 'd'), ('e', 'f')], 2, ()))
+    [(['a', 'c'], ['b', 'd']), (['e'], ['f'])]
+
+    :param workload: Workload.
+    :return: a list of (summary sentences, reference sentences).
+    """
+    pairs, size = workload.pairs, workload.summary_size
+    return [
+        tuple(map(list, zip(*pairs[start : start + size]))) for start in range(0, len(pairs), size)
+    ]
@@ -0,0 +1,254 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Bootstrap confidence intervals of a system score, computed from the sufficient
+statistics of its sentences with numpy, like the -c and -r options of the perl script.
+
+Each resample is a matrix row of indices of instances drawn with replacement. By default
+the indices are drawn like the perl script does, so that the resamples are the same.
+"""
+
+import collections
+
+import numpy as np
+
+from rouge.batch import _stats_arrays
+from rouge.batch import scores_from_stats
+from rouge.metrics import RougeScore, RougeStats
+
+__all__ = [
+    "ConfidenceInterval",
+    "bootstrap_confidence_intervals",
+]
+
+ConfidenceInterval = collections.namedtuple("ConfidenceInterval", "mean low high")
+
+DEFAULT_CONFIDENCE = 95
+DEFAULT_NUM_RESAMPLES = 1000
+# "macro" averages the scores of the instances, like the perl script by default.
+# "micro" scores the pooled counts of the instances, like -t 1 of the perl script.
+AVERAGES = ("macro", "micro")
+DEFAULT_AVERAGE = "macro"
+# The number of indices drawn at once, which bounds the memory used.
+DEFAULT_BLOCK_SIZE = 1 << 22
+
+# The drand48 generator behind rand() and srand() of perl.
+_DRAND48_MULT = 0x5DEECE66D
+_DRAND48_ADD = 0xB
+_DRAND48_MASK = (1 << 48) - 1
+_DRAND48_SEED = 0x330E
+
+
+def _drand48_tables(size):
+    """
+    Compute the coefficients of the kth state of drand48 as a function of the seed state:
+    state_k = (mults[k - 1] * state_0 + adds[k - 1]) mod 2^48.
+
+    :param size: the number of states.
+    :return: a 2-tuple of uint64 arrays, mults and adds.
+    """
+    mults = np.empty(size, dtype=np.uint64)
+    adds = np.empty(size, dtype=np.uint64)
+    mult, add = 1, 0
+    for k in range(size):
+        mult = mult * _DRAND48_MULT & _DRAND48_MASK
+        add = (add * _DRAND48_MULT + _DRAND48_ADD) & _DRAND48_MASK
+        mults[k] = mult
+        adds[k] = add
+    return mults, adds
+
+
+def _perl_resample_indices(num_instances, samples, tables=None):
+    """
+    Draw the indices of resamples like the perl script. Resample i seeds the generator
+    with srand(i) and draws int(rand(num_instances)) num_instances times.
+
+    >>> _perl_resample_indices(10, [0, 1])
+    array([[1, 7, 0, 8, 5, 7, 6, 3, 8, 7],
+           [0, 4, 8, 3, 5, 0, 1, 9, 7, 3]])
+
+    :param num_instances: int.
+    :param samples: an array of the numbers of the resamples.
+    :param tables: the result of _drand48_tables(num_instances), if already computed.
+    :return: an int64 matrix with a row of indices per resample.
+    """
+    if tables is None:
+        tables = _drand48_tables(num_instances)
+    mults, adds = tables
+    seeds = (np.asarray(samples, dtype=np.uint64) << np.uint64(16)) + np.uint64(_DRAND48_SEED)
+    # The products wrap around mod 2^64, which 2^48 divides.
+    states = np.multiply.outer(seeds, mults)
+    states += adds
+    states &= np.uint64(_DRAND48_MASK)
+    # Scaling by 2^-48 is exact, so this rounds like rand(num_instances) of perl.
+    return np.multiply(states, num_instances * 2.0 ** -48).astype(np.int64)
+
+
+def _iter_resample_indices(num_instances, num_resamples, seed=None, block_size=None):
+    """
+    Draw the indices of resamples in blocks of rows.
+
+    :param num_instances: int.
+    :param num_resamples: int.
+    :param seed: None to draw like the perl script, or the seed of a numpy Generator.
+    :param block_size: the number of indices drawn at once. Default is DEFAULT_BLOCK_SIZE.
+    :return: an iterator of 3-tuples, the first and stop resamples of a block
+        and its int64 matrix of indices.
+    """
+    if block_size is None:
+        block_size = DEFAULT_BLOCK_SIZE
+    if seed is None:
+        tables = _drand48_tables(num_instances)
+    else:
+        generator = np.random.default_rng(seed)
+    step = max(block_size // num_instances, 1)
+    for start in range(0, num_resamples, step):
+        stop = min(start + step, num_resamples)
+        if seed is None:
+            indices = _perl_resample_indices(num_instances, np.arange(start, stop), tables)
+        else:
+            indices = generator.integers(num_instances, size=(stop - start, num_instances))
+        yield start, stop, indices
+
+
+def _resample_sums(values, num_resamples, seed=None, block_size=None):
+    """
+    Sum values over each resample of their instances.
+
+    :param values: a list of 1d arrays, each holding a value per instance.
+    :param num_resamples: int.
+    :param seed: None to draw like the perl script, or the seed of a numpy Generator.
+    :param block_size: the number of indices drawn at once.
+    :return: a list of arrays, the sums of each of values per resample.
+    """
+    num_instances = len(values[0])
+    values = [np.ascontiguousarray(value, dtype=np.float64) for value in values]
+    sums = [np.empty(num_resamples) for _ in values]
+    blocks = _iter_resample_indices(num_instances, num_resamples, seed, block_size)
+    for start, stop, indices in blocks:
+        for value, value_sums in zip(values, sums):
+            value_sums[start:stop] = value[indices].sum(axis=1)
+    return sums
+
+
+def _percentile_interval(values, confidence):
+    """
+    Find the confidence interval of sorted values by linear interpolation,
+    with the indices of the perl script.
+
+    >>> _percentile_interval(np.arange(1000.0), 95)
+    (25.0, 974.0)
+
+    :param values: a sorted array.
+    :param confidence: the confidence level, in percent.
+    :return: a 2-tuple, the lower and upper bounds.
+    """
+    size = len(values)
+    delta = size * ((100 - confidence) / 2.0) / 100.0
+    upper = int(size - delta - 1)
+    lower = int(delta)
+    ratio = size - delta - 1 - upper
+
+    def interpolate(index):
+        after = values[min(index + 1, size - 1)]
+        return float(values[index] + (after - values[index]) * ratio)
+
+    return interpolate(lower), interpolate(upper)
+
+
+def bootstrap_confidence_intervals(
+    stats,
+    alpha=None,
+    confidence=None,
+    num_resamples=None,
+    average=None,
+    seed=None,
+    block_size=None,
+):
+    """
+    Estimate the confidence intervals of the recall, precision and f1 measure of a system
+    by bootstrap resampling of its instances, which may be sentences or summaries.
+
+    The mean is the average over the resamples, which the perl script reports.
+    With the default seed, the resamples are those of the perl script.
+
+    >>> stats = [RougeStats(1, 2, 2), RougeStats(2, 2, 2), RougeStats(0, 2, 2)]
+    >>> recall, _, _ = bootstrap_confidence_intervals(stats, confidence=50, num_resamples=10)
+    >>> recall
+    ConfidenceInterval(mean=0.4833333333333333, low=0.3333333333333333, high=0.5833333333333333)
+
+    :param stats: RougeStats of arrays, or a list of RougeStats, one per instance.
+    :param alpha: weight on the recall (default 0.5).
+    :param confidence: the confidence level, in percent. Default is DEFAULT_CONFIDENCE.
+    :param num_resamples: Default is DEFAULT_NUM_RESAMPLES.
+    :param average: one of AVERAGES. Default is DEFAULT_AVERAGE.
+    :param seed: None to draw like the perl script, or the seed of a numpy Generator,
+        which is faster.
+    :param block_size: the number of indices drawn at once. Default is DEFAULT_BLOCK_SIZE.
+    :return: RougeScore of ConfidenceInterval.
+    :raise ValueError: If there is no instance or an argument is out of range.
+    """
+    if confidence is None:
+        confidence = DEFAULT_CONFIDENCE
+    if num_resamples is None:
+        num_resamples = DEFAULT_NUM_RESAMPLES
+    if average is None:
+        average = DEFAULT_AVERAGE
+    if not 0 < confidence <= 100:
+        raise ValueError("confidence must be between (0, 100]")
+    if not num_resamples > 0:
+        raise ValueError("num_resamples must be positive")
+    if average not in AVERAGES:
+        raise ValueError("average must be one of {}".format(AVERAGES))
+    stats = _stats_arrays(stats)
+    num_instances = len(stats.hits)
+    if not num_instances:
+        raise ValueError("stats must not be empty")
+
+    if average == "macro":
+        values = scores_from_stats(stats, alpha)
+        sums = _resample_sums(values, num_resamples, seed, block_size)
+        scores = [value_sums / num_instances for value_sums in sums]
+    else:
+        sums = _resample_sums(stats[:3], num_resamples, seed, block_size)
+        scores = scores_from_stats(RougeStats(*sums, stats.weight), alpha)
+
+    return _confidence_intervals(scores, confidence)
+
+
+def _confidence_intervals(scores, confidence):
+    """
+    Summarize the scores of the resamples into confidence intervals.
+
+    :param scores: the recall, precision and f1 measure arrays, one value per resample.
+    :param confidence: the confidence level, in percent.
+    :return: RougeScore of ConfidenceInterval.
+    """
+    intervals = []
+    for values in scores:
+        values = np.sort(values)
+        intervals.append(
+            ConfidenceInterval(float(values.mean()), *_percentile_interval(values, confidence))
+        )
+    return RougeScore(*intervals)
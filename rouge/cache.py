@@ -0,0 +1,281 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+A persistent cache of the sufficient statistics of sentence pairs, so that scoring a
+corpus again only computes the pairs that changed.
+
+The cache is a SQLite database keyed by a hash of CACHE_VERSION, the metric, its params
+and the tokens of both sides. It holds at most a given number of entries, and evicts the least
+recently used ones beyond that.
+"""
+
+import array
+import hashlib
+import itertools
+import sqlite3
+
+from rouge.metrics import RougeStats
+from rouge.metrics import rouge_n_multi_sentence_level_stats
+
+__all__ = ["StatsCache", "cache_key", "cached_stats", "cached_rouge_n_stats"]
+
+DEFAULT_MAX_ENTRIES = 1 << 22
+# Part of every cache key. Bump it whenever the stats a metric returns for the same params
+# change, so that the entries of older versions are missed, and evicted in time.
+CACHE_VERSION = 1
+# The number of keys looked up by one query, below the limit of SQLite on parameters.
+_QUERY_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats (
+    key BLOB PRIMARY KEY,
+    hits,
+    ref_total,
+    cand_total,
+    weight,
+    used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS stats_used ON stats (used);
+"""
+
+
+def _encode_tokens(value):
+    # Interned tokens are hashed apart from words, since they mean nothing without their Vocabulary.
+    if isinstance(value, array.array):
+        return b"a%s%d:" % (value.typecode.encode("ascii"), len(value)) + value.tobytes()
+    if not isinstance(value, str):
+        try:
+            return b"w%d:" % len(value) + "\0".join(value).encode("utf-8")
+        except TypeError:
+            pass
+    return b"r" + repr(value).encode("utf-8")
+
+
+def _key_hash(name, params):
+    key = repr((CACHE_VERSION, name, sorted((params or {}).items())))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16)
+
+
+def _pair_key(key_hash, summary, reference):
+    key_hash = key_hash.copy()
+    summary = _encode_tokens(summary)
+    key_hash.update(b"%d:" % len(summary))
+    key_hash.update(summary)
+    key_hash.update(_encode_tokens(reference))
+    return key_hash.digest()
+
+
+def cache_key(name, params, summary, reference):
+    """
+    Hash a pair of the inputs of a metric into a cache key.
+    Sentences are lists of words without NUL characters, arrays of token ids, or strings.
+
+    >>> cache_key('rouge_l', None, ['a'], ['b']) == cache_key('rouge_l', {}, ['a'], ['b'])
+    True
+    >>> cache_key('rouge_l', None, ['a'], ['b']) == cache_key('rouge_l', None, ['b'], ['a'])
+    False
+
+    :param name: the name of the metric.
+    :param params: a dict of the params of the metric which change the stats, or None.
+    :param summary: a sentence, or a list of sentences.
+    :param reference: a sentence, or a list of sentences.
+    :return: bytes.
+    """
+    return _pair_key(_key_hash(name, params), summary, reference)
+
+
+class StatsCache:
+    """
+    A SQLite cache of RougeStats by key, as made by cache_key().
+
+    Entries are stamped with the generation of the cache that last used them. A cache
+    opened again starts a new generation, and eviction removes the oldest generations first.
+
+    >>> cache = StatsCache(':memory:')
+    >>> key = cache_key('rouge_l', None, ['a'], ['a'])
+    >>> cache.put_many({key: RougeStats(1, 1, 1)})
+    >>> cache.get_many([key])[key]
+    RougeStats(hits=1, ref_total=1, cand_total=1, weight=None)
+    >>> cache.close()
+    """
+
+    def __init__(self, path, max_entries=None):
+        """
+        :param path: the database file, created if missing.
+        :param max_entries: the most entries kept. Default is DEFAULT_MAX_ENTRIES.
+        """
+        if max_entries is None:
+            max_entries = DEFAULT_MAX_ENTRIES
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(_SCHEMA)
+        (last,) = self._connection.execute("SELECT MAX(used) FROM stats").fetchone()
+        self.generation = (last or 0) + 1
+
+    def __len__(self):
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM stats").fetchone()
+        return count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def get_many(self, keys):
+        """
+        Look up keys, and mark the entries found as used.
+
+        :param keys: an iterable of keys.
+        :return: a dict of RougeStats by key, for the keys found.
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(keys), _QUERY_SIZE):
+            chunk = keys[start:start + _QUERY_SIZE]
+            rows = self._connection.execute(
+                "SELECT key, hits, ref_total, cand_total, weight FROM stats"
+                " WHERE key IN (%s)" % ",".join("?" * len(chunk)),
+                chunk,
+            )
+            for key, *values in rows:
+                found[key] = RougeStats(*values)
+        with self._connection:
+            self._connection.executemany(
+                "UPDATE stats SET used = ? WHERE key = ? AND used < ?",
+                ((self.generation, key, self.generation) for key in found),
+            )
+        return found
+
+    def put_many(self, entries):
+        """
+        Add or replace entries, then evict the oldest entries beyond max_entries.
+
+        :param entries: a dict of RougeStats by key.
+        """
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?, ?, ?)",
+                ((key, *stats, self.generation) for key, stats in entries.items()),
+            )
+        if entries:
+            self.evict()
+
+    def evict(self, max_entries=None):
+        """
+        Remove the least recently used entries beyond max_entries.
+
+        :param max_entries: Default is the max_entries of the cache.
+        :return: the number of entries removed.
+        """
+        if max_entries is None:
+            max_entries = self.max_entries
+        excess = len(self) - max_entries
+        if excess <= 0:
+            return 0
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM stats WHERE key IN"
+                " (SELECT key FROM stats ORDER BY used LIMIT ?)",
+                (excess,),
+            )
+        return excess
+
+
+def cached_stats(cache, name, stats_fn, pairs, params=None):
+    """
+    Compute the stats of pairs with a metric, reading those in the cache and adding the others.
+
+    >>> from rouge.metrics import rouge_n_sentence_level_stats
+    >>> with StatsCache(':memory:') as cache:
+    ...     stats = cached_stats(cache, 'rouge_n', rouge_n_sentence_level_stats, [('ab', 'ba')], {'n': 1})
+    ...     len(cache)
+    1
+    >>> stats
+    [RougeStats(hits=2, ref_total=2, cand_total=2, weight=None)]
+
+    :param cache: StatsCache.
+    :param name: the name of the metric, which is part of the keys.
+    :param stats_fn: a function of a summary, a reference and params, returning RougeStats.
+    :param pairs: an iterable of (summary, reference).
+    :param params: a dict of keyword arguments of stats_fn, which is part of the keys.
+    :return: a list of RougeStats, one per pair.
+    """
+    if params is None:
+        params = {}
+    pairs = list(pairs)
+    key_hash = _key_hash(name, params)
+    keys = [_pair_key(key_hash, summary, reference) for summary, reference in pairs]
+    found = cache.get_many(keys)
+    computed = {}
+    stats = []
+    for key, (summary, reference) in zip(keys, pairs):
+        pair_stats = found.get(key) or computed.get(key)
+        if pair_stats is None:
+            pair_stats = computed[key] = stats_fn(summary, reference, **params)
+        stats.append(pair_stats)
+    cache.put_many(computed)
+    return stats
+
+
+def cached_rouge_n_stats(cache, pairs, orders):
+    """
+    Compute the stats of sentence level ROUGE-N of pairs for several n. The entries are
+    those of cached_stats() with rouge_n_sentence_level_stats, named 'rouge_n' with the
+    param n, but the orders missing for a pair are counted at once, in a single pass.
+
+    >>> with StatsCache(':memory:') as cache:
+    ...     stats = cached_rouge_n_stats(cache, [('ab', 'ba')], (1, 2))
+    ...     len(cache)
+    2
+    >>> stats[2]
+    [RougeStats(hits=0, ref_total=1, cand_total=1, weight=None)]
+
+    :param cache: StatsCache.
+    :param pairs: an iterable of (summary, reference).
+    :param orders: an iterable of n for ngram.
+    :return: a dict mapping each n to a list of RougeStats, one per pair.
+    """
+    orders = list(dict.fromkeys(orders))
+    pairs = list(pairs)
+    keys = {}
+    for n in orders:
+        key_hash = _key_hash("rouge_n", {"n": n})
+        keys[n] = [_pair_key(key_hash, summary, reference) for summary, reference in pairs]
+    found = cache.get_many(itertools.chain.from_iterable(keys.values()))
+    computed = {}
+    for index, (summary, reference) in enumerate(pairs):
+        missing = [
+            n for n in orders if keys[n][index] not in found and keys[n][index] not in computed
+        ]
+        if missing:
+            multi_stats = rouge_n_multi_sentence_level_stats(summary, reference, missing)
+            for n in missing:
+                computed[keys[n][index]] = multi_stats[n]
+    cache.put_many(computed)
+    return {n: [found.get(key) or computed[key] for key in keys[n]] for n in orders}
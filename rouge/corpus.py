@@ -0,0 +1,572 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Score a whole corpus of sentence pairs with several metrics at once, in parallel processes.
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import os
+import re
+
+from rouge.metrics import (
+    rouge_l_sentence_level_stats,
+    rouge_n_multi_sentence_level_stats,
+    rouge_n_multi_summary_level,
+    rouge_s_sentence_level_stats,
+    rouge_s_summary_level,
+    rouge_su_sentence_level_stats,
+    rouge_su_summary_level,
+    rouge_w_sentence_level_stats,
+    score_from_stats,
+    _make_lcs_union,
+    _make_wlcs_union,
+    _rouge_l_from_unions,
+    _rouge_w_from_unions,
+)
+
+__all__ = [
+    "CorpusScore",
+    "score_corpus",
+    "iter_sentence_scores",
+    "iter_sentence_stats",
+]
+
+DEFAULT_METRICS = ("rouge_n_1", "rouge_n_2", "rouge_l")
+# Number of chunks each worker gets by default, so that uneven chunks balance out.
+DEFAULT_CHUNKS_PER_WORKER = 4
+# Number of pairs per task when the corpus is streamed.
+DEFAULT_STREAM_CHUNKSIZE = 1024
+# Number of tasks per worker in flight when the corpus is streamed.
+DEFAULT_PENDING_PER_WORKER = 2
+
+CorpusScore = collections.namedtuple("CorpusScore", ["sentence_scores", "system_score"])
+
+_ROUGE_N_PREFIX = "rouge_n_"
+
+# A name of ROUGE-N. The scores are keyed by the order without leading zeros.
+_ROUGE_N_NAME = re.compile(r"%s([1-9][0-9]*)\Z" % _ROUGE_N_PREFIX)
+
+# The sentence level scores are computed from these stats.
+_SENTENCE_LEVEL_STATS = {
+    "rouge_l": rouge_l_sentence_level_stats,
+    "rouge_w": rouge_w_sentence_level_stats,
+    "rouge_s": rouge_s_sentence_level_stats,
+    "rouge_su": rouge_su_sentence_level_stats,
+}
+
+# The summary level of these metrics is linear in the corpus size.
+_SUMMARY_LEVEL = {
+    "rouge_s": rouge_s_summary_level,
+    "rouge_su": rouge_su_summary_level,
+}
+
+# The summary level of these metrics compares every reference with every summary.
+# The LCS union of each reference is computed in parallel.
+_MAKE_UNION = {
+    "rouge_l": _make_lcs_union,
+    "rouge_w": _make_wlcs_union,
+}
+
+# Arguments of score_corpus() shared with the workers.
+_Config = collections.namedtuple(
+    "_Config", ["orders", "names", "alpha", "weight", "skip_distance"]
+)
+
+# The distinct summaries of the corpus and their positions, from _dedup(),
+# set in each worker for computing LCS unions.
+_worker_summaries = None
+
+
+def _make_config(metrics, alpha, weight, skip_distance):
+    """
+    Check the metric names and split them into the orders of ROUGE-N and the others.
+
+    >>> _make_config(['rouge_n_2', 'rouge_l'], None, None, None).orders
+    (2,)
+    >>> _make_config(['rouge_n_02'], None, None, None)
+    Traceback (most recent call last):
+    ...
+    ValueError: unknown metric: 'rouge_n_02', expected rouge_n_N with a positive order N without leading zeros, or one of rouge_l, rouge_w, rouge_s, rouge_su
+
+    :param metrics: an iterable of metric names.
+    :param alpha: weight on the recall.
+    :param weight: float, the weight factor of ROUGE-W.
+    :param skip_distance: int, the skip distance of ROUGE-S and ROUGE-SU.
+    :return: _Config.
+    :raise ValueError: if a metric name is unknown.
+    """
+    orders = []
+    names = []
+    for name in metrics:
+        match = _ROUGE_N_NAME.match(name)
+        if match is not None:
+            orders.append(int(match.group(1)))
+        elif name in _SENTENCE_LEVEL_STATS:
+            names.append(name)
+        else:
+            raise ValueError(
+                "unknown metric: %r, expected %sN with a positive order N without leading zeros,"
+                " or one of %s" % (name, _ROUGE_N_PREFIX, ", ".join(_SENTENCE_LEVEL_STATS))
+            )
+    return _Config(tuple(orders), tuple(names), alpha, weight, skip_distance)
+
+
+def _metric_kwargs(name, config):
+    """
+    Return the keyword arguments specific to a metric.
+
+    :param name: a metric name other than ROUGE-N.
+    :param config: _Config.
+    :return: dict.
+    """
+    if name == "rouge_w":
+        return {"weight": config.weight}
+    if name in ("rouge_s", "rouge_su"):
+        return {"skip_distance": config.skip_distance}
+    return {}
+
+
+def _sentence_key(sentence):
+    """
+    Return a hashable key of a sentence. Sentences with equal keys have equal scores.
+
+    :param sentence: a list or array of tokens, or a string.
+    :return: a string or a tuple.
+    """
+    return sentence if isinstance(sentence, str) else tuple(sentence)
+
+
+def _pair_key(pair):
+    return _sentence_key(pair[0]), _sentence_key(pair[1])
+
+
+def _dedup(items, key):
+    """
+    Find the unique items, and the position of each item among them.
+
+    >>> _dedup(['a b', 'c', 'a b'], key=_sentence_key)
+    (['a b', 'c'], [0, 1, 0])
+
+    :param items: an iterable.
+    :param key: a function returning a hashable key of an item.
+    :return: a 2-tuple, the list of unique items in order of first occurrence
+        and the list of the position of each item in it.
+    """
+    positions_by_key = {}
+    unique = []
+    positions = []
+    for item in items:
+        position = positions_by_key.setdefault(key(item), len(unique))
+        if position == len(unique):
+            unique.append(item)
+        positions.append(position)
+    return unique, positions
+
+
+def _scatter(unique_values, positions):
+    """
+    The inverse of _dedup().
+
+    >>> _scatter(['x', 'y'], [0, 1, 0])
+    ['x', 'y', 'x']
+    """
+    return [unique_values[position] for position in positions]
+
+
+def _stats_chunk(summaries, references, config):
+    """
+    Compute the stats of the sentence level scores of a chunk of sentence pairs.
+    Each distinct pair is counted once.
+
+    :param summaries: a list of sentences.
+    :param references: a list of sentences.
+    :param config: _Config.
+    :return: a dict mapping each metric name to a list of RougeStats.
+    """
+    pairs, positions = _dedup(zip(summaries, references), _pair_key)
+    stats = collections.defaultdict(list)
+    for summary, reference in pairs:
+        if config.orders:
+            multi_stats = rouge_n_multi_sentence_level_stats(summary, reference, config.orders)
+            for n, pair_stats in multi_stats.items():
+                stats[_ROUGE_N_PREFIX + str(n)].append(pair_stats)
+        for name in config.names:
+            pair_stats = _SENTENCE_LEVEL_STATS[name](
+                summary, reference, **_metric_kwargs(name, config)
+            )
+            stats[name].append(pair_stats)
+    if len(pairs) < len(positions):
+        return {name: _scatter(unique_stats, positions) for name, unique_stats in stats.items()}
+    return stats
+
+
+def _score_chunk(summaries, references, config):
+    """
+    Compute the sentence level scores of a chunk of sentence pairs, see _stats_chunk().
+
+    :return: a dict mapping each metric name to a list of RougeScore.
+    """
+    return {
+        name: [score_from_stats(pair_stats, config.alpha) for pair_stats in chunk_stats]
+        for name, chunk_stats in _stats_chunk(summaries, references, config).items()
+    }
+
+
+def _init_worker(summaries):
+    global _worker_summaries
+    _worker_summaries = summaries
+
+
+def _union_chunk(references, names, summaries=None):
+    """
+    Compute the LCS unions of a chunk of reference sentences against all the summaries.
+
+    :param references: a list of sentences.
+    :param names: the metric names to compute unions for.
+    :param summaries: the distinct summary sentences and their positions, from _dedup().
+        Default is those set by _init_worker().
+    :return: a dict mapping each metric name to a list of unions.
+    """
+    if summaries is None:
+        summaries = _worker_summaries
+    unique_summaries, positions = summaries
+    # Keep the iteration order of each union, which the clipping depends on.
+    return {
+        name: [
+            list(_MAKE_UNION[name](unique_summaries, reference, positions))
+            for reference in references
+        ]
+        for name in names
+    }
+
+
+def _system_score(name, summaries, references, unions, config):
+    """
+    Compute the system level score of a metric, which is its summary level score
+    over the whole corpus.
+
+    :param name: a metric name other than ROUGE-N.
+    :param summaries: a list of sentences.
+    :param references: a list of sentences.
+    :param unions: an iterable of the LCS unions of the references, for ROUGE-L and ROUGE-W.
+    :param config: _Config.
+    :return: RougeScore.
+    """
+    if name == "rouge_l":
+        return _rouge_l_from_unions(summaries, references, unions, config.alpha)
+    if name == "rouge_w":
+        return _rouge_w_from_unions(
+            summaries, references, unions, config.weight, config.alpha
+        )
+    return _SUMMARY_LEVEL[name](
+        summaries, references, alpha=config.alpha, **_metric_kwargs(name, config)
+    )
+
+
+def _score_corpus(summaries, references, pairs, config, chunksize, map_fn, union_args):
+    """
+    Score the corpus with map_fn, which is either the builtin map() or the map() of
+    an executor. Chunks are submitted before the linear system level scores are computed
+    in this process, so that an executor works meanwhile.
+
+    Only the distinct pairs are scored, and the LCS unions are only computed for the
+    distinct references, which are the same for equal references. Within a union,
+    the LCS of each distinct summary sentence is computed once.
+
+    :param pairs: the distinct pairs and the position of each pair among them, from _dedup().
+    :return: a dict mapping each metric name to CorpusScore.
+    """
+    unique_pairs, pair_positions = pairs
+    starts = range(0, len(unique_pairs), chunksize)
+    sentence_chunks = map_fn(
+        _score_chunk,
+        [[summary for summary, _ in unique_pairs[i : i + chunksize]] for i in starts],
+        [[reference for _, reference in unique_pairs[i : i + chunksize]] for i in starts],
+        itertools.repeat(config, len(starts)),
+    )
+    union_names = [name for name in config.names if name in _MAKE_UNION]
+    union_chunks = []
+    if union_names:
+        union_references, union_positions = _dedup(references, _sentence_key)
+        union_starts = range(0, len(union_references), chunksize)
+        union_chunks = map_fn(
+            _union_chunk,
+            [union_references[i : i + chunksize] for i in union_starts],
+            itertools.repeat(union_names, len(union_starts)),
+            *union_args
+        )
+
+    system_scores = {}
+    if config.orders:
+        multi_score = rouge_n_multi_summary_level(
+            summaries, references, config.orders, config.alpha
+        )
+        for n, score in multi_score.items():
+            system_scores[_ROUGE_N_PREFIX + str(n)] = score
+    for name in config.names:
+        if name in _SUMMARY_LEVEL:
+            system_scores[name] = _system_score(name, summaries, references, None, config)
+
+    sentence_scores = collections.defaultdict(list)
+    for chunk in sentence_chunks:
+        for name, scores in chunk.items():
+            sentence_scores[name].extend(scores)
+    for name, scores in sentence_scores.items():
+        sentence_scores[name] = _scatter(scores, pair_positions)
+
+    unions = collections.defaultdict(list)
+    for chunk in union_chunks:
+        for name, chunk_unions in chunk.items():
+            unions[name].extend(chunk_unions)
+    for name in union_names:
+        system_scores[name] = _system_score(
+            name, summaries, references, _scatter(unions.pop(name, []), union_positions), config
+        )
+
+    return {
+        name: CorpusScore(sentence_scores[name], system_scores[name])
+        for name in system_scores
+    }
+
+
+def score_corpus(
+    summaries,
+    references,
+    metrics=None,
+    workers=None,
+    chunksize=None,
+    alpha=None,
+    weight=None,
+    skip_distance=None,
+):
+    """
+    Score a corpus of sentence pairs with several metrics, sharding the pairs across
+    worker processes. The scores are the same as those of the metric functions.
+
+    The metrics are named like the output files of scripts/rouge_score.py:
+    rouge_n_<n>, rouge_l, rouge_w, rouge_s and rouge_su.
+    The system level score of a metric is its summary level score over the whole corpus.
+    Repeated pairs are only scored once.
+
+    >>> summaries = ['the cat sat'.split(), 'a dog'.split()]
+    >>> references = ['the cat sat down'.split(), 'a big dog'.split()]
+    >>> scores = score_corpus(summaries, references, ['rouge_n_1', 'rouge_l'], workers=1)
+    >>> [score.recall for score in scores['rouge_l'].sentence_scores]
+    [0.75, 0.6666666666666666]
+    >>> scores['rouge_n_1'].system_score.recall
+    0.7142857142857143
+
+    :param summaries: a list of summary sentences.
+    :param references: a list of reference sentences, one per summary.
+    :param metrics: an iterable of metric names. Default is DEFAULT_METRICS.
+    :param workers: int, the number of processes. If 1, everything runs in this process.
+        Default is the number of CPUs.
+    :param chunksize: int, the number of pairs per task.
+        Default is to give each worker DEFAULT_CHUNKS_PER_WORKER tasks.
+    :param alpha: weight on the recall.
+    :param weight: float, the weight factor of ROUGE-W.
+    :param skip_distance: int, the skip distance of ROUGE-S and ROUGE-SU.
+    :return: a dict mapping each metric name to CorpusScore, the list of sentence level
+        scores in the order of the pairs and the system level score.
+    :raise ValueError: if the corpora differ in length or a metric name is unknown.
+    """
+    if len(summaries) != len(references):
+        raise ValueError("summaries and references must have the same length")
+    if metrics is None:
+        metrics = DEFAULT_METRICS
+    metrics = list(dict.fromkeys(metrics))
+    config = _make_config(metrics, alpha, weight, skip_distance)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pairs = _dedup(zip(summaries, references), _pair_key)
+    if chunksize is None:
+        chunksize = -(-len(pairs[0]) // (workers * DEFAULT_CHUNKS_PER_WORKER)) or 1
+
+    union_summaries = None
+    if any(name in _MAKE_UNION for name in config.names):
+        union_summaries = _dedup(summaries, _sentence_key)
+
+    if workers == 1:
+        union_args = (itertools.repeat(union_summaries),)
+        scores = _score_corpus(summaries, references, pairs, config, chunksize, map, union_args)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(union_summaries,)
+        ) as executor:
+            scores = _score_corpus(
+                summaries, references, pairs, config, chunksize, executor.map, ()
+            )
+    return {name: scores[name] for name in metrics}
+
+
+def _chunk_pairs(pairs, chunksize):
+    """
+    Group an iterable of sentence pairs into chunks.
+
+    >>> list(_chunk_pairs([('a', 'b'), ('c', 'd'), ('e', 'f')], 2))
+    [(['a', 'c'], ['b', 'd']), (['e'], ['f'])]
+
+    :param pairs: an iterable of (summary, reference).
+    :param chunksize: int.
+    :return: an iterator of 2-tuples, the summaries and the references of a chunk.
+    """
+    pairs = iter(pairs)
+    while True:
+        chunk = list(itertools.islice(pairs, chunksize))
+        if not chunk:
+            return
+        yield [summary for summary, _ in chunk], [reference for _, reference in chunk]
+
+
+def _bounded_map(executor, fn, args, max_pending):
+    """
+    Like executor.map(fn, *zip(*args)), but only consume args as results are consumed,
+    keeping at most max_pending tasks in flight.
+
+    :param executor: concurrent.futures.Executor.
+    :param fn: the function to call.
+    :param args: an iterable of argument tuples.
+    :param max_pending: int.
+    :return: an iterator of the results in order.
+    """
+    pending = collections.deque()
+    for arg in args:
+        if len(pending) == max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, *arg))
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_sentence_scores(
+    pairs,
+    metrics=None,
+    workers=None,
+    chunksize=None,
+    alpha=None,
+    weight=None,
+    skip_distance=None,
+):
+    """
+    Stream the sentence level scores of an iterable of sentence pairs.
+
+    Unlike score_corpus(), pairs are consumed lazily and at most a few chunks per worker
+    are in memory at a time, so that the corpus does not have to fit in memory.
+    There are no system level scores, since the summary level scores need the whole corpus.
+
+    >>> pairs = [('the cat sat'.split(), 'the cat sat down'.split())]
+    >>> [scores['rouge_l'].recall for scores in iter_sentence_scores(pairs, ['rouge_l'], workers=1)]
+    [0.75]
+
+    :param pairs: an iterable of (summary sentence, reference sentence).
+    :param metrics: an iterable of metric names. See score_corpus().
+    :param workers: int, the number of processes. If 1, everything runs in this process.
+        Default is the number of CPUs.
+    :param chunksize: int, the number of pairs per task. Default is DEFAULT_STREAM_CHUNKSIZE.
+    :param alpha: weight on the recall.
+    :param weight: float, the weight factor of ROUGE-W.
+    :param skip_distance: int, the skip distance of ROUGE-S and ROUGE-SU.
+    :return: an iterator of dicts, mapping each metric name to the RougeScore of a pair.
+    :raise ValueError: if a metric name is unknown.
+    """
+    return _iter_chunks(
+        _score_chunk, pairs, metrics, workers, chunksize, alpha, weight, skip_distance
+    )
+
+
+def iter_sentence_stats(
+    pairs,
+    metrics=None,
+    workers=None,
+    chunksize=None,
+    weight=None,
+    skip_distance=None,
+):
+    """
+    Stream the stats of the sentence level scores of an iterable of sentence pairs,
+    like iter_sentence_scores(). The stats can be pooled in constant memory, or added to
+    RougeAccumulator, and score_from_stats() turns them into the scores.
+
+    >>> pairs = [('the cat sat'.split(), 'the cat sat down'.split())]
+    >>> [stats['rouge_l'] for stats in iter_sentence_stats(pairs, ['rouge_l'], workers=1)]
+    [RougeStats(hits=3, ref_total=4, cand_total=3, weight=None)]
+
+    :param pairs: an iterable of (summary sentence, reference sentence).
+    :param metrics: an iterable of metric names. See score_corpus().
+    :param workers: int, the number of processes. See iter_sentence_scores().
+    :param chunksize: int, the number of pairs per task. Default is DEFAULT_STREAM_CHUNKSIZE.
+    :param weight: float, the weight factor of ROUGE-W.
+    :param skip_distance: int, the skip distance of ROUGE-S and ROUGE-SU.
+    :return: an iterator of dicts, mapping each metric name to the RougeStats of a pair.
+    :raise ValueError: if a metric name is unknown.
+    """
+    return _iter_chunks(
+        _stats_chunk, pairs, metrics, workers, chunksize, None, weight, skip_distance
+    )
+
+
+def _iter_chunks(chunk_fn, pairs, metrics, workers, chunksize, alpha, weight, skip_distance):
+    """
+    Stream the results of chunk_fn on the chunks of pairs, pair by pair.
+
+    :param chunk_fn: _score_chunk or _stats_chunk.
+    :return: an iterator of dicts, mapping each metric name to the result of a pair.
+    :raise ValueError: if a metric name is unknown.
+    """
+    if metrics is None:
+        metrics = DEFAULT_METRICS
+    metrics = list(dict.fromkeys(metrics))
+    config = _make_config(metrics, alpha, weight, skip_distance)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = DEFAULT_STREAM_CHUNKSIZE
+
+    args = (
+        (summaries, references, config)
+        for summaries, references in _chunk_pairs(pairs, chunksize)
+    )
+    if workers == 1:
+        yield from _iter_chunk_results(itertools.starmap(chunk_fn, args), metrics)
+        return
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        chunks = _bounded_map(
+            executor, chunk_fn, args, workers * DEFAULT_PENDING_PER_WORKER
+        )
+        yield from _iter_chunk_results(chunks, metrics)
+
+
+def _iter_chunk_results(chunks, metrics):
+    """
+    Turn the results of _score_chunk() or _stats_chunk() into those of each pair.
+
+    :param chunks: an iterable of dicts, mapping each metric name to a list of results.
+    :param metrics: a list of metric names.
+    :return: an iterator of dicts, mapping each metric name to a result.
+    """
+    for chunk in chunks:
+        for results in zip(*(chunk[name] for name in metrics)):
+            yield dict(zip(metrics, results))
@@ -24,12 +24,18 @@
 Yet another Python implementation of ROUGE.
 """
 
+import array
 import collections
+import functools
 import itertools
 import math
 import logging
+import random
+
+from rouge.vocabulary import TYPECODE
 
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 __all__ = [
     "RougeScore",
@@ -37,17 +43,61 @@ __all__ = [
     "rouge_l_sentence_level",
     "rouge_l_summary_level",
     "rouge_n_summary_level",
+    "rouge_n_multi_sentence_level",
+    "rouge_n_multi_summary_level",
     "rouge_w_sentence_level",
     "rouge_w_summary_level",
     "rouge_s_sentence_level",
     "rouge_s_summary_level",
+    "rouge_su_sentence_level",
+    "rouge_su_summary_level",
+    "ReferenceIndex",
+    "rouge_n_sentence_level_multi_reference",
+    "rouge_n_summary_level_multi_reference",
+    "rouge_l_sentence_level_multi_reference",
+    "rouge_l_summary_level_multi_reference",
+    "rouge_w_sentence_level_multi_reference",
+    "rouge_w_summary_level_multi_reference",
+    "rouge_s_sentence_level_multi_reference",
+    "rouge_s_summary_level_multi_reference",
+    "rouge_su_sentence_level_multi_reference",
+    "rouge_su_summary_level_multi_reference",
+    "MULTI_REFERENCE_MODES",
+    "RougeStats",
+    "score_from_stats",
+    "rouge_n_sentence_level_stats",
+    "rouge_n_summary_level_stats",
+    "rouge_n_multi_sentence_level_stats",
+    "rouge_n_multi_summary_level_stats",
+    "rouge_l_sentence_level_stats",
+    "rouge_l_summary_level_stats",
+    "rouge_w_sentence_level_stats",
+    "rouge_w_summary_level_stats",
+    "rouge_s_sentence_level_stats",
+    "rouge_s_summary_level_stats",
+    "rouge_su_sentence_level_stats",
+    "rouge_su_summary_level_stats",
+    "Engine",
+    "VerifyingEngine",
+    "Divergence",
+    "get_engine",
+    "set_engine",
+    "register_engine",
 ]
 
 RougeScore = collections.namedtuple("RougeScore", "recall precision f1_measure")
+# The sufficient statistics of a score: the hits and the totals of both sides they are divided by.
+# For ROUGE-W they are weighted and weight is the weight factor, otherwise weight is None.
+RougeStats = collections.namedtuple(
+    "RougeStats", "hits ref_total cand_total weight", defaults=(None,)
+)
 
 DEFAULT_ALPHA = 0.9
 DEFAULT_WEIGHT_FACTOR = 1.2
 DEFAULT_SKIP_DISTANCE = 4
+DEFAULT_NGRAM_ORDERS = (1, 2, 3, 4)
+# Above this number of cells, LCS elements are found in linear space.
+DEFAULT_HIRSCHBERG_THRESHOLD = 1 << 24
 
 
 ###############################
@@ -73,7 +123,7 @@ def _num_ngrams(words, n):
 
 def _get_ngram(words, n):
     """
-    Return a generator on all nth grams of words.
+    Return an iterator on all nth grams of words.
 
     >>> list(_get_ngram([1, 2, 3], 2))
     [(1, 2), (2, 3)]
@@ -82,14 +132,81 @@ def _get_ngram(words, n):
 
     :param words: a list of tokens.
     :param n: int.
-    :return: a generator
+    :return: an iterator.
+    """
+    # Zipping the shifted sequences builds the tuples without slicing each n-gram.
+    return zip(*(words[k:] for k in range(n)))
+
+
+def _is_interned(words):
+    """
+    Tell whether words are interned token ids, as given by Vocabulary.encode().
+
+    >>> _is_interned(array.array('i', [1, 2]))
+    True
+    >>> _is_interned([1, 2])
+    False
+
+    :param words: a sequence of tokens.
+    :return: bool.
+    """
+    return isinstance(words, array.array)
+
+
+def _is_packed(summary_sentence, reference_sentence):
+    """
+    Tell whether the n-grams of a pair are packed into keys, which they are if both sides
+    are interned. Packed keys hold the raw bytes of the ids, so both sides must have the type
+    code of Vocabulary.encode(), or they would share no key.
+
+    >>> _is_packed(array.array(TYPECODE, [1]), array.array(TYPECODE, [1, 2]))
+    True
+    >>> _is_packed(array.array(TYPECODE, [1]), array.array('b', [1]))
+    Traceback (most recent call last):
+    ...
+    TypeError: interned sentences must be arrays of type code 'i', not 'b'
+
+    :param summary_sentence: a sentence.
+    :param reference_sentence: a sentence.
+    :return: bool.
+    :raise TypeError: if a side is an array of another type code.
+    """
+    if not (_is_interned(summary_sentence) and _is_interned(reference_sentence)):
+        return False
+    for sentence in (summary_sentence, reference_sentence):
+        if sentence.typecode != TYPECODE:
+            raise TypeError(
+                "interned sentences must be arrays of type code %r, not %r"
+                % (TYPECODE, sentence.typecode)
+            )
+    return True
+
+
+def _get_packed_ngram(ids, n):
+    """
+    Return an iterator on all nth grams of interned ids, each packed into a single key.
+    A unigram is the id itself and a longer n-gram is the raw bytes of its ids.
+    This is cheaper to build and hash than a tuple.
+
+    >>> ids = array.array('i', [1, 2, 3])
+    >>> list(_get_packed_ngram(ids, 1))
+    [1, 2, 3]
+    >>> [array.array('i', key).tolist() for key in _get_packed_ngram(ids, 2)]
+    [[1, 2], [2, 3]]
+
+    :param ids: an array of token ids.
+    :param n: int.
+    :return: an iterator.
     """
-    for i in range(_num_ngrams(words, n)):
-        n_gram = words[i : i + n]
-        yield tuple(n_gram)
+    if n == 1:
+        return iter(ids)
+    width = ids.itemsize
+    size = width * n
+    buffer = ids.tobytes()
+    return (buffer[i : i + size] for i in range(0, len(buffer) - size + width, width))
 
 
-def _count_ngrams(words, n):
+def _count_ngrams(words, n, packed=False):
     """
     Collect nth gram of words into a Counter.
 
@@ -97,11 +214,16 @@ def _count_ngrams(words, n):
     Counter({(1, 1): 1, (1, 2): 1, (2, 2): 1})
     >>> _count_ngrams([1, 2, 3], 2)
     Counter({(1, 2): 1, (2, 3): 1})
+    >>> _count_ngrams(array.array('i', [1, 1, 2]), 1, packed=True)
+    Counter({1: 2, 2: 1})
 
     :param words: a list of tokens.
     :param n: N for ngrams.
+    :param packed: bool. If true, words must be interned and the n-grams are packed.
     :return: a Counter.
     """
+    if packed:
+        return collections.Counter(_get_packed_ngram(words, n))
     return collections.Counter(_get_ngram(words, n))
 
 
@@ -159,6 +281,28 @@ def _f1_measure(numerator, r_denominator, p_denominator, alpha=None):
     return RougeScore(recall, precision, f1)
 
 
+def score_from_stats(stats, alpha=None):
+    """
+    Compute a score from its sufficient statistics, for any alpha.
+
+    >>> stats = rouge_n_sentence_level_stats('abc', 'abd', 1)
+    >>> stats
+    RougeStats(hits=2, ref_total=3, cand_total=3, weight=None)
+    >>> score_from_stats(stats, alpha=0.9) == rouge_n_sentence_level('abc', 'abd', 1, alpha=0.9)
+    True
+
+    :param stats: RougeStats.
+    :param alpha: weight on the recall (default 0.5).
+    :return: a 3-tuple, recall, precision and f1 measure.
+    :raise ValueError: If alpha is not between [0, 1].
+    """
+    if stats.weight is None:
+        return _f1_measure(stats.hits, stats.ref_total, stats.cand_total, alpha)
+    return _wlcs_f1_measure(
+        stats.hits, stats.ref_total, stats.cand_total, stats.weight, alpha
+    )
+
+
 def _clipped_ngram_count(summary_ngrams, reference_ngrams):
     """
     For each instance of ngram that appear in both summary_ngrams and reference_ngrams,
@@ -176,12 +320,23 @@ def _clipped_ngram_count(summary_ngrams, reference_ngrams):
     >>> _clipped_ngram_count(summary_ngrams, reference_ngrams)
     4
 
+    This is the total of summary_ngrams & reference_ngrams, without building it.
+
     :param summary_ngrams: a Counter.
     :param reference_ngrams: a Counter
     :return: the clipped count.
     """
-    overlap = summary_ngrams & reference_ngrams
-    return sum(overlap.values())
+    if len(summary_ngrams) > len(reference_ngrams):
+        summary_ngrams, reference_ngrams = reference_ngrams, summary_ngrams
+    get = reference_ngrams.get
+    total = 0
+    for ngram, count in summary_ngrams.items():
+        other = get(ngram, 0)
+        clipped = count if count < other else other
+        # Like Counter.__and__, only positive counts are kept.
+        if clipped > 0:
+            total += clipped
+    return total
 
 
 def rouge_n_sentence_level(summary_sentence, reference_sentence, n, alpha=None):
@@ -189,18 +344,36 @@ def rouge_n_sentence_level(summary_sentence, reference_sentence, n, alpha=None):
     Calculate ROUGE-N on sentence level.
 
     :param summary_sentence: a sentence.
-    :param reference_sentence: a sentence.
+    :param reference_sentence: a sentence, or a ReferenceIndex of it.
     :param n: n for ngram.
     :param alpha: weight on the recall (default 0.5).
     :return: a 3-tuple, recall, precision and f1 measure.
     """
-    summary_ngrams = _count_ngrams(summary_sentence, n)
-    reference_ngrams = _count_ngrams(reference_sentence, n)
+    stats = rouge_n_sentence_level_stats(summary_sentence, reference_sentence, n)
+    return score_from_stats(stats, alpha)
+
+
+def rouge_n_sentence_level_stats(summary_sentence, reference_sentence, n):
+    """
+    Count the sufficient statistics of sentence level ROUGE-N.
+
+    :param summary_sentence: a sentence.
+    :param reference_sentence: a sentence, or a ReferenceIndex of it.
+    :param n: n for ngram.
+    :return: RougeStats.
+    """
+    index, reference_sentence = _sentence_index(reference_sentence)
+    packed = _is_packed(summary_sentence, reference_sentence)
+    summary_ngrams = _count_ngrams(summary_sentence, n, packed)
+    if index is None:
+        reference_ngrams = _count_ngrams(reference_sentence, n, packed)
+    else:
+        reference_ngrams = index.ngram_counts(n, packed)
     total_matches = _clipped_ngram_count(summary_ngrams, reference_ngrams)
 
     recall_denominator = _num_ngrams(reference_sentence, n)
     precision_denominator = _num_ngrams(summary_sentence, n)
-    return _f1_measure(total_matches, recall_denominator, precision_denominator, alpha)
+    return RougeStats(total_matches, recall_denominator, precision_denominator)
 
 
 def _flatten_sentences(sentences):
@@ -213,10 +386,15 @@ def _flatten_sentences(sentences):
     >>> _flatten_sentences([s1, s2])
     ['the', 'gunman', 'kill', 'police', 'police', 'killed', 'the', 'gunman']
 
+    Interned sentences are flattened into an array of the same type.
+
     :param sentences: a list of sentences.
     :return: a list of tokens.
     """
-    return list(itertools.chain.from_iterable(sentences))
+    tokens = list(itertools.chain.from_iterable(sentences))
+    if sentences and all(_is_interned(sentence) for sentence in sentences):
+        return array.array(sentences[0].typecode, tokens)
+    return tokens
 
 
 def rouge_n_summary_level(summary_sentences, reference_sentences, n, alpha=None):
@@ -224,15 +402,131 @@ def rouge_n_summary_level(summary_sentences, reference_sentences, n, alpha=None)
     Calculate summary level ROUGE-N.
     The sentences are first flatten and then feed to rouge_n_sentence_level.
     :param summary_sentences: a list of sentences.
-    :param reference_sentences: a list of sentences.
+    :param reference_sentences: a list of sentences, or a ReferenceIndex of them.
     :param n: n for ngram.
     :param alpha: weight on the recall (default 0.5).
     :return: a 3-tuple, recall, precision and f1 measure.
     """
+    stats = rouge_n_summary_level_stats(summary_sentences, reference_sentences, n)
+    return score_from_stats(stats, alpha)
+
+
+def rouge_n_summary_level_stats(summary_sentences, reference_sentences, n):
+    """
+    Count the sufficient statistics of summary level ROUGE-N.
+
+    :param summary_sentences: a list of sentences.
+    :param reference_sentences: a list of sentences, or a ReferenceIndex of them.
+    :param n: n for ngram.
+    :return: RougeStats.
+    """
     summary_sentences = _flatten_sentences(summary_sentences)
-    reference_sentences = _flatten_sentences(reference_sentences)
+    reference = _index_of_sentences(reference_sentences).flattened()
+
+    return rouge_n_sentence_level_stats(summary_sentences, reference, n)
+
+
+def _count_ngrams_multi(words, orders, packed=False):
+    """
+    Collect the n-grams of several orders of words into Counters, one per order.
+
+    >>> counts = _count_ngrams_multi([1, 2, 1, 2], (1, 2))
+    >>> counts[1]
+    Counter({(1,): 2, (2,): 2})
+    >>> counts[2]
+    Counter({(1, 2): 2, (2, 1): 1})
+
+    :param words: a list of tokens.
+    :param orders: an iterable of N for ngrams.
+    :param packed: bool. If true, words must be interned and the n-grams are packed.
+    :return: a dict mapping each order to a Counter.
+    """
+    return {n: _count_ngrams(words, n, packed) for n in orders}
+
+
+def rouge_n_multi_sentence_level(
+    summary_sentence, reference_sentence, orders=None, alpha=None
+):
+    """
+    Calculate sentence level ROUGE-N for several n at once.
+    This is the same as calling rouge_n_sentence_level() for each n, but the inputs
+    are only prepared once, which matters when scoring a large corpus.
+
+    >>> summary = 'the gunman police killed'.split()
+    >>> reference = 'the police killed the gunman'.split()
+    >>> scores = rouge_n_multi_sentence_level(summary, reference, orders=(1, 2))
+    >>> scores[2] == rouge_n_sentence_level(summary, reference, 2)
+    True
+
+    :param summary_sentence: a sentence.
+    :param reference_sentence: a sentence, or a ReferenceIndex of it.
+    :param orders: an iterable of n for ngram. Default is DEFAULT_NGRAM_ORDERS.
+    :param alpha: weight on the recall (default 0.5).
+    :return: a dict mapping each n to a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = rouge_n_multi_sentence_level_stats(summary_sentence, reference_sentence, orders)
+    return {n: score_from_stats(order_stats, alpha) for n, order_stats in stats.items()}
 
-    return rouge_n_sentence_level(summary_sentences, reference_sentences, n, alpha)
+
+def rouge_n_multi_sentence_level_stats(summary_sentence, reference_sentence, orders=None):
+    """
+    Count the sufficient statistics of sentence level ROUGE-N for several n at once.
+
+    :param summary_sentence: a sentence.
+    :param reference_sentence: a sentence, or a ReferenceIndex of it.
+    :param orders: an iterable of n for ngram. Default is DEFAULT_NGRAM_ORDERS.
+    :return: a dict mapping each n to RougeStats.
+    """
+    if orders is None:
+        orders = DEFAULT_NGRAM_ORDERS
+    index, reference_sentence = _sentence_index(reference_sentence)
+    packed = _is_packed(summary_sentence, reference_sentence)
+    summary_ngrams = _count_ngrams_multi(summary_sentence, orders, packed)
+    if index is None:
+        reference_ngrams = _count_ngrams_multi(reference_sentence, orders, packed)
+    else:
+        reference_ngrams = {n: index.ngram_counts(n, packed) for n in orders}
+
+    stats = {}
+    for n in orders:
+        total_matches = _clipped_ngram_count(summary_ngrams[n], reference_ngrams[n])
+        recall_denominator = _num_ngrams(reference_sentence, n)
+        precision_denominator = _num_ngrams(summary_sentence, n)
+        stats[n] = RougeStats(total_matches, recall_denominator, precision_denominator)
+    return stats
+
+
+def rouge_n_multi_summary_level(
+    summary_sentences, reference_sentences, orders=None, alpha=None
+):
+    """
+    Calculate summary level ROUGE-N for several n at once.
+    The sentences are first flatten and then feed to rouge_n_multi_sentence_level.
+
+    :param summary_sentences: a list of sentences.
+    :param reference_sentences: a list of sentences, or a ReferenceIndex of them.
+    :param orders: an iterable of n for ngram. Default is DEFAULT_NGRAM_ORDERS.
+    :param alpha: weight on the recall (default 0.5).
+    :return: a dict mapping each n to a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = rouge_n_multi_summary_level_stats(summary_sentences, reference_sentences, orders)
+    return {n: score_from_stats(order_stats, alpha) for n, order_stats in stats.items()}
+
+
+def rouge_n_multi_summary_level_stats(summary_sentences, reference_sentences, orders=None):
+    """
+    Count the sufficient statistics of summary level ROUGE-N for several n at once.
+
+    :param summary_sentences: a list of sentences.
+    :param reference_sentences: a list of sentences, or a ReferenceIndex of them.
+    :param orders: an iterable of n for ngram. Default is DEFAULT_NGRAM_ORDERS.
+    :return: a dict mapping each n to RougeStats.
+    """
+    return rouge_n_multi_sentence_level_stats(
+        _flatten_sentences(summary_sentences),
+        _index_of_sentences(reference_sentences).flattened(),
+        orders,
+    )
 
 
 ###############################
@@ -240,12 +534,53 @@ def rouge_n_summary_level(summary_sentences, reference_sentences, n, alpha=None)
 ###############################
 
 
-def _lcs_length(x, y):
+def _lcs_match_masks(y):
+    """
+    Compute the match masks of y for the bit-parallel LCS algorithm.
+    The mask of a token has its jth bit set iff y[j] is that token.
+
+    >>> masks = _lcs_match_masks('abca')
+    >>> bin(masks['a']), bin(masks['b']), bin(masks['c'])
+    ('0b1001', '0b10', '0b100')
+
+    :param y: a sequence.
+    :return: a dict mapping tokens to int masks.
+    """
+    masks = {}
+    for j, token in enumerate(y):
+        masks[token] = masks.get(token, 0) | 1 << j
+    return masks
+
+
+def _lcs_length_from_masks(x, masks, m):
+    """
+    Compute the length of the LCS between x and a sequence y of length m
+    whose match masks are given.
+
+    This is the bit-parallel algorithm of Allison-Dix and Hyyro. Each row of the DP
+    table is encoded in the bits of a single int ``v``, where a zero bit marks a column
+    at which the LCS length increases. Each token of x updates the whole row with a
+    handful of big-int operations, so the cost is O(n * ceil(m / w)) for word size w.
+
+    :param x: a sequence.
+    :param masks: the match masks of y, as returned by _lcs_match_masks().
+    :param m: the length of y.
+    :return: Length of LCS between x and y.
+    """
+    full = (1 << m) - 1
+    v = full
+    for token in x:
+        u = v & masks.get(token, 0)
+        v = ((v + u) | (v - u)) & full
+    return m - bin(v).count("1")
+
+
+def _lcs_length(x, y, masks=None):
     """
     Computes the length of the longest common subsequence (lcs) between two
-    strings. The implementation below uses a DP programming algorithm and runs
-    in O(nm) time where n = len(x) and m = len(y).
-    Source: http://www.algorithmist.com/index.php/Longest_Common_Subsequence
+    strings. The implementation uses a bit-parallel DP algorithm, which runs
+    in O(n * ceil(m / w)) time where n = len(x), m = len(y) and w is the word size.
+    See _lcs_length_from_masks() for details.
 
     >>> _lcs_length('ABCDE', 'CD')
     2
@@ -254,108 +589,290 @@ def _lcs_length(x, y):
 
     :param x: sequence of words
     :param y: sequence of words
+    :param masks: the match masks of y, if they are cached. Default is to make them.
     :return: Length of LCS between x and y
     """
-    n, m = len(x), len(y)
-    len_table = {}
-
-    for i in range(n + 1):
-        for j in range(m + 1):
-            if i == 0 or j == 0:
-                len_table[i, j] = 0
-            elif x[i - 1] == y[j - 1]:
-                len_table[i, j] = len_table[i - 1, j - 1] + 1
-            else:
-                len_table[i, j] = max(len_table[i - 1, j], len_table[i, j - 1])
-
-    return len_table[n, m]
+    if masks is None:
+        masks = _lcs_match_masks(y)
+    return _lcs_length_from_masks(x, masks, len(y))
 
 
-def rouge_l_sentence_level(summary_sentence, reference_sentence, alpha=None):
+def rouge_l_sentence_level(summary_sentence, reference_sentence, alpha=None, engine=None):
     """
     Calculate sentence level ROUGE-L.
 
     :param summary_sentence: a sentence.
-    :param reference_sentence: a sentence.
+    :param reference_sentence: a sentence, or a ReferenceIndex of it.
     :param alpha: weight on the recall (default 0.5).
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
     :return: a 3-tuple, recall, precision and f1 measure.
     """
-    lcs_length = _lcs_length(summary_sentence, reference_sentence)
+    stats = rouge_l_sentence_level_stats(summary_sentence, reference_sentence, engine)
+    return score_from_stats(stats, alpha)
+
+
+def rouge_l_sentence_level_stats(summary_sentence, reference_sentence, engine=None):
+    """
+    Count the sufficient statistics of sentence level ROUGE-L.
+
+    :param summary_sentence: a sentence.
+    :param reference_sentence: a sentence, or a ReferenceIndex of it.
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
+    :return: RougeStats.
+    """
+    return get_engine(engine).run(
+        _rouge_l_sentence_level_stats, summary_sentence, reference_sentence
+    )
+
+
+def _rouge_l_sentence_level_stats(kernels, summary_sentence, reference_sentence):
+    """
+    Like rouge_l_sentence_level_stats(), with the given kernels.
+
+    :param kernels: Engine.
+    :param summary_sentence: a sentence.
+    :param reference_sentence: a sentence, or a ReferenceIndex of it.
+    :return: RougeStats.
+    """
+    index, reference_sentence = _sentence_index(reference_sentence)
+    masks = None if index is None else index.lcs_masks()
+    lcs_length = kernels.lcs_length(summary_sentence, reference_sentence, masks)
     r_denominator = len(reference_sentence)
     p_denominator = len(summary_sentence)
-    return _f1_measure(lcs_length, r_denominator, p_denominator, alpha)
+    return RougeStats(lcs_length, r_denominator, p_denominator)
+
+
+# Values of the trace table.
+# _TRACE_LEFT is zero so that a fresh bytearray already says "go left".
+_TRACE_LEFT = 0
+_TRACE_DIAGONAL = 1
+_TRACE_UP = 2
 
 
 def _compute_lcs_elements(trace, x, y):
     """
     Compute the elements of a LCS given a pre-computed trace table.
-    In this table, the key is (i, j) coordinate drawn from x and y, and the value is:
+    The table is a bytearray of len(x) * len(y) cells in row-major order. The cell of
+    the (i, j) coordinate drawn from x and y (both starting from 1) is at (i - 1) * len(y) + j - 1,
+    and its value is one of:
 
-    - 'd': goes diagonal.
-    - 'u': goes up.
-    - 'l': goes left.
+    - _TRACE_DIAGONAL: goes diagonal.
+    - _TRACE_UP: goes up.
+    - _TRACE_LEFT: goes left.
 
-    :param trace: dict. A trace table.
-    :param x:
-    :param y:
-    :return:
+    :param trace: bytearray. A trace table.
+    :param x: a sequence.
+    :param y: a sequence.
+    :return: a set of index pairs.
     """
-    i, j = len(x), len(y)
+    m = len(y)
+    i, j = len(x), m
     elements = set()
     while i != 0 and j != 0:
-        if trace[i, j] == "d":
+        direction = trace[(i - 1) * m + j - 1]
+        if direction == _TRACE_DIAGONAL:
             i -= 1
             j -= 1
             elements.add((i, j))
-        elif trace[i, j] == "u":
+        elif direction == _TRACE_UP:
             i -= 1
         else:
             j -= 1
     return elements
 
 
-def _lcs_elements(x, y):
+def _lcs_row(token, y, prev_row, first, trace, offset):
+    """
+    Compute a row of the LCS length table from the previous one.
+
+    A row (and the first cell of it) is a tuple of the DP states, which is just the
+    length for LCS. See _wlcs_row() for a row of more than one state.
+    The direction of each cell is written to trace[offset:offset + len(y)].
+
+    :param token: the token of x of this row.
+    :param y: a sequence.
+    :param prev_row: tuple of a list. The previous row.
+    :param first: tuple of an int. The first cell of this row.
+    :param trace: bytearray. The trace table to write.
+    :param offset: int. Where the row starts in the trace table.
+    :return: tuple of a list. This row.
+    """
+    (prev_len,) = prev_row
+    (left,) = first
+    row = [left]
+    for j, y_j in enumerate(y):
+        if token == y_j:
+            left = prev_len[j] + 1
+            trace[offset + j] = _TRACE_DIAGONAL
+        elif prev_len[j + 1] > left:
+            left = prev_len[j + 1]
+            trace[offset + j] = _TRACE_UP
+        # Otherwise go left, which is what the cell already says.
+        row.append(left)
+    return (row,)
+
+
+def _slice_states(states, start, stop=None):
+    """
+    Slice each of a tuple of state lists.
+
+    >>> _slice_states(([0, 1, 2], [3, 4, 5]), 1)
+    ([1, 2], [4, 5])
+
+    :param states: a tuple of lists.
+    :param start: int.
+    :param stop: int.
+    :return: a tuple of lists.
+    """
+    return tuple(column[start:stop] for column in states)
+
+
+def _trace_elements(row_fn, x, y, top, left):
+    """
+    Compute the LCS elements of x and y by tracing back a full trace table.
+    The DP starts from the given boundaries, so this also works on a block of a larger table.
+
+    :param row_fn: the row kernel, like _lcs_row().
+    :param x: a sequence.
+    :param y: a sequence.
+    :param top: tuple of lists of len(y) + 1. The row above the block.
+    :param left: tuple of lists of len(x) + 1. The column left to the block.
+    :return: a set of index pairs.
+    """
+    m = len(y)
+    trace = bytearray(len(x) * m)
+    row = top
+    for i, token in enumerate(x):
+        first = tuple(column[i + 1] for column in left)
+        row = row_fn(token, y, row, first, trace, i * m)
+    return _compute_lcs_elements(trace, x, y)
+
+
+def _hirschberg_elements(row_fn, x, y, top, left, threshold):
+    """
+    Compute the same LCS elements as _trace_elements() in linear space.
+
+    This is a variant of Hirschberg's divide and conquer algorithm. The rows of the block
+    are split in halves. While computing the lower half, each cell remembers where the
+    trace-back path starting from it leaves the lower half, either at the middle row or at the
+    left boundary. The path from the last cell is then recovered by solving the two smaller
+    blocks it passes through. Unlike the textbook algorithm, a block is solved with the exact
+    boundaries of the whole table, so the tie breaking and hence the result are the same as
+    tracing back the full table.
+
+    Blocks of no more than threshold cells are solved by _trace_elements().
+
+    :param row_fn: the row kernel, like _lcs_row().
+    :param x: a sequence.
+    :param y: a sequence.
+    :param top: tuple of lists of len(y) + 1. The row above the block.
+    :param left: tuple of lists of len(x) + 1. The column left to the block.
+    :param threshold: int. The max number of cells to trace back directly.
+    :return: a set of index pairs.
+    """
+    n, m = len(x), len(y)
+    if n * m <= threshold or n < 2:
+        return _trace_elements(row_fn, x, y, top, left)
+
+    mid = n // 2
+    scratch = bytearray(m)
+    row = top
+    for i in range(mid):
+        first = tuple(column[i + 1] for column in left)
+        row = row_fn(x[i], y, row, first, scratch, 0)
+    mid_row = row
+
+    # A cell of the middle row is where the path leaves, labelled by its column j.
+    # A cell (i, 0) of the left boundary is labelled by -i.
+    exits = list(range(m + 1))
+    for i in range(mid, n):
+        first = tuple(column[i + 1] for column in left)
+        trace = bytearray(m)
+        row = row_fn(x[i], y, row, first, trace, 0)
+        next_exits = [-(i + 1)]
+        for j in range(m):
+            if trace[j] == _TRACE_DIAGONAL:
+                next_exits.append(exits[j])
+            elif trace[j] == _TRACE_UP:
+                next_exits.append(exits[j + 1])
+            else:
+                next_exits.append(next_exits[j])
+        exits = next_exits
+
+    split = exits[m]
+    if split < 0:
+        # The path never reaches the middle row.
+        return {
+            (i + mid, j)
+            for i, j in _hirschberg_elements(
+                row_fn, x[mid:], y, mid_row, _slice_states(left, mid), threshold
+            )
+        }
+
+    # Recover the left boundary of the lower right block, column split of the lower half.
+    split_left = tuple([column[split]] for column in mid_row)
+    row = _slice_states(mid_row, 0, split + 1)
+    for i in range(mid, n):
+        first = tuple(column[i + 1] for column in left)
+        row = row_fn(x[i], y[:split], row, first, scratch, 0)
+        for column, states in zip(split_left, row):
+            column.append(states[split])
+
+    elements = _hirschberg_elements(
+        row_fn,
+        x[:mid],
+        y[:split],
+        _slice_states(top, 0, split + 1),
+        _slice_states(left, 0, mid + 1),
+        threshold,
+    )
+    elements.update(
+        (i + mid, j + split)
+        for i, j in _hirschberg_elements(
+            row_fn,
+            x[mid:],
+            y[split:],
+            _slice_states(mid_row, split),
+            split_left,
+            threshold,
+        )
+    )
+    return elements
+
+
+def _lcs_elements(x, y, threshold=None):
     """
     Compute the index pairs that make up a LCS of x and y.
     Return a set of 2-tuple, t. t[0] and t[1] are indices drawn from x, y respectively.
     The actual sequence can be constructed from this set, given all the indices to the value
     known.
 
+    Only two rows of the length table are kept at any time. The trace table takes
+    one byte per cell. If there are more than threshold cells, a linear space algorithm
+    is used instead. See _hirschberg_elements().
+
     >>> _lcs_elements('ab', 'bc')
     {(1, 0)}
     >>> _lcs_elements('a', 'd')
     set()
     >>> _lcs_elements('abc', 'abc')
     {(0, 0), (1, 1), (2, 2)}
+    >>> _lcs_elements('abcab', 'bacba', threshold=0) == _lcs_elements('abcab', 'bacba')
+    True
 
     :param x: a sequence.
     :param y: a sequence.
+    :param threshold: int. Default is DEFAULT_HIRSCHBERG_THRESHOLD.
     :return: a set.
     """
+    if threshold is None:
+        threshold = DEFAULT_HIRSCHBERG_THRESHOLD
+    top = ([0] * (len(y) + 1),)
+    left = ([0] * (len(x) + 1),)
+    return _hirschberg_elements(_lcs_row, x, y, top, left, threshold)
 
-    n, m = len(x), len(y)
-    len_table = {}
-    trace_table = {}
-    for i in range(n + 1):
-        for j in range(m + 1):
-            if i == 0 or j == 0:
-                # Initialize the tables are we do the loop.
-                # This saves us dedicated init code at the cost of some performance.
-                len_table[i, j] = 0
-            elif x[i - 1] == y[j - 1]:
-                len_table[i, j] = len_table[i - 1, j - 1] + 1
-                trace_table[i, j] = "d"  # go diagonal.
-            elif len_table[i - 1, j] > len_table[i, j - 1]:
-                len_table[i, j] = len_table[i - 1, j]
-                trace_table[i, j] = "u"  # go up.
-            else:
-                len_table[i, j] = len_table[i, j - 1]
-                trace_table[i, j] = "l"  # go left.
-
-    return _compute_lcs_elements(trace_table, x, y)
 
-
-def _make_lcs_union(summary_sentences, reference_sentence):
+def _make_lcs_union(summary_sentences, reference_sentence, positions=None, kernels=None):
     """
     Returns LCS_u(r_i, C) which is the union longest common subsequence between
     reference sentence ri and candidate summary C.
@@ -380,14 +897,42 @@ def _make_lcs_union(summary_sentences, reference_sentence):
     >>> [r_i[idx] for idx in union]
     ['w1', 'w2', 'w3', 'w5']
 
+    >>> _make_lcs_union([c1, c2], r_i, positions=[0, 1, 0]) == _make_lcs_union([c1, c2, c1], r_i)
+    True
+
     :param summary_sentences: a list of sentences.
     :param reference_sentence: a sentence.
+    :param positions: if given, summary_sentences are the distinct sentences of the summary,
+        and positions the index of each sentence of the summary among them.
+    :param kernels: Engine. Default is the kernels of the current engine.
     :return: a set whose element is the indices of words of reference_sentence.
     """
+    if kernels is None:
+        kernels = get_engine().kernels
+    return _fold_union(kernels.lcs_elements, summary_sentences, reference_sentence, positions)
+
+
+def _fold_union(elements_fn, summary_sentences, reference_sentence, positions=None):
+    """
+    Fold the reference indices of the elements of each summary sentence into a set.
+    The elements of repeated sentences are computed once, but the set is still built
+    one sentence at a time, since its iteration order depends on how it was built.
+
+    :param elements_fn: _lcs_elements() or _wlcs_elements().
+    :param summary_sentences: a list of sentences.
+    :param reference_sentence: a sentence.
+    :param positions: see _make_lcs_union().
+    :return: set.
+    """
+    indices = (
+        [ref_idx for _, ref_idx in elements_fn(sentence, reference_sentence)]
+        for sentence in summary_sentences
+    )
+    if positions is not None:
+        indices = map(list(indices).__getitem__, positions)
     lcs_union = set()
-    for sentence in summary_sentences:
-        lcs = _lcs_elements(sentence, reference_sentence)
-        lcs_union = lcs_union.union(ref_idx for _, ref_idx in lcs)
+    for sentence_indices in indices:
+        lcs_union = lcs_union.union(sentence_indices)
     return lcs_union
 
 
@@ -407,20 +952,24 @@ def _flatten_and_count_ngrams(sentences, n):
     return _count_ngrams(_flatten_sentences(sentences), n)
 
 
-def rouge_l_summary_level(summary_sentences, reference_sentences, alpha=None):
+def _count_lcs_hits(summary_unigrams, references, lcs_unions):
     """
-    Calculate the summary level ROUGE-L.
-    :param summary_sentences: a list of sentence.
-    :param reference_sentences: a list of sentence.
-    :param alpha: weight on the recall.
-    :return: a 3-tuple, recall, precision and f1 measure.
+    Count the words of the LCS unions of the reference sentences, clipped by the unigram
+    counts of both sides so that the score does not exceed ROUGE-1.
+
+    The unions are consumed in the order of reference_sentences, since clipping makes
+    the count depend on it. Each union is iterated as given.
+
+    :param summary_unigrams: the unigram Counter of the summary, which is used up by clipping.
+    :param references: ReferenceIndex of the reference sentences.
+    :param lcs_unions: an iterable of the LCS union of each reference sentence.
+    :return: int.
     """
-    summary_unigrams = _flatten_and_count_ngrams(summary_sentences, 1)
-    reference_unigrams = _flatten_and_count_ngrams(reference_sentences, 1)
+    # A copy, since the counts are used up by clipping.
+    reference_unigrams = collections.Counter(references.ngram_counts(1))
 
     total_lcs_hits = 0
-    for reference in reference_sentences:
-        lcs_union = _make_lcs_union(summary_sentences, reference)
+    for reference, lcs_union in zip(references.sentences, lcs_unions):
         for word in lcs_union:
             unigram = (reference[word],)
             if (
@@ -432,10 +981,85 @@ def rouge_l_summary_level(summary_sentences, reference_sentences, alpha=None):
                 summary_unigrams[unigram] -= 1
                 reference_unigrams[unigram] -= 1
                 total_lcs_hits += 1
+    return total_lcs_hits
+
+
+def rouge_l_summary_level(summary_sentences, reference_sentences, alpha=None, engine=None):
+    """
+    Calculate the summary level ROUGE-L.
+    :param summary_sentences: a list of sentence.
+    :param reference_sentences: a list of sentence, or a ReferenceIndex of them.
+    :param alpha: weight on the recall.
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = rouge_l_summary_level_stats(summary_sentences, reference_sentences, engine)
+    return score_from_stats(stats, alpha)
+
+
+def rouge_l_summary_level_stats(summary_sentences, reference_sentences, engine=None):
+    """
+    Count the sufficient statistics of summary level ROUGE-L.
+
+    :param summary_sentences: a list of sentence.
+    :param reference_sentences: a list of sentence, or a ReferenceIndex of them.
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
+    :return: RougeStats.
+    """
+    return get_engine(engine).run(
+        _rouge_l_summary_level_stats, summary_sentences, reference_sentences
+    )
+
+
+def _rouge_l_summary_level_stats(kernels, summary_sentences, reference_sentences):
+    """
+    Like rouge_l_summary_level_stats(), with the given kernels.
+
+    :param kernels: Engine.
+    :param summary_sentences: a list of sentence.
+    :param reference_sentences: a list of sentence, or a ReferenceIndex of them.
+    :return: RougeStats.
+    """
+    references = _index_of_sentences(reference_sentences)
+    lcs_unions = (
+        _make_lcs_union(summary_sentences, reference, kernels=kernels)
+        for reference in references.sentences
+    )
+    return _rouge_l_stats_from_unions(summary_sentences, references, lcs_unions)
+
+
+def _rouge_l_from_unions(summary_sentences, reference_sentences, lcs_unions, alpha=None):
+    """
+    Finish the summary level ROUGE-L given the LCS union of each reference sentence,
+    which may have been computed elsewhere.
+
+    :param summary_sentences: a list of sentence.
+    :param reference_sentences: a list of sentence, or a ReferenceIndex of them.
+    :param lcs_unions: an iterable of the LCS union of each reference sentence.
+    :param alpha: weight on the recall.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = _rouge_l_stats_from_unions(summary_sentences, reference_sentences, lcs_unions)
+    return score_from_stats(stats, alpha)
+
+
+def _rouge_l_stats_from_unions(summary_sentences, reference_sentences, lcs_unions):
+    """
+    Like _rouge_l_from_unions(), but return the sufficient statistics.
+
+    :param summary_sentences: a list of sentence.
+    :param reference_sentences: a list of sentence, or a ReferenceIndex of them.
+    :param lcs_unions: an iterable of the LCS union of each reference sentence.
+    :return: RougeStats.
+    """
+    references = _index_of_sentences(reference_sentences)
+    total_lcs_hits = _count_lcs_hits(
+        _flatten_and_count_ngrams(summary_sentences, 1), references, lcs_unions
+    )
 
-    r_denominator = sum(len(sentence) for sentence in reference_sentences)
+    r_denominator = len(references.tokens)
     p_denominator = sum(len(sentence) for sentence in summary_sentences)
-    return _f1_measure(total_lcs_hits, r_denominator, p_denominator, alpha)
+    return RougeStats(total_lcs_hits, r_denominator, p_denominator)
 
 
 ###############################
@@ -472,47 +1096,109 @@ def _weight_fn(x, weight=None, inverse=False):
     return math.pow(x, weight)
 
 
-def _wlcs_elements(x, y, weight=None):
+@functools.lru_cache(maxsize=16)
+def _cached_weight_tables(weight, size):
     """
-    Compute the weighted LCS length.
+    Compute the weight tables of _weight_tables() for exactly size entries.
 
-    The weighted LCS length rewards consecutive LCS sequence by its length.
-    The weight function is so designed that longer consecutive ones get higher score.
+    :param weight: float. Already validated.
+    :param size: int.
+    :return: a 2-tuple of tuples of floats.
+    """
+    powers = tuple(math.pow(k, weight) for k in range(size + 1))
+    increments = tuple(powers[k + 1] - powers[k] for k in range(size))
+    return powers[:size], increments
 
-    :param x: a sequence.
-    :param y: a sequence.
-    :param weight: float, the weight factor passed to the weight function.
-    :return: float.
+
+def _weight_tables(size, weight=None):
     """
-    weighted_len = {}
-    consecutive_match = {}
-    trace = {}
-    m, n = len(x), len(y)
+    Get the tables of the weight function f and its increments for k < size:
+    powers[k] == f(k) and increments[k] == f(k + 1) - f(k).
 
-    for i in range(m + 1):
-        for j in range(n + 1):
-            if i == 0 or j == 0:  # Corner case.
-                weighted_len[i, j] = 0
-                consecutive_match[i, j] = 0
-            elif x[i - 1] == y[j - 1]:
-                trace[i, j] = "d"
-                k = consecutive_match[i - 1, j - 1]
-                update = _weight_fn(k + 1, weight) - _weight_fn(k, weight)
-                weighted_len[i, j] = weighted_len[i - 1, j - 1] + update
-                consecutive_match[i, j] = k + 1
-            else:
-                consecutive_match[i, j] = 0  # No match
-                if weighted_len[i - 1, j] > weighted_len[i, j - 1]:
-                    trace[i, j] = "u"
-                    weighted_len[i, j] = weighted_len[i - 1, j]
-                else:
-                    trace[i, j] = "l"
-                    weighted_len[i, j] = weighted_len[i, j - 1]
+    The values are exactly those of _weight_fn(). The tables are cached by weight
+    and reused by calls needing at most as many entries.
 
-    return _compute_lcs_elements(trace, x, y)
+    >>> powers, increments = _weight_tables(3, weight=2)
+    >>> powers[:3]
+    (0.0, 1.0, 4.0)
+    >>> increments[:3]
+    (1.0, 3.0, 5.0)
+
+    :param size: int. The least number of entries.
+    :param weight: float. Must be greater than 1.0. Default is 1.2.
+    :return: a 2-tuple of tuples of floats, powers and increments.
+    :raise ValueError: if weight is not greater than 1.0.
+    """
+    if weight is None:
+        weight = DEFAULT_WEIGHT_FACTOR
+    if not weight > 1.0:
+        raise ValueError("weight must be > 1.0")
+    # Round up so that sentences of similar lengths share the tables.
+    return _cached_weight_tables(weight, 1 << max(size - 1, 0).bit_length())
+
+
+def _wlcs_row(token, y, prev_row, first, trace, offset, increments):
+    """
+    Compute a row of the WLCS tables from the previous one.
+    Like _lcs_row(), but the states are the weighted length and the length of the
+    consecutive match ending at each cell.
+
+    :param token: the token of x of this row.
+    :param y: a sequence.
+    :param prev_row: tuple of 2 lists. The previous row.
+    :param first: tuple of 2 numbers. The first cell of this row.
+    :param trace: bytearray. The trace table to write.
+    :param offset: int. Where the row starts in the trace table.
+    :param increments: the increments of the weight function from _weight_tables().
+    :return: tuple of 2 lists. This row.
+    """
+    prev_weighted_len, prev_consecutive_match = prev_row
+    left, consecutive = first
+    weighted_len = [left]
+    # No match unless set below.
+    consecutive_match = [0] * (len(y) + 1)
+    consecutive_match[0] = consecutive
+    for j, y_j in enumerate(y):
+        if token == y_j:
+            trace[offset + j] = _TRACE_DIAGONAL
+            k = prev_consecutive_match[j]
+            left = prev_weighted_len[j] + increments[k]
+            consecutive_match[j + 1] = k + 1
+        elif prev_weighted_len[j + 1] > left:
+            trace[offset + j] = _TRACE_UP
+            left = prev_weighted_len[j + 1]
+        # Otherwise go left, which is what the cell already says.
+        weighted_len.append(left)
+    return weighted_len, consecutive_match
+
+
+def _wlcs_elements(x, y, weight=None, threshold=None):
+    """
+    Compute the weighted LCS length.
+
+    The weighted LCS length rewards consecutive LCS sequence by its length.
+    The weight function is so designed that longer consecutive ones get higher score.
+
+    Like _lcs_elements(), only two rows of the weighted length and consecutive match
+    tables are kept, and the trace table takes one byte per cell or is avoided
+    above threshold cells.
+
+    :param x: a sequence.
+    :param y: a sequence.
+    :param weight: float, the weight factor passed to the weight function.
+    :param threshold: int. Default is DEFAULT_HIRSCHBERG_THRESHOLD.
+    :return: a set.
+    """
+    if threshold is None:
+        threshold = DEFAULT_HIRSCHBERG_THRESHOLD
+    _, increments = _weight_tables(min(len(x), len(y)), weight)
+    row_fn = functools.partial(_wlcs_row, increments=increments)
+    top = ([0] * (len(y) + 1), [0] * (len(y) + 1))
+    left = ([0] * (len(x) + 1), [0] * (len(x) + 1))
+    return _hirschberg_elements(row_fn, x, y, top, left, threshold)
 
 
-def _make_wlcs_union(summary_sentences, reference_sentence):
+def _make_wlcs_union(summary_sentences, reference_sentence, positions=None, kernels=None):
     """
     Like _make_lcs_union() but use _wlcs_elements() to compute elements for
     each summary-reference sentence pair. The final result is a sorted list of word indices
@@ -520,13 +1206,15 @@ def _make_wlcs_union(summary_sentences, reference_sentence):
 
     :param summary_sentences:
     :param reference_sentence:
+    :param positions: see _make_lcs_union().
+    :param kernels: Engine. Default is the kernels of the current engine.
     :return: list.
     """
-    lcs_union = set()
-    for sentence in summary_sentences:
-        lcs = _wlcs_elements(sentence, reference_sentence)
-        lcs_union = lcs_union.union(ref_idx for _, ref_idx in lcs)
-    return sorted(lcs_union)
+    if kernels is None:
+        kernels = get_engine().kernels
+    return sorted(
+        _fold_union(kernels.wlcs_elements, summary_sentences, reference_sentence, positions)
+    )
 
 
 def _divide_and_normalize(n, d, weight):
@@ -541,40 +1229,24 @@ def _divide_and_normalize(n, d, weight):
     return _weight_fn(_divide_or_zero(n, d), weight=weight, inverse=True)
 
 
-def rouge_w_summary_level(
-    summary_sentences, reference_sentences, weight=None, alpha=None
-):
+def _count_wlcs_hits(summary_unigrams, references, lcs_unions, powers):
     """
-    Compute the summary level ROUGE-W.
+    Like _count_lcs_hits(), but sum the weight of each run of consecutive hits.
 
-    :param summary_sentences: a list of sentences.
-    :param reference_sentences: a list of sentences.
-    :param weight: float, the weight factor passed to the weight function.
-    :param alpha: weight on the recall.
-    :return: a 3-tuple, recall, precision and f1 measure.
+    :param summary_unigrams: the unigram Counter of the summary, which is used up by clipping.
+    :param references: ReferenceIndex of the reference sentences.
+    :param lcs_unions: an iterable of the sorted WLCS union of each reference sentence.
+    :param powers: the weight function table from _weight_tables(),
+        long enough for every reference sentence.
+    :return: float.
     """
-
     total_wlcs_hits = 0
 
     # unigrams clippers to ensure the score does not exceed ROUGE-1.
-    summary_unigrams = _flatten_and_count_ngrams(summary_sentences, 1)
-    reference_unigrams = _flatten_and_count_ngrams(reference_sentences, 1)
-
-    r_denominator = _weight_fn(
-        sum(
-            _weight_fn(len(sentence), weight=weight) for sentence in reference_sentences
-        ),
-        weight=weight,
-    )
-
-    p_denominator = _weight_fn(
-        sum(len(sentence) for sentence in summary_sentences),
-        weight=weight,
-    )
+    reference_unigrams = collections.Counter(references.ngram_counts(1))
 
-    for reference in reference_sentences:
+    for reference, lcs_union in zip(references.sentences, lcs_unions):
         hit_len = 0
-        lcs_union = _make_wlcs_union(summary_sentences, reference)
         for word in lcs_union:
             unigram = (reference[word],)
             if (
@@ -587,131 +1259,1411 @@ def rouge_w_summary_level(
                 # If this is the last word of the sentence
                 # or the next word is not part of this consecutive lcs, reset the hit-len.
                 if word == len(reference) - 1 or word + 1 not in lcs_union:
-                    total_wlcs_hits += _weight_fn(hit_len, weight=weight)
+                    total_wlcs_hits += powers[hit_len]
                     hit_len = 0
                 summary_unigrams[unigram] -= 1
                 reference_unigrams[unigram] -= 1
+    return total_wlcs_hits
 
-    recall = _divide_and_normalize(total_wlcs_hits, r_denominator, weight)
-    precision = _divide_and_normalize(total_wlcs_hits, p_denominator, weight)
+
+def rouge_w_summary_level(
+    summary_sentences, reference_sentences, weight=None, alpha=None, engine=None
+):
+    """
+    Compute the summary level ROUGE-W.
+
+    :param summary_sentences: a list of sentences.
+    :param reference_sentences: a list of sentences, or a ReferenceIndex of them.
+    :param weight: float, the weight factor passed to the weight function.
+    :param alpha: weight on the recall.
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = rouge_w_summary_level_stats(summary_sentences, reference_sentences, weight, engine)
+    return score_from_stats(stats, alpha)
+
+
+def rouge_w_summary_level_stats(
+    summary_sentences, reference_sentences, weight=None, engine=None
+):
+    """
+    Count the sufficient statistics of summary level ROUGE-W, which are weighted.
+
+    :param summary_sentences: a list of sentences.
+    :param reference_sentences: a list of sentences, or a ReferenceIndex of them.
+    :param weight: float, the weight factor passed to the weight function.
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
+    :return: RougeStats.
+    """
+    return get_engine(engine).run(
+        _rouge_w_summary_level_stats, summary_sentences, reference_sentences, weight
+    )
+
+
+def _rouge_w_summary_level_stats(kernels, summary_sentences, reference_sentences, weight=None):
+    """
+    Like rouge_w_summary_level_stats(), with the given kernels.
+
+    :param kernels: Engine.
+    :param summary_sentences: a list of sentences.
+    :param reference_sentences: a list of sentences, or a ReferenceIndex of them.
+    :param weight: float, the weight factor passed to the weight function.
+    :return: RougeStats.
+    """
+    references = _index_of_sentences(reference_sentences)
+    lcs_unions = (
+        _make_wlcs_union(summary_sentences, reference, kernels=kernels)
+        for reference in references.sentences
+    )
+    return _rouge_w_stats_from_unions(summary_sentences, references, lcs_unions, weight)
+
+
+def _rouge_w_from_unions(
+    summary_sentences, reference_sentences, lcs_unions, weight=None, alpha=None
+):
+    """
+    Like _rouge_l_from_unions(), but for ROUGE-W.
+
+    :param summary_sentences: a list of sentences.
+    :param reference_sentences: a list of sentences, or a ReferenceIndex of them.
+    :param lcs_unions: an iterable of the sorted WLCS union of each reference sentence.
+    :param weight: float, the weight factor passed to the weight function.
+    :param alpha: weight on the recall.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = _rouge_w_stats_from_unions(
+        summary_sentences, reference_sentences, lcs_unions, weight
+    )
+    return score_from_stats(stats, alpha)
+
+
+def _rouge_w_stats_from_unions(summary_sentences, reference_sentences, lcs_unions, weight=None):
+    """
+    Like _rouge_w_from_unions(), but return the sufficient statistics.
+
+    :param summary_sentences: a list of sentences.
+    :param reference_sentences: a list of sentences, or a ReferenceIndex of them.
+    :param lcs_unions: an iterable of the sorted WLCS union of each reference sentence.
+    :param weight: float, the weight factor passed to the weight function.
+    :return: RougeStats.
+    """
+    if weight is None:
+        weight = DEFAULT_WEIGHT_FACTOR
+    references = _index_of_sentences(reference_sentences)
+    max_len = max(map(len, itertools.chain(summary_sentences, references.sentences)), default=0)
+    powers, _ = _weight_tables(max_len + 1, weight)
+
+    r_denominator = _weight_fn(
+        sum(powers[len(sentence)] for sentence in references.sentences),
+        weight=weight,
+    )
+
+    p_denominator = _weight_fn(
+        sum(len(sentence) for sentence in summary_sentences),
+        weight=weight,
+    )
+
+    total_wlcs_hits = _count_wlcs_hits(
+        _flatten_and_count_ngrams(summary_sentences, 1), references, lcs_unions, powers
+    )
+    return RougeStats(total_wlcs_hits, r_denominator, p_denominator, weight)
+
+
+def _wlcs_f1_measure(numerator, r_denominator, p_denominator, weight=None, alpha=None):
+    """
+    Like _f1_measure(), but the recall and precision are normalized
+    with the inverse weight function.
+
+    :param numerator: the weighted LCS hits.
+    :param r_denominator: the weighted length of the references.
+    :param p_denominator: the weighted length of the summary.
+    :param weight: float, the weight factor passed to the weight function.
+    :param alpha: weight on the recall.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    recall = _divide_and_normalize(numerator, r_denominator, weight)
+    precision = _divide_and_normalize(numerator, p_denominator, weight)
     f1 = _compute_f1_measure(recall, precision, alpha)
     return RougeScore(recall, precision, f1)
 
 
 def rouge_w_sentence_level(
-    summary_sentence, reference_sentence, weight=None, alpha=None
+    summary_sentence, reference_sentence, weight=None, alpha=None, engine=None
 ):
     """
     Compute the sentence level ROUGE-W.
     This is effectively a weighted version of ROUGE-L.
 
     :param summary_sentence: a sentence produced by the system.
-    :param reference_sentence: a sentence as ground truth.
+    :param reference_sentence: a sentence as ground truth, or a ReferenceIndex of it.
     :param weight: float, the weight factor passed to the weight function.
     :param alpha: weight on the recall.
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
     :return: a 3-tuple, recall, precision and f1 measure.
     """
-    return rouge_w_summary_level(
-        [summary_sentence], [reference_sentence], weight, alpha
-    )
+    stats = rouge_w_sentence_level_stats(summary_sentence, reference_sentence, weight, engine)
+    return score_from_stats(stats, alpha)
 
 
-###############################
-#           ROUGE-S
-###############################
+def rouge_w_sentence_level_stats(
+    summary_sentence, reference_sentence, weight=None, engine=None
+):
+    """
+    Count the sufficient statistics of sentence level ROUGE-W, which are weighted.
+
+    :param summary_sentence: a sentence produced by the system.
+    :param reference_sentence: a sentence as ground truth, or a ReferenceIndex of it.
+    :param weight: float, the weight factor passed to the weight function.
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
+    :return: RougeStats.
+    """
+    return get_engine(engine).run(
+        _rouge_w_sentence_level_stats, summary_sentence, reference_sentence, weight
+    )
 
 
-def _get_skip_bigrams(words, skip_distance=None):
+def _rouge_w_sentence_level_stats(kernels, summary_sentence, reference_sentence, weight=None):
     """
-    Compute the skip-bigrams of words as an iterator.
+    Like rouge_w_sentence_level_stats(), with the given kernels.
 
-    Skip-bigram is a pair of words since we are on the special case of n-grams -- Bigram.
-    Unlike tradition bigram, skip-bigram allows the two words *not* to be consecutive in the sentence.
-    There can be other words between them being *skipped*.
-    The number of words being skipped is controlled by the parameter skip_distance.
-    Skip distance is the maximum number of words allowed to fall in range formed by the two words
-    of a skip-bigram. If skip distance is 0, that means *no word* should fall between and thus forms
-    the conventional bigram.
+    :param kernels: Engine.
+    :param summary_sentence: a sentence produced by the system.
+    :param reference_sentence: a sentence as ground truth, or a ReferenceIndex of it.
+    :param weight: float, the weight factor passed to the weight function.
+    :return: RougeStats.
+    """
+    index, reference_sentence = _sentence_index(reference_sentence)
+    return _rouge_w_summary_level_stats(
+        kernels, [summary_sentence], index or [reference_sentence], weight
+    )
 
-    The skip distance exists to avoid arbitrarily long range of words sitting between a skip-gram
-    since that makes the count less meaningful.
 
-    If the skip_distance is negative, it means *set no limit*. Use that for good reasons.
+###############################
+#           Engines
+###############################
 
-    >>> # Use the default skip distance, which is 4.
-    >>> list(_get_skip_bigrams('abcd'))
-    [('a', 'b'), ('a', 'c'), ('a', 'd'), ('b', 'c'), ('b', 'd'), ('c', 'd')]
 
-    >>> # Limit the skip distance to 1 -- there can at most be one word between the bigrams.
-    >>> list(_get_skip_bigrams('abcd', skip_distance=1))
-    [('a', 'b'), ('a', 'c'), ('b', 'c'), ('b', 'd'), ('c', 'd')]
+def _reference_trace_back(trace, x, y):
+    """
+    Compute the elements of a LCS given a trace table of the reference kernels.
+    In this table, the key is (i, j) coordinate drawn from x and y, and the value is:
 
-    >>> # Example from the paper.
-    >>> list(_get_skip_bigrams('police killed the gunman'.split()))
-    [('police', 'killed'), ('police', 'the'), ('police', 'gunman'), ('killed', 'the'), ('killed', 'gunman'), ('the', 'gunman')]
+    - 'd': goes diagonal.
+    - 'u': goes up.
+    - 'l': goes left.
 
-    :param words: a list of tokens.
-    :param skip_distance: The maximum number of words allowed to be skipped.
-    :return: a iterator to the skip-bigrams.
+    :param trace: dict. A trace table.
+    :param x: a sequence.
+    :param y: a sequence.
+    :return: a set of index pairs.
     """
-    if skip_distance is None:
-        skip_distance = DEFAULT_SKIP_DISTANCE
-    for i, word in enumerate(words):
-        for j in range(i + 1, len(words)):
-            if skip_distance < 0 or j - i - 1 <= skip_distance:
-                yield word, words[j]
+    i, j = len(x), len(y)
+    elements = set()
+    while i != 0 and j != 0:
+        if trace[i, j] == "d":
+            i -= 1
+            j -= 1
+            elements.add((i, j))
+        elif trace[i, j] == "u":
+            i -= 1
+        else:
+            j -= 1
+    return elements
 
 
-def _count_skip_bigrams(words, skip_distance=None):
+def _reference_lcs_length(x, y, masks=None):
     """
-    Return a Counter counting the skip-bigrams of words.
+    Compute the length of the LCS of x and y with the textbook DP over a dict table,
+    which runs in O(nm) time where n = len(x) and m = len(y).
+    Source: http://www.algorithmist.com/index.php/Longest_Common_Subsequence
 
-    :param words: a list of tokens.
-    :param skip_distance: The maximum number of words allowed to be skipped.
-    :return: collections.Counter.
+    >>> _reference_lcs_length('ABCDE', 'CD')
+    2
+
+    :param x: sequence of words
+    :param y: sequence of words
+    :param masks: ignored, the table is computed from y.
+    :return: Length of LCS between x and y
     """
-    return collections.Counter(_get_skip_bigrams(words, skip_distance))
+    n, m = len(x), len(y)
+    len_table = {}
 
+    for i in range(n + 1):
+        for j in range(m + 1):
+            if i == 0 or j == 0:
+                len_table[i, j] = 0
+            elif x[i - 1] == y[j - 1]:
+                len_table[i, j] = len_table[i - 1, j - 1] + 1
+            else:
+                len_table[i, j] = max(len_table[i - 1, j], len_table[i, j - 1])
 
-def rouge_s_sentence_level(
-    summary_sentence, reference_sentence, skip_distance=None, alpha=None
-):
+    return len_table[n, m]
+
+
+def _reference_lcs_elements(x, y):
     """
-    Compute sentence level ROUGE-S.
+    Like _lcs_elements(), with full dict tables.
 
-    :param summary_sentence:
-    :param reference_sentence:
-    :param skip_distance:
-    :param alpha:
-    :return:
+    >>> _reference_lcs_elements('ab', 'bc')
+    {(1, 0)}
+
+    :param x: a sequence.
+    :param y: a sequence.
+    :return: a set.
     """
-    summary_skip_bigrams = _count_skip_bigrams(summary_sentence, skip_distance)
-    reference_skip_bigrams = _count_skip_bigrams(reference_sentence, skip_distance)
-    hits = _clipped_ngram_count(summary_skip_bigrams, reference_skip_bigrams)
+    n, m = len(x), len(y)
+    len_table = {}
+    trace_table = {}
+    for i in range(n + 1):
+        for j in range(m + 1):
+            if i == 0 or j == 0:
+                len_table[i, j] = 0
+            elif x[i - 1] == y[j - 1]:
+                len_table[i, j] = len_table[i - 1, j - 1] + 1
+                trace_table[i, j] = "d"  # go diagonal.
+            elif len_table[i - 1, j] > len_table[i, j - 1]:
+                len_table[i, j] = len_table[i - 1, j]
+                trace_table[i, j] = "u"  # go up.
+            else:
+                len_table[i, j] = len_table[i, j - 1]
+                trace_table[i, j] = "l"  # go left.
 
-    return _f1_measure(
-        numerator=hits,
-        r_denominator=sum(reference_skip_bigrams.values()),
-        p_denominator=sum(summary_skip_bigrams.values()),
-        alpha=alpha,
-    )
+    return _reference_trace_back(trace_table, x, y)
 
 
-def rouge_s_summary_level(
-    summary_sentences, reference_sentences, skip_distance=None, alpha=None
-):
+def _reference_wlcs_elements(x, y, weight=None):
     """
-    Compute summary level ROUGE-S.
+    Like _wlcs_elements(), with full dict tables and the weight function
+    evaluated at every match.
 
-    :param summary_sentences:
-    :param reference_sentences:
+    :param x: a sequence.
+    :param y: a sequence.
+    :param weight: float, the weight factor passed to the weight function.
+    :return: a set.
+    """
+    weighted_len = {}
+    consecutive_match = {}
+    trace = {}
+    n, m = len(x), len(y)
+
+    for i in range(n + 1):
+        for j in range(m + 1):
+            if i == 0 or j == 0:  # Corner case.
+                weighted_len[i, j] = 0
+                consecutive_match[i, j] = 0
+            elif x[i - 1] == y[j - 1]:
+                trace[i, j] = "d"
+                k = consecutive_match[i - 1, j - 1]
+                update = _weight_fn(k + 1, weight) - _weight_fn(k, weight)
+                weighted_len[i, j] = weighted_len[i - 1, j - 1] + update
+                consecutive_match[i, j] = k + 1
+            else:
+                consecutive_match[i, j] = 0  # No match
+                if weighted_len[i - 1, j] > weighted_len[i, j - 1]:
+                    trace[i, j] = "u"
+                    weighted_len[i, j] = weighted_len[i - 1, j]
+                else:
+                    trace[i, j] = "l"
+                    weighted_len[i, j] = weighted_len[i, j - 1]
+
+    return _reference_trace_back(trace, x, y)
+
+
+class Engine:
+    """
+    A named set of the DP kernels that ROUGE-L and ROUGE-W are computed with:
+
+    - lcs_length(x, y, masks=None): the length of the LCS of x and y.
+      masks are the match masks of y from _lcs_match_masks(), if they are cached.
+    - lcs_elements(x, y): the index pairs of a LCS of x and y.
+    - wlcs_elements(x, y): the index pairs of a weighted LCS of x and y.
+
+    The elements of all the engines must be the same, ties included,
+    since the LCS union and hence the score depend on them.
+    """
+
+    def __init__(self, name, lcs_length, lcs_elements, wlcs_elements):
+        self.name = name
+        self.lcs_length = lcs_length
+        self.lcs_elements = lcs_elements
+        self.wlcs_elements = wlcs_elements
+
+    @property
+    def kernels(self):
+        """
+        The engine whose kernels serve the calls, which is this one.
+        """
+        return self
+
+    def run(self, stats_fn, *args):
+        """
+        Count the stats of a metric with the kernels of this engine.
+
+        :param stats_fn: a function of the kernels and args, like _rouge_l_sentence_level_stats().
+        :return: RougeStats.
+        """
+        return stats_fn(self, *args)
+
+    def __repr__(self):
+        return "Engine(%r)" % self.name
+
+
+# A call of a stats function whose stats were not those of the reference engine.
+# sizes has the number of tokens of each argument, see _arg_size(), rather than the
+# arguments themselves, which may be whole corpora.
+Divergence = collections.namedtuple("Divergence", "function sizes stats expected")
+
+DEFAULT_ENGINE = "fast"
+VERIFY = "verify"
+DEFAULT_VERIFY_FRACTION = 0.01
+DEFAULT_VERIFY_TOLERANCE = 1e-9
+DEFAULT_MAX_DIVERGENCES = 100
+
+
+def _arg_size(arg):
+    """
+    Describe an argument of a stats function by its number of tokens.
+
+    >>> _arg_size('a b c'.split()), _arg_size([['a'], ['b', 'c']]), _arg_size(1.2)
+    (3, 3, 1.2)
+
+    :param arg: a sentence, a list of sentences, a ReferenceIndex, or a number like the weight.
+    :return: int, or arg if it is a number or None.
+    """
+    if arg is None or isinstance(arg, (int, float)):
+        return arg
+    if isinstance(arg, ReferenceIndex):
+        return len(arg.tokens)
+    if len(arg) and isinstance(arg[0], (list, tuple, array.array, ReferenceIndex)):
+        return sum(map(_arg_size, arg))
+    return len(arg)
+
+_ENGINES = {
+    "reference": Engine(
+        "reference", _reference_lcs_length, _reference_lcs_elements, _reference_wlcs_elements
+    ),
+    "fast": Engine("fast", _lcs_length, _lcs_elements, _wlcs_elements),
+}
+
+
+class VerifyingEngine:
+    """
+    Serve the calls with an engine, and cross check a random fraction of them against
+    a reference engine. If the stats of a call differ by more than tolerance,
+    the divergence is logged and recorded, and the stats of the reference engine are served.
+
+    The name of the engine that served each call is counted in served. All the divergences
+    are counted in diverged, but only the first max_divergences are kept in divergences,
+    each with the sizes of the arguments instead of the arguments.
+
+    get_engine(VERIFY) is a VerifyingEngine with the default settings, shared by all the calls
+    that select the engine by that name.
+
+    >>> verifier = VerifyingEngine(fraction=1.0)
+    >>> rouge_l_sentence_level_stats('a b c'.split(), 'a c'.split(), engine=verifier)
+    RougeStats(hits=2, ref_total=2, cand_total=3, weight=None)
+    >>> verifier.served, verifier.verified, verifier.divergences
+    (Counter({'fast': 1}), 1, [])
+    """
+
+    name = VERIFY
+
+    def __init__(
+        self,
+        engine=None,
+        reference=None,
+        fraction=None,
+        tolerance=None,
+        seed=None,
+        max_divergences=None,
+    ):
+        """
+        :param engine: the engine serving the calls. Default is DEFAULT_ENGINE.
+        :param reference: the engine to check against. Default is the reference engine.
+        :param fraction: float. The fraction of calls to check. Default is DEFAULT_VERIFY_FRACTION.
+        :param tolerance: float. The max difference of a stat. Default is DEFAULT_VERIFY_TOLERANCE.
+        :param seed: the seed of the sampling of calls.
+        :param max_divergences: int. The max number of divergences kept.
+            Default is DEFAULT_MAX_DIVERGENCES.
+        """
+        if fraction is None:
+            fraction = DEFAULT_VERIFY_FRACTION
+        if tolerance is None:
+            tolerance = DEFAULT_VERIFY_TOLERANCE
+        if max_divergences is None:
+            max_divergences = DEFAULT_MAX_DIVERGENCES
+        self.engine = get_engine(DEFAULT_ENGINE if engine is None else engine)
+        self.reference = get_engine("reference" if reference is None else reference)
+        self.fraction = fraction
+        self.tolerance = tolerance
+        self.max_divergences = max_divergences
+        self.served = collections.Counter()
+        self.verified = 0
+        self.diverged = 0
+        self.divergences = []
+        self._random = random.Random(seed)
+
+    @property
+    def kernels(self):
+        """
+        The engine whose kernels serve the calls that are not checked, like the building
+        blocks of the corpus scorers.
+        """
+        return self.engine.kernels
+
+    def _diverges(self, stats, expected):
+        """
+        :param stats: RougeStats, or a list of them like those of the references
+            of a multi-reference metric.
+        :param expected: the same from the reference engine.
+        :return: bool.
+        """
+        if isinstance(stats, RougeStats):
+            stats, expected = [stats], [expected]
+        return any(
+            abs(value - expected_value) > self.tolerance
+            for one_stats, one_expected in zip(stats, expected)
+            for value, expected_value in zip(one_stats[:3], one_expected[:3])
+        )
+
+    def run(self, stats_fn, *args):
+        """
+        Count the stats of a metric with the engine, checking them if the call is sampled.
+
+        :param stats_fn: see Engine.run().
+        :return: what stats_fn returns, RougeStats or a list of them.
+        """
+        stats = self.engine.run(stats_fn, *args)
+        served = self.engine.name
+        if self._random.random() < self.fraction:
+            self.verified += 1
+            expected = self.reference.run(stats_fn, *args)
+            if self._diverges(stats, expected):
+                function = stats_fn.__name__.lstrip("_")
+                logger.warning(
+                    "%s of engine %r diverges from %r: %s != %s",
+                    function,
+                    self.engine.name,
+                    self.reference.name,
+                    stats,
+                    expected,
+                )
+                self.diverged += 1
+                if len(self.divergences) < self.max_divergences:
+                    sizes = tuple(map(_arg_size, args))
+                    self.divergences.append(Divergence(function, sizes, stats, expected))
+                stats = expected
+                served = self.reference.name
+        self.served[served] += 1
+        return stats
+
+    def __repr__(self):
+        return "VerifyingEngine(%r, %r, fraction=%r)" % (
+            self.engine.name,
+            self.reference.name,
+            self.fraction,
+        )
+
+
+_engine = _ENGINES[DEFAULT_ENGINE]
+
+
+def register_engine(engine):
+    """
+    Register an engine under its name, so that it can be selected by it.
+
+    :param engine: Engine.
+    """
+    if engine.name == VERIFY:
+        raise ValueError("%r is reserved for VerifyingEngine" % VERIFY)
+    _ENGINES[engine.name] = engine
+
+
+def get_engine(engine=None):
+    """
+    Get an engine by its name. The engine of VERIFY is a shared VerifyingEngine.
+
+    >>> get_engine()
+    Engine('fast')
+    >>> get_engine('reference')
+    Engine('reference')
+
+    :param engine: a name, or an engine which is returned as is. Default is the current engine.
+    :return: Engine or VerifyingEngine.
+    :raise ValueError: if there is no engine of that name.
+    """
+    if engine is None:
+        return _engine
+    if not isinstance(engine, str):
+        return engine
+    if engine not in _ENGINES:
+        raise ValueError("engine must be one of %s" % ", ".join(sorted(_ENGINES)))
+    return _ENGINES[engine]
+
+
+def set_engine(engine):
+    """
+    Set the engine of the calls that do not pass one.
+
+    :param engine: a name, or an engine. See get_engine().
+    :return: the engine that is set, to read the records of a VerifyingEngine.
+    """
+    global _engine
+    _engine = get_engine(engine)
+    return _engine
+
+
+# After get_engine(), which the verifier uses to find its engines.
+_ENGINES[VERIFY] = VerifyingEngine()
+
+
+###############################
+#           ROUGE-S
+###############################
+
+
+def _get_skip_bigrams(words, skip_distance=None):
+    """
+    Compute the skip-bigrams of words as an iterator.
+
+    Skip-bigram is a pair of words since we are on the special case of n-grams -- Bigram.
+    Unlike tradition bigram, skip-bigram allows the two words *not* to be consecutive in the sentence.
+    There can be other words between them being *skipped*.
+    The number of words being skipped is controlled by the parameter skip_distance.
+    Skip distance is the maximum number of words allowed to fall in range formed by the two words
+    of a skip-bigram. If skip distance is 0, that means *no word* should fall between and thus forms
+    the conventional bigram.
+
+    The skip distance exists to avoid arbitrarily long range of words sitting between a skip-gram
+    since that makes the count less meaningful.
+
+    If the skip_distance is negative, it means *set no limit*. Use that for good reasons.
+
+    >>> # Use the default skip distance, which is 4.
+    >>> list(_get_skip_bigrams('abcd'))
+    [('a', 'b'), ('a', 'c'), ('a', 'd'), ('b', 'c'), ('b', 'd'), ('c', 'd')]
+
+    >>> # Limit the skip distance to 1 -- there can at most be one word between the bigrams.
+    >>> list(_get_skip_bigrams('abcd', skip_distance=1))
+    [('a', 'b'), ('a', 'c'), ('b', 'c'), ('b', 'd'), ('c', 'd')]
+
+    >>> # Example from the paper.
+    >>> list(_get_skip_bigrams('police killed the gunman'.split()))
+    [('police', 'killed'), ('police', 'the'), ('police', 'gunman'), ('killed', 'the'), ('killed', 'gunman'), ('the', 'gunman')]
+
+    :param words: a list of tokens.
+    :param skip_distance: The maximum number of words allowed to be skipped.
+    :return: a iterator to the skip-bigrams.
+    """
+    window = _max_skip_gap(len(words), skip_distance)
+    for i, word in enumerate(words):
+        for second in words[i + 1 : i + 1 + window]:
+            yield word, second
+
+
+def _max_skip_gap(length, skip_distance=None):
+    """
+    Return the largest distance between the two positions of a skip-bigram,
+    that is, the number of words skipped plus 1.
+
+    >>> _max_skip_gap(10)
+    5
+    >>> _max_skip_gap(3)
+    2
+    >>> _max_skip_gap(10, skip_distance=-1)
+    9
+
+    :param length: int, the length of the sentence.
+    :param skip_distance: The maximum number of words allowed to be skipped.
+    :return: int.
+    """
+    if skip_distance is None:
+        skip_distance = DEFAULT_SKIP_DISTANCE
+    if skip_distance < 0:
+        return max(length - 1, 0)
+    return max(min(skip_distance + 1, length - 1), 0)
+
+
+def _num_skip_bigrams(words, skip_distance=None):
+    """
+    Return the number of skip-bigrams of words in closed form.
+    There are length - gap skip-bigrams at each gap in [1, max gap].
+
+    >>> _num_skip_bigrams('police killed the gunman'.split())
+    6
+    >>> _num_skip_bigrams('abcd', skip_distance=1)
+    5
+
+    :param words: a list of tokens.
+    :param skip_distance: The maximum number of words allowed to be skipped.
+    :return: int.
+    """
+    gap = _max_skip_gap(len(words), skip_distance)
+    return gap * len(words) - gap * (gap + 1) // 2
+
+
+def _count_skip_bigrams(words, skip_distance=None):
+    """
+    Return a Counter counting the skip-bigrams of words.
+    The skip-bigrams are counted gap by gap, like _count_ngrams().
+
+    :param words: a list of tokens.
+    :param skip_distance: The maximum number of words allowed to be skipped.
+    :return: collections.Counter.
+    """
+    counts = collections.Counter()
+    for gap in range(1, _max_skip_gap(len(words), skip_distance) + 1):
+        counts.update(zip(words, words[gap:]))
+    return counts
+
+
+def _count_skip_grams(words, skip_distance=None, unigrams=False):
+    """
+    Return a Counter counting the skip-bigrams of words, and the unigrams for ROUGE-SU.
+
+    Like the perl script, ROUGE-SU counts the unigrams of all the words but the last one.
+    Unigrams are 1-tuples so that they never collide with skip-bigrams.
+
+    >>> sorted(_count_skip_grams('aab', unigrams=True).items())
+    [(('a',), 2), (('a', 'a'), 1), (('a', 'b'), 2)]
+
+    :param words: a list of tokens.
+    :param skip_distance: The maximum number of words allowed to be skipped.
+    :param unigrams: bool. If true, the unigrams are counted too.
+    :return: collections.Counter.
+    """
+    counts = _count_skip_bigrams(words, skip_distance)
+    if unigrams:
+        counts.update(zip(words[:-1]))
+    return counts
+
+
+def _num_skip_grams(words, skip_distance=None, unigrams=False):
+    """
+    Return the number of grams counted by _count_skip_grams().
+
+    :param words: a list of tokens.
+    :param skip_distance: The maximum number of words allowed to be skipped.
+    :param unigrams: bool. If true, the unigrams are counted too.
+    :return: int.
+    """
+    count = _num_skip_bigrams(words, skip_distance)
+    if unigrams:
+        count += max(len(words) - 1, 0)
+    return count
+
+
+def _rouge_s_stats(summary_sentence, reference_sentence, skip_distance, unigrams):
+    """
+    Count the sufficient statistics of sentence level ROUGE-S, or ROUGE-SU if unigrams is true.
+
+    :param summary_sentence:
+    :param reference_sentence:
+    :param skip_distance:
+    :param unigrams: bool.
+    :return: RougeStats.
+    """
+    index, reference_sentence = _sentence_index(reference_sentence)
+    summary_skip_grams = _count_skip_grams(summary_sentence, skip_distance, unigrams)
+    if index is None:
+        reference_skip_grams = _count_skip_grams(reference_sentence, skip_distance, unigrams)
+    else:
+        reference_skip_grams = index.skip_gram_counts(skip_distance, unigrams)
+    hits = _clipped_ngram_count(summary_skip_grams, reference_skip_grams)
+
+    return RougeStats(
+        hits,
+        _num_skip_grams(reference_sentence, skip_distance, unigrams),
+        _num_skip_grams(summary_sentence, skip_distance, unigrams),
+    )
+
+
+def rouge_s_sentence_level(
+    summary_sentence, reference_sentence, skip_distance=None, alpha=None
+):
+    """
+    Compute sentence level ROUGE-S.
+
+    :param summary_sentence:
+    :param reference_sentence:
+    :param skip_distance:
+    :param alpha:
+    :return:
+    """
+    stats = rouge_s_sentence_level_stats(summary_sentence, reference_sentence, skip_distance)
+    return score_from_stats(stats, alpha)
+
+
+def rouge_s_sentence_level_stats(summary_sentence, reference_sentence, skip_distance=None):
+    """
+    Count the sufficient statistics of sentence level ROUGE-S.
+
+    :param summary_sentence:
+    :param reference_sentence:
+    :param skip_distance:
+    :return: RougeStats.
+    """
+    return _rouge_s_stats(
+        summary_sentence, reference_sentence, skip_distance, unigrams=False
+    )
+
+
+def rouge_s_summary_level(
+    summary_sentences, reference_sentences, skip_distance=None, alpha=None
+):
+    """
+    Compute summary level ROUGE-S.
+
+    :param summary_sentences:
+    :param reference_sentences:
+    :param skip_distance:
+    :param alpha:
+    :return:
+    """
+    stats = rouge_s_summary_level_stats(summary_sentences, reference_sentences, skip_distance)
+    return score_from_stats(stats, alpha)
+
+
+def rouge_s_summary_level_stats(summary_sentences, reference_sentences, skip_distance=None):
+    """
+    Count the sufficient statistics of summary level ROUGE-S.
+
+    :param summary_sentences:
+    :param reference_sentences:
+    :param skip_distance:
+    :return: RougeStats.
+    """
+    return rouge_s_sentence_level_stats(
+        summary_sentence=_flatten_sentences(summary_sentences),
+        reference_sentence=_index_of_sentences(reference_sentences).flattened(),
+        skip_distance=skip_distance,
+    )
+
+
+###############################
+#           ROUGE-SU
+###############################
+
+
+def rouge_su_sentence_level(
+    summary_sentence, reference_sentence, skip_distance=None, alpha=None
+):
+    """
+    Compute sentence level ROUGE-SU, which is ROUGE-S with unigrams counted as well.
+    It gives credit to summaries with matching words but no matching pair of words.
+
+    >>> rouge_su_sentence_level('ab', 'ba').recall
+    0.0
+    >>> rouge_su_sentence_level('abc', 'bca').recall
+    0.4
+
+    :param summary_sentence:
+    :param reference_sentence:
+    :param skip_distance:
+    :param alpha:
+    :return:
+    """
+    stats = rouge_su_sentence_level_stats(summary_sentence, reference_sentence, skip_distance)
+    return score_from_stats(stats, alpha)
+
+
+def rouge_su_sentence_level_stats(summary_sentence, reference_sentence, skip_distance=None):
+    """
+    Count the sufficient statistics of sentence level ROUGE-SU.
+
+    :param summary_sentence:
+    :param reference_sentence:
+    :param skip_distance:
+    :return: RougeStats.
+    """
+    return _rouge_s_stats(
+        summary_sentence, reference_sentence, skip_distance, unigrams=True
+    )
+
+
+def rouge_su_summary_level(
+    summary_sentences, reference_sentences, skip_distance=None, alpha=None
+):
+    """
+    Compute summary level ROUGE-SU.
+
+    :param summary_sentences:
+    :param reference_sentences:
     :param skip_distance:
     :param alpha:
     :return:
     """
-    return rouge_s_sentence_level(
+    stats = rouge_su_summary_level_stats(summary_sentences, reference_sentences, skip_distance)
+    return score_from_stats(stats, alpha)
+
+
+def rouge_su_summary_level_stats(summary_sentences, reference_sentences, skip_distance=None):
+    """
+    Count the sufficient statistics of summary level ROUGE-SU.
+
+    :param summary_sentences:
+    :param reference_sentences:
+    :param skip_distance:
+    :return: RougeStats.
+    """
+    return rouge_su_sentence_level_stats(
         summary_sentence=_flatten_sentences(summary_sentences),
-        reference_sentence=_flatten_sentences(reference_sentences),
+        reference_sentence=_index_of_sentences(reference_sentences).flattened(),
         skip_distance=skip_distance,
-        alpha=alpha,
+    )
+
+
+###############################
+#       Reference index
+###############################
+
+
+class ReferenceIndex:
+    """
+    The reference side statistics of a list of reference sentences: n-gram counts,
+    skip-gram counts, unigram clippers, lengths and LCS match masks.
+    Each is computed on first use and kept, so that scoring several systems against
+    the same references only computes the summary side each time.
+
+    Every metric accepts an index in place of its references. At sentence level,
+    the index stands for the concatenation of its sentences, which is the sentence itself
+    for an index made by from_sentence().
+
+    >>> reference = ReferenceIndex.from_sentence('police killed the gunman'.split())
+    >>> rouge_n_sentence_level('the gunman police killed'.split(), reference, 2).recall
+    0.6666666666666666
+    >>> reference.ngram_counts(2)[('the', 'gunman')]
+    1
+
+    The index must not be modified once made.
+    """
+
+    def __init__(self, sentences):
+        """
+        :param sentences: a list of reference sentences.
+        """
+        self.sentences = list(sentences)
+        self._tokens = None
+        self._flattened = None
+        self._cache = {}
+
+    @classmethod
+    def from_sentence(cls, sentence):
+        """
+        Make the index of a single reference sentence.
+
+        :param sentence: a sentence.
+        :return: ReferenceIndex.
+        """
+        index = cls([sentence])
+        index._tokens = sentence
+        return index
+
+    def _get(self, key, compute):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = compute()
+            return value
+
+    @property
+    def tokens(self):
+        """
+        The concatenation of the sentences.
+        """
+        if self._tokens is None:
+            self._tokens = _flatten_sentences(self.sentences)
+        return self._tokens
+
+    def flattened(self):
+        """
+        Return the index of the concatenation of the sentences as one sentence,
+        which is the index itself if it has one sentence.
+
+        :return: ReferenceIndex.
+        """
+        if len(self.sentences) == 1:
+            return self
+        if self._flattened is None:
+            self._flattened = ReferenceIndex.from_sentence(self.tokens)
+        return self._flattened
+
+    def ngram_counts(self, n, packed=False):
+        """
+        Return the counts of the n-grams of the concatenation of the sentences.
+        The Counter is shared and must not be modified.
+
+        :param n: N for ngrams.
+        :param packed: bool. If true, the sentences must be interned and the n-grams are packed.
+        :return: collections.Counter.
+        """
+        key = ("ngrams", n, packed)
+        return self._get(key, lambda: _count_ngrams(self.tokens, n, packed))
+
+    def skip_gram_counts(self, skip_distance=None, unigrams=False):
+        """
+        Return the counts of the skip-grams of the concatenation of the sentences.
+        The Counter is shared and must not be modified.
+
+        :param skip_distance: The maximum number of words allowed to be skipped.
+        :param unigrams: bool. If true, the unigrams are counted too.
+        :return: collections.Counter.
+        """
+        key = ("skip_grams", skip_distance, unigrams)
+        return self._get(
+            key, lambda: _count_skip_grams(self.tokens, skip_distance, unigrams)
+        )
+
+    def lcs_masks(self):
+        """
+        Return the match masks of the concatenation of the sentences for _lcs_length_from_masks().
+
+        :return: a dict mapping tokens to int masks.
+        """
+        return self._get("lcs_masks", lambda: _lcs_match_masks(self.tokens))
+
+
+def _sentence_index(reference_sentence):
+    """
+    Unpack the reference of a sentence level metric. Plain sentences have no index,
+    so that they are not slowed down by it.
+
+    :param reference_sentence: a sentence, or a ReferenceIndex.
+    :return: a 2-tuple, the ReferenceIndex of a single sentence or None, and the sentence.
+    """
+    if isinstance(reference_sentence, ReferenceIndex):
+        index = reference_sentence.flattened()
+        return index, index.tokens
+    return None, reference_sentence
+
+
+def _index_of_sentences(reference_sentences):
+    """
+    Return the index of a list of reference sentences.
+
+    :param reference_sentences: a list of sentences, or a ReferenceIndex.
+    :return: ReferenceIndex.
+    """
+    if isinstance(reference_sentences, ReferenceIndex):
+        return reference_sentences
+    return ReferenceIndex(reference_sentences)
+
+
+###############################
+#     Multiple references
+###############################
+
+# "average" pools the hits and counts of all references, like -f A of the perl script.
+# "max" takes the references with the best recall, like -f B of the perl script.
+# "jackknife" averages the max scores against each subset of all references but one.
+MULTI_REFERENCE_MODES = ("average", "max", "jackknife")
+DEFAULT_MULTI_REFERENCE_MODE = "average"
+
+
+def _best_score(scores):
+    """
+    Return the score with the best recall. Ties go to the first one, like the perl script.
+
+    :param scores: a non empty list of RougeScore.
+    :return: RougeScore.
+    """
+    return max(scores, key=lambda score: score.recall)
+
+
+def _combine_references(stats, alpha=None, mode=None):
+    """
+    Combine the scores of a summary against several references.
+
+    >>> stats = [RougeStats(1, 2, 4), RougeStats(3, 4, 4)]
+    >>> _combine_references(stats, mode="average")
+    RougeScore(recall=0.6666666666666666, precision=0.5, f1_measure=0.5714285714285715)
+    >>> _combine_references(stats, mode="max").recall
+    0.75
+    >>> _combine_references(stats, mode="jackknife").recall
+    0.625
+
+    :param stats: a non empty list of RougeStats against each reference.
+    :param alpha: weight on the recall (default 0.5).
+    :param mode: one of MULTI_REFERENCE_MODES. Default is DEFAULT_MULTI_REFERENCE_MODE.
+    :return: RougeScore.
+    :raise ValueError: If the mode is unknown or there is no reference.
+    """
+    if mode is None:
+        mode = DEFAULT_MULTI_REFERENCE_MODE
+    if mode not in MULTI_REFERENCE_MODES:
+        raise ValueError("mode must be one of {}".format(MULTI_REFERENCE_MODES))
+    if not stats:
+        raise ValueError("At least one reference is required")
+
+    if mode == "average":
+        hits, ref_total, cand_total = map(sum, zip(*(s[:3] for s in stats)))
+        return score_from_stats(RougeStats(hits, ref_total, cand_total, stats[0].weight), alpha)
+
+    scores = [score_from_stats(reference_stats, alpha) for reference_stats in stats]
+    if mode == "max" or len(scores) == 1:
+        return _best_score(scores)
+    jackknifed = [_best_score(scores[:i] + scores[i + 1:]) for i in range(len(scores))]
+    return RougeScore(*(sum(values) / len(jackknifed) for values in zip(*jackknifed)))
+
+
+def _ngram_reference_stats(summary_sentence, reference_sentences, n):
+    """
+    Count the n-gram hits of a summary against each reference.
+    The summary n-grams are only counted once.
+
+    :param summary_sentence: a sentence.
+    :param reference_sentences: a list of sentences, or ReferenceIndex of them.
+    :param n: n for ngram.
+    :return: a list of RougeStats, as taken by _combine_references().
+    """
+    # Keyed by whether the n-grams are packed, which depends on each reference.
+    summary_ngrams = {}
+    p_denominator = _num_ngrams(summary_sentence, n)
+    stats = []
+    for reference_sentence in reference_sentences:
+        index, reference_sentence = _sentence_index(reference_sentence)
+        packed = _is_packed(summary_sentence, reference_sentence)
+        if packed not in summary_ngrams:
+            summary_ngrams[packed] = _count_ngrams(summary_sentence, n, packed)
+        if index is None:
+            reference_ngrams = _count_ngrams(reference_sentence, n, packed)
+        else:
+            reference_ngrams = index.ngram_counts(n, packed)
+        hits = _clipped_ngram_count(summary_ngrams[packed], reference_ngrams)
+        r_denominator = _num_ngrams(reference_sentence, n)
+        stats.append(RougeStats(hits, r_denominator, p_denominator))
+    return stats
+
+
+def rouge_n_sentence_level_multi_reference(
+    summary_sentence, reference_sentences, n, alpha=None, mode=None
+):
+    """
+    Calculate sentence level ROUGE-N against several reference sentences.
+
+    >>> summary = 'the gunman police killed'.split()
+    >>> references = ['police killed the gunman'.split(), 'the gunman was shot'.split()]
+    >>> rouge_n_sentence_level_multi_reference(summary, references, 2, mode="max").recall
+    0.6666666666666666
+    >>> rouge_n_sentence_level_multi_reference(summary, references, 2).recall
+    0.5
+
+    :param summary_sentence: a sentence.
+    :param reference_sentences: a list of sentences, or ReferenceIndex of them.
+    :param n: n for ngram.
+    :param alpha: weight on the recall (default 0.5).
+    :param mode: one of MULTI_REFERENCE_MODES. Default is DEFAULT_MULTI_REFERENCE_MODE.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = _ngram_reference_stats(summary_sentence, reference_sentences, n)
+    return _combine_references(stats, alpha, mode)
+
+
+def rouge_n_summary_level_multi_reference(
+    summary_sentences, references, n, alpha=None, mode=None
+):
+    """
+    Calculate summary level ROUGE-N against several reference summaries.
+
+    :param summary_sentences: a list of sentences.
+    :param references: a list of reference summaries, each a list of sentences
+        or a ReferenceIndex of them.
+    :param n: n for ngram.
+    :param alpha: weight on the recall (default 0.5).
+    :param mode: one of MULTI_REFERENCE_MODES. Default is DEFAULT_MULTI_REFERENCE_MODE.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    return rouge_n_sentence_level_multi_reference(
+        _flatten_sentences(summary_sentences),
+        [_index_of_sentences(reference).flattened() for reference in references],
+        n,
+        alpha,
+        mode,
+    )
+
+
+def rouge_l_sentence_level_multi_reference(
+    summary_sentence, reference_sentences, alpha=None, mode=None, engine=None
+):
+    """
+    Calculate sentence level ROUGE-L against several reference sentences.
+    The match masks are made of the summary once, and each reference is run against them.
+
+    :param summary_sentence: a sentence.
+    :param reference_sentences: a list of sentences, or ReferenceIndex of them.
+    :param alpha: weight on the recall (default 0.5).
+    :param mode: one of MULTI_REFERENCE_MODES. Default is DEFAULT_MULTI_REFERENCE_MODE.
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = get_engine(engine).run(
+        _rouge_l_sentence_level_multi_reference_stats, summary_sentence, list(reference_sentences)
+    )
+    return _combine_references(stats, alpha, mode)
+
+
+def _rouge_l_sentence_level_multi_reference_stats(kernels, summary_sentence, reference_sentences):
+    """
+    Count the stats of sentence level ROUGE-L against each reference sentence.
+
+    :param kernels: Engine.
+    :param summary_sentence: a sentence.
+    :param reference_sentences: a list of sentences, or ReferenceIndex of them.
+    :return: a list of RougeStats.
+    """
+    masks = _lcs_match_masks(summary_sentence)
+    p_denominator = len(summary_sentence)
+    stats = []
+    for reference_sentence in reference_sentences:
+        _, reference_sentence = _sentence_index(reference_sentence)
+        # The LCS length is symmetric, so the masks of the summary serve every reference.
+        lcs_length = kernels.lcs_length(reference_sentence, summary_sentence, masks)
+        stats.append(RougeStats(lcs_length, len(reference_sentence), p_denominator))
+    return stats
+
+
+def rouge_l_summary_level_multi_reference(
+    summary_sentences, references, alpha=None, mode=None, engine=None
+):
+    """
+    Calculate summary level ROUGE-L against several reference summaries.
+
+    :param summary_sentences: a list of sentences.
+    :param references: a list of reference summaries, each a list of sentences
+        or a ReferenceIndex of them.
+    :param alpha: weight on the recall (default 0.5).
+    :param mode: one of MULTI_REFERENCE_MODES. Default is DEFAULT_MULTI_REFERENCE_MODE.
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = get_engine(engine).run(
+        _rouge_l_summary_level_multi_reference_stats, summary_sentences, list(references)
+    )
+    return _combine_references(stats, alpha, mode)
+
+
+def _rouge_l_summary_level_multi_reference_stats(kernels, summary_sentences, references):
+    """
+    Count the stats of summary level ROUGE-L against each reference summary.
+
+    :param kernels: Engine.
+    :param summary_sentences: a list of sentences.
+    :param references: a list of reference summaries, each a list of sentences
+        or a ReferenceIndex of them.
+    :return: a list of RougeStats.
+    """
+    summary_unigrams = _flatten_and_count_ngrams(summary_sentences, 1)
+    p_denominator = sum(len(sentence) for sentence in summary_sentences)
+    stats = []
+    for reference in references:
+        reference = _index_of_sentences(reference)
+        lcs_unions = (
+            _make_lcs_union(summary_sentences, sentence, kernels=kernels)
+            for sentence in reference.sentences
+        )
+        hits = _count_lcs_hits(collections.Counter(summary_unigrams), reference, lcs_unions)
+        stats.append(RougeStats(hits, len(reference.tokens), p_denominator))
+    return stats
+
+
+def rouge_w_summary_level_multi_reference(
+    summary_sentences, references, weight=None, alpha=None, mode=None, engine=None
+):
+    """
+    Compute the summary level ROUGE-W against several reference summaries.
+    Like the perl script, the weighted hits and lengths are pooled by the average mode.
+
+    :param summary_sentences: a list of sentences.
+    :param references: a list of reference summaries, each a list of sentences
+        or a ReferenceIndex of them.
+    :param weight: float, the weight factor passed to the weight function.
+    :param alpha: weight on the recall.
+    :param mode: one of MULTI_REFERENCE_MODES. Default is DEFAULT_MULTI_REFERENCE_MODE.
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = get_engine(engine).run(
+        _rouge_w_summary_level_multi_reference_stats, summary_sentences, list(references), weight
+    )
+    return _combine_references(stats, alpha, mode)
+
+
+def _rouge_w_summary_level_multi_reference_stats(kernels, summary_sentences, references, weight):
+    """
+    Count the weighted stats of summary level ROUGE-W against each reference summary.
+
+    :param kernels: Engine.
+    :param summary_sentences: a list of sentences.
+    :param references: a list of reference summaries, each a list of sentences
+        or a ReferenceIndex of them.
+    :param weight: float, the weight factor passed to the weight function.
+    :return: a list of RougeStats.
+    """
+    if weight is None:
+        weight = DEFAULT_WEIGHT_FACTOR
+    references = [_index_of_sentences(reference) for reference in references]
+    max_len = max(
+        map(
+            len,
+            itertools.chain(
+                summary_sentences,
+                itertools.chain.from_iterable(reference.sentences for reference in references),
+            ),
+        ),
+        default=0,
+    )
+    powers, _ = _weight_tables(max_len + 1, weight)
+
+    summary_unigrams = _flatten_and_count_ngrams(summary_sentences, 1)
+    p_denominator = _weight_fn(
+        sum(len(sentence) for sentence in summary_sentences), weight=weight
+    )
+    stats = []
+    for reference in references:
+        r_denominator = _weight_fn(
+            sum(powers[len(sentence)] for sentence in reference.sentences),
+            weight=weight,
+        )
+        lcs_unions = (
+            _make_wlcs_union(summary_sentences, sentence, kernels=kernels)
+            for sentence in reference.sentences
+        )
+        hits = _count_wlcs_hits(
+            collections.Counter(summary_unigrams), reference, lcs_unions, powers
+        )
+        stats.append(RougeStats(hits, r_denominator, p_denominator, weight))
+    return stats
+
+
+def rouge_w_sentence_level_multi_reference(
+    summary_sentence, reference_sentences, weight=None, alpha=None, mode=None, engine=None
+):
+    """
+    Compute the sentence level ROUGE-W against several reference sentences.
+
+    :param summary_sentence: a sentence produced by the system.
+    :param reference_sentences: a list of sentences, or ReferenceIndex of them.
+    :param weight: float, the weight factor passed to the weight function.
+    :param alpha: weight on the recall.
+    :param mode: one of MULTI_REFERENCE_MODES. Default is DEFAULT_MULTI_REFERENCE_MODE.
+    :param engine: the engine of the DP kernels, see get_engine(). Default is the current one.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    references = []
+    for reference_sentence in reference_sentences:
+        index, reference_sentence = _sentence_index(reference_sentence)
+        references.append(index or [reference_sentence])
+    return rouge_w_summary_level_multi_reference(
+        [summary_sentence], references, weight, alpha, mode, engine
+    )
+
+
+def _skip_gram_reference_stats(summary_sentence, reference_sentences, skip_distance, unigrams):
+    """
+    Like _ngram_reference_stats(), but for the skip-grams of ROUGE-S and ROUGE-SU.
+
+    :param summary_sentence: a sentence.
+    :param reference_sentences: a list of sentences, or ReferenceIndex of them.
+    :param skip_distance: The maximum number of words allowed to be skipped.
+    :param unigrams: bool. If true, the unigrams are counted too.
+    :return: a list of RougeStats, as taken by _combine_references().
+    """
+    summary_skip_grams = _count_skip_grams(summary_sentence, skip_distance, unigrams)
+    p_denominator = _num_skip_grams(summary_sentence, skip_distance, unigrams)
+    stats = []
+    for reference_sentence in reference_sentences:
+        index, reference_sentence = _sentence_index(reference_sentence)
+        if index is None:
+            reference_skip_grams = _count_skip_grams(
+                reference_sentence, skip_distance, unigrams
+            )
+        else:
+            reference_skip_grams = index.skip_gram_counts(skip_distance, unigrams)
+        hits = _clipped_ngram_count(summary_skip_grams, reference_skip_grams)
+        r_denominator = _num_skip_grams(reference_sentence, skip_distance, unigrams)
+        stats.append(RougeStats(hits, r_denominator, p_denominator))
+    return stats
+
+
+def rouge_s_sentence_level_multi_reference(
+    summary_sentence, reference_sentences, skip_distance=None, alpha=None, mode=None
+):
+    """
+    Compute sentence level ROUGE-S against several reference sentences.
+
+    :param summary_sentence: a sentence.
+    :param reference_sentences: a list of sentences, or ReferenceIndex of them.
+    :param skip_distance: The maximum number of words allowed to be skipped.
+    :param alpha: weight on the recall.
+    :param mode: one of MULTI_REFERENCE_MODES. Default is DEFAULT_MULTI_REFERENCE_MODE.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = _skip_gram_reference_stats(
+        summary_sentence, reference_sentences, skip_distance, unigrams=False
+    )
+    return _combine_references(stats, alpha, mode)
+
+
+def rouge_s_summary_level_multi_reference(
+    summary_sentences, references, skip_distance=None, alpha=None, mode=None
+):
+    """
+    Compute summary level ROUGE-S against several reference summaries.
+
+    :param summary_sentences: a list of sentences.
+    :param references: a list of reference summaries, each a list of sentences
+        or a ReferenceIndex of them.
+    :param skip_distance: The maximum number of words allowed to be skipped.
+    :param alpha: weight on the recall.
+    :param mode: one of MULTI_REFERENCE_MODES. Default is DEFAULT_MULTI_REFERENCE_MODE.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    return rouge_s_sentence_level_multi_reference(
+        _flatten_sentences(summary_sentences),
+        [_index_of_sentences(reference).flattened() for reference in references],
+        skip_distance,
+        alpha,
+        mode,
+    )
+
+
+def rouge_su_sentence_level_multi_reference(
+    summary_sentence, reference_sentences, skip_distance=None, alpha=None, mode=None
+):
+    """
+    Compute sentence level ROUGE-SU against several reference sentences.
+
+    :param summary_sentence: a sentence.
+    :param reference_sentences: a list of sentences, or ReferenceIndex of them.
+    :param skip_distance: The maximum number of words allowed to be skipped.
+    :param alpha: weight on the recall.
+    :param mode: one of MULTI_REFERENCE_MODES. Default is DEFAULT_MULTI_REFERENCE_MODE.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    stats = _skip_gram_reference_stats(
+        summary_sentence, reference_sentences, skip_distance, unigrams=True
+    )
+    return _combine_references(stats, alpha, mode)
+
+
+def rouge_su_summary_level_multi_reference(
+    summary_sentences, references, skip_distance=None, alpha=None, mode=None
+):
+    """
+    Compute summary level ROUGE-SU against several reference summaries.
+
+    :param summary_sentences: a list of sentences.
+    :param references: a list of reference summaries, each a list of sentences
+        or a ReferenceIndex of them.
+    :param skip_distance: The maximum number of words allowed to be skipped.
+    :param alpha: weight on the recall.
+    :param mode: one of MULTI_REFERENCE_MODES. Default is DEFAULT_MULTI_REFERENCE_MODE.
+    :return: a 3-tuple, recall, precision and f1 measure.
+    """
+    return rouge_su_sentence_level_multi_reference(
+        _flatten_sentences(summary_sentences),
+        [_index_of_sentences(reference).flattened() for reference in references],
+        skip_distance,
+        alpha,
+        mode,
     )
@@ -0,0 +1,256 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Paired significance tests between two systems, computed from the sufficient statistics
+of their instances with numpy, so that no metric is ever computed again.
+
+The statistics of every metric tested are stacked as the columns of one matrix, and each
+block of resamples or permutations is a matrix product with it, so all the metrics are
+tested at once on the same draws.
+"""
+
+import collections
+
+import numpy as np
+
+from rouge.batch import _stats_arrays
+from rouge.batch import scores_from_stats
+from rouge.bootstrap import AVERAGES, DEFAULT_AVERAGE, DEFAULT_BLOCK_SIZE
+from rouge.bootstrap import _iter_resample_indices
+from rouge.metrics import RougeScore, RougeStats
+
+__all__ = [
+    "SignificanceTest",
+    "paired_bootstrap_test",
+    "permutation_test",
+]
+
+SignificanceTest = collections.namedtuple("SignificanceTest", "difference p_value")
+
+DEFAULT_NUM_RESAMPLES = 1000
+DEFAULT_NUM_ROUNDS = 1000
+# The p-values are reproducible unless another seed is given.
+DEFAULT_SEED = 0
+# Differences equal up to rounding count as ties.
+_TOLERANCE = 1e-12
+
+
+class _PairedColumns:
+    """
+    The statistics of both systems for every metric tested, as the columns of one matrix.
+    Each metric has 6 columns, 3 for the system and 3 for the baseline. They are the
+    recall, precision and f1 measure of each instance for the macro average, and the hits
+    and totals for the micro average.
+    """
+
+    def __init__(self, system_stats, baseline_stats, alpha=None, average=None):
+        if average is None:
+            average = DEFAULT_AVERAGE
+        if average not in AVERAGES:
+            raise ValueError("average must be one of {}".format(AVERAGES))
+        self.single = not isinstance(system_stats, dict)
+        if self.single:
+            system_stats = {None: system_stats}
+            baseline_stats = {None: baseline_stats}
+        if system_stats.keys() != baseline_stats.keys():
+            raise ValueError("both systems must have the same metrics")
+        self.names = list(system_stats)
+        self.alpha = alpha
+        self.average = average
+        self.weights = []
+        columns = []
+        for name in self.names:
+            system = _stats_arrays(system_stats[name])
+            baseline = _stats_arrays(baseline_stats[name])
+            if len(system.hits) != len(baseline.hits):
+                raise ValueError("both systems must have the same instances")
+            if average == "macro":
+                columns += scores_from_stats(system, alpha)
+                columns += scores_from_stats(baseline, alpha)
+            else:
+                columns += system[:3]
+                columns += baseline[:3]
+            self.weights.append((system.weight, baseline.weight))
+        self.matrix = np.column_stack(columns).astype(np.float64)
+        self.num_instances = len(self.matrix)
+        if not self.num_instances:
+            raise ValueError("stats must not be empty")
+
+    def differences(self, sums):
+        """
+        Compute the score differences between the system and the baseline.
+
+        :param sums: a matrix of the sums of the columns, one row per draw.
+        :return: a matrix of the differences, with 3 columns per metric.
+        """
+        differences = []
+        for i, (system_weight, baseline_weight) in enumerate(self.weights):
+            metric_sums = sums[:, 6 * i: 6 * i + 6]
+            if self.average == "macro":
+                means = metric_sums / self.num_instances
+                differences.append(means[:, :3] - means[:, 3:])
+            else:
+                system = RougeStats(*metric_sums[:, :3].T, system_weight)
+                baseline = RougeStats(*metric_sums[:, 3:].T, baseline_weight)
+                differences.append(
+                    np.column_stack(scores_from_stats(system, self.alpha))
+                    - np.column_stack(scores_from_stats(baseline, self.alpha))
+                )
+        return np.hstack(differences)
+
+    def results(self, observed, p_values):
+        """
+        Pack the results per metric.
+
+        :param observed: an array of the observed differences, 3 per metric.
+        :param p_values: an array of p-values, 3 per metric.
+        :return: RougeScore of SignificanceTest, or a dict of them by metric.
+        """
+        results = {}
+        for i, name in enumerate(self.names):
+            tests = [
+                SignificanceTest(float(observed[j]), float(p_values[j]))
+                for j in range(3 * i, 3 * i + 3)
+            ]
+            results[name] = RougeScore(*tests)
+        return results[None] if self.single else results
+
+
+def paired_bootstrap_test(
+    system_stats,
+    baseline_stats,
+    alpha=None,
+    num_resamples=None,
+    average=None,
+    seed=None,
+    block_size=None,
+):
+    """
+    Test whether the scores of two systems on the same instances differ with the paired
+    bootstrap. Both systems are scored on each resample of the instances, and the p-value
+    is the fraction of resamples whose difference is at least as far from the observed
+    one as the observed one is from zero.
+
+    >>> system = [RougeStats(2, 2, 2), RougeStats(1, 2, 2)] * 10
+    >>> baseline = [RougeStats(1, 2, 2), RougeStats(1, 2, 2)] * 10
+    >>> recall, _, _ = paired_bootstrap_test(system, baseline)
+    >>> recall.difference, recall.p_value
+    (0.25, 0.0)
+
+    :param system_stats: RougeStats of arrays or a list of RougeStats, one per instance.
+        To test several metrics at once, a dict of them by metric.
+    :param baseline_stats: the same as system_stats, for the other system.
+    :param alpha: weight on the recall (default 0.5).
+    :param num_resamples: Default is DEFAULT_NUM_RESAMPLES.
+    :param average: one of rouge.bootstrap.AVERAGES. Default is "macro".
+    :param seed: the seed of the numpy Generator. Default is DEFAULT_SEED.
+    :param block_size: the number of indices drawn at once. Default is DEFAULT_BLOCK_SIZE.
+    :return: RougeScore of SignificanceTest, or a dict of them by metric.
+    :raise ValueError: If the systems do not have the same instances and metrics.
+    """
+    if num_resamples is None:
+        num_resamples = DEFAULT_NUM_RESAMPLES
+    if seed is None:
+        seed = DEFAULT_SEED
+    if not num_resamples > 0:
+        raise ValueError("num_resamples must be positive")
+    columns = _PairedColumns(system_stats, baseline_stats, alpha, average)
+    num_instances = columns.num_instances
+    observed = columns.differences(columns.matrix.sum(axis=0)[None])[0]
+
+    extreme = np.zeros(len(observed))
+    blocks = _iter_resample_indices(num_instances, num_resamples, seed, block_size)
+    for start, stop, indices in blocks:
+        # The number of times each instance is drawn, so that the sums are one product.
+        offsets = np.arange(stop - start)[:, None] * num_instances
+        counts = np.bincount((indices + offsets).ravel(), minlength=indices.size)
+        counts = counts.reshape(indices.shape).astype(np.float64)
+        differences = columns.differences(counts @ columns.matrix)
+        distances = np.abs(differences - observed)
+        extreme += (distances >= np.abs(observed) - _TOLERANCE).sum(axis=0)
+    return columns.results(observed, extreme / num_resamples)
+
+
+def permutation_test(
+    system_stats,
+    baseline_stats,
+    alpha=None,
+    num_rounds=None,
+    average=None,
+    seed=None,
+    block_size=None,
+):
+    """
+    Test whether the scores of two systems on the same instances differ with approximate
+    randomization. In each round, the outputs of the systems are swapped on a random half
+    of the instances, and the p-value is the smoothed fraction of rounds whose difference
+    is at least as large as the observed one.
+
+    >>> system = [RougeStats(2, 2, 2), RougeStats(1, 2, 2)] * 10
+    >>> recall, _, _ = permutation_test(system, system)
+    >>> recall.difference, recall.p_value
+    (0.0, 1.0)
+
+    :param system_stats: RougeStats of arrays or a list of RougeStats, one per instance.
+        To test several metrics at once, a dict of them by metric.
+    :param baseline_stats: the same as system_stats, for the other system.
+    :param alpha: weight on the recall (default 0.5).
+    :param num_rounds: Default is DEFAULT_NUM_ROUNDS.
+    :param average: one of rouge.bootstrap.AVERAGES. Default is "macro".
+    :param seed: the seed of the numpy Generator. Default is DEFAULT_SEED.
+    :param block_size: the number of swaps drawn at once. Default is DEFAULT_BLOCK_SIZE.
+    :return: RougeScore of SignificanceTest, or a dict of them by metric.
+    :raise ValueError: If the systems do not have the same instances and metrics.
+    """
+    if num_rounds is None:
+        num_rounds = DEFAULT_NUM_ROUNDS
+    if seed is None:
+        seed = DEFAULT_SEED
+    if block_size is None:
+        block_size = DEFAULT_BLOCK_SIZE
+    if not num_rounds > 0:
+        raise ValueError("num_rounds must be positive")
+    columns = _PairedColumns(system_stats, baseline_stats, alpha, average)
+    num_instances = columns.num_instances
+    totals = columns.matrix.sum(axis=0)
+    observed = columns.differences(totals[None])[0]
+
+    # Swapping an instance moves the difference of its columns from one system to the other.
+    num_columns = columns.matrix.shape[1]
+    system_columns = np.arange(num_columns) % 6 < 3
+    swaps = columns.matrix.copy()
+    swaps[:, system_columns] = (
+        columns.matrix[:, ~system_columns] - columns.matrix[:, system_columns]
+    )
+    swaps[:, ~system_columns] = -swaps[:, system_columns]
+
+    generator = np.random.default_rng(seed)
+    extreme = np.zeros(len(observed))
+    step = max(block_size // num_instances, 1)
+    for start in range(0, num_rounds, step):
+        stop = min(start + step, num_rounds)
+        swapped = generator.integers(2, size=(stop - start, num_instances)).astype(np.float64)
+        differences = columns.differences(totals + swapped @ swaps)
+        extreme += (np.abs(differences) >= np.abs(observed) - _TOLERANCE).sum(axis=0)
+    return columns.results(observed, (extreme + 1) / (num_rounds + 1))
@@ -0,0 +1,265 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+"""
+Precomputed reference statistics saved as memory-mappable numpy files.
+
+A store is a directory holding the interned token ids of the references and, for each
+n-gram order, the distinct n-grams of each reference with their counts.
+The arrays are loaded with numpy.load(mmap_mode='r'), so that processes loading the same
+store share one page-cached copy, and only the references used are read from disk.
+
+Lookups are not zero-copy: the first use of a reference copies its tokens out of the map and
+builds the Counter of its n-grams, like ReferenceIndex does. So the store keeps the indexes of
+the references used last, and scoring a reference again reuses its counts.
+"""
+
+import array
+import collections
+import json
+import os
+
+import numpy as np
+
+from rouge.batch import _encode_corpus
+from rouge.metrics import DEFAULT_NGRAM_ORDERS
+from rouge.metrics import ReferenceIndex
+from rouge.vocabulary import TYPECODE
+from rouge.vocabulary import Vocabulary
+
+__all__ = ["ReferenceStore", "save_references", "load_references"]
+
+# Bumped when the layout of the files changes.
+FORMAT_VERSION = 1
+
+# The number of references whose index a store keeps after use.
+DEFAULT_CACHE_SIZE = 4096
+
+_META_FILE = "meta.json"
+_VOCABULARY_FILE = "vocabulary.json"
+_DTYPE = np.dtype(TYPECODE)
+
+
+def _ngram_file(name, n):
+    return "%s_%d.npy" % (name, n)
+
+
+def _count_reference_ngrams(ids, offsets, n):
+    """
+    Find the distinct n-grams of each reference and count them.
+    N-grams do not cross references.
+
+    >>> ids = np.array([0, 1, 0, 1, 2, 2])
+    >>> ngrams, counts, ngram_offsets = _count_reference_ngrams(ids, np.array([0, 4, 6]), 2)
+    >>> ngrams.tolist(), counts.tolist(), ngram_offsets.tolist()
+    ([[0, 1], [1, 0], [2, 2]], [2, 1, 1], [0, 2, 3])
+
+    :param ids: the flat int64 array of token ids of all the references.
+    :param offsets: the int64 array of where each reference starts, and the end.
+    :param n: int.
+    :return: a 3-tuple, the (count, n) array of n-grams sorted within each reference,
+        their counts, and the int64 array of where the n-grams of each reference start.
+    """
+    num_references = len(offsets) - 1
+    references = np.repeat(np.arange(num_references), np.diff(offsets))
+    starts = np.arange(len(ids) - n + 1) if len(ids) >= n else np.arange(0)
+    starts = starts[starts + n <= offsets[references[starts] + 1]]
+    rows = np.empty((len(starts), n + 1), dtype=np.int64)
+    rows[:, 0] = references[starts]
+    for k in range(n):
+        rows[:, k + 1] = ids[starts + k]
+    rows, counts = np.unique(rows, axis=0, return_counts=True)
+    ngram_offsets = np.searchsorted(rows[:, 0], np.arange(num_references + 1))
+    return rows[:, 1:].astype(_DTYPE), counts.astype(_DTYPE), ngram_offsets
+
+
+def save_references(path, references, vocabulary=None, orders=None):
+    """
+    Compute the statistics of reference sentences and save them as a store in directory path.
+
+    :param path: the directory to write. It is created if needed.
+    :param references: a list of reference sentences, either plain or interned by vocabulary.
+    :param vocabulary: the Vocabulary to intern tokens. Default is a new one.
+        The store keeps it to encode the summaries.
+    :param orders: the n-gram orders to precompute. Default is DEFAULT_NGRAM_ORDERS.
+    """
+    if vocabulary is None:
+        vocabulary = Vocabulary()
+    if orders is None:
+        orders = DEFAULT_NGRAM_ORDERS
+    orders = sorted(set(orders))
+    ids, lengths = _encode_corpus(references, vocabulary)
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "tokens.npy"), ids.astype(_DTYPE))
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    for n in orders:
+        ngrams, counts, ngram_offsets = _count_reference_ngrams(ids, offsets, n)
+        np.save(os.path.join(path, _ngram_file("ngrams", n)), ngrams)
+        np.save(os.path.join(path, _ngram_file("counts", n)), counts)
+        np.save(os.path.join(path, _ngram_file("offsets", n)), ngram_offsets)
+
+    with open(os.path.join(path, _VOCABULARY_FILE), "w") as f:
+        json.dump(vocabulary.decode(range(len(vocabulary))), f)
+    with open(os.path.join(path, _META_FILE), "w") as f:
+        json.dump(
+            {
+                "version": FORMAT_VERSION,
+                "typecode": TYPECODE,
+                "orders": orders,
+                "num_references": len(references),
+            },
+            f,
+        )
+
+
+def load_references(path, cache_size=None):
+    """
+    Load a store written by save_references(). The arrays are memory mapped.
+
+    :param path: the directory of the store.
+    :param cache_size: see ReferenceStore.
+    :return: ReferenceStore.
+    :raise ValueError: if the store has an unknown format.
+    """
+    return ReferenceStore(path, cache_size)
+
+
+class _StoredReferenceIndex(ReferenceIndex):
+    """
+    ReferenceIndex of a reference in a store, whose packed n-gram counts are read from it.
+    """
+
+    def __init__(self, store, i):
+        super().__init__([store.tokens(i)])
+        self._tokens = self.sentences[0]
+        self._store = store
+        self._i = i
+
+    def ngram_counts(self, n, packed=False):
+        if packed and n in self._store.orders:
+            key = ("ngrams", n, packed)
+            return self._get(key, lambda: self._store.ngram_counts(self._i, n))
+        return super().ngram_counts(n, packed)
+
+
+class ReferenceStore:
+    """
+    The references of a store on disk. Indexing it gives the ReferenceIndex of a
+    reference sentence, which every metric accepts in place of the reference.
+    Summaries must be encoded by the vocabulary of the store.
+
+    The indexes of the references used last are kept, with the counts they computed,
+    so that indexing a reference again returns the same ReferenceIndex.
+
+    >>> import tempfile
+    >>> path = tempfile.mkdtemp()
+    >>> save_references(path, ['the police killed the gunman'.split()])
+    >>> store = load_references(path)
+    >>> summary = store.vocabulary.encode('the gunman police killed'.split())
+    >>> from rouge.metrics import rouge_n_sentence_level
+    >>> rouge_n_sentence_level(summary, store[0], 2).recall
+    0.5
+    >>> store[0] is store[-1]
+    True
+    """
+
+    def __init__(self, path, cache_size=None):
+        """
+        :param path: the directory of the store.
+        :param cache_size: the number of indexes kept after use. Default is DEFAULT_CACHE_SIZE.
+        """
+        if cache_size is None:
+            cache_size = DEFAULT_CACHE_SIZE
+        self.cache_size = cache_size
+        self._indexes = collections.OrderedDict()
+        with open(os.path.join(path, _META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION or meta.get("typecode") != TYPECODE:
+            raise ValueError("unsupported store format: %r" % meta)
+        with open(os.path.join(path, _VOCABULARY_FILE)) as f:
+            self.vocabulary = Vocabulary(json.load(f))
+        self.orders = tuple(meta["orders"])
+
+        def load(name):
+            # A plain view of the memory map, which is much cheaper to slice.
+            return np.load(os.path.join(path, name), mmap_mode="r").view(np.ndarray)
+
+        self._tokens = load("tokens.npy")
+        self._offsets = load("offsets.npy")
+        self._ngrams = {n: load(_ngram_file("ngrams", n)) for n in self.orders}
+        self._counts = {n: load(_ngram_file("counts", n)) for n in self.orders}
+        self._ngram_offsets = {n: load(_ngram_file("offsets", n)) for n in self.orders}
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError("reference index out of range")
+        i %= len(self)
+        index = self._indexes.get(i)
+        if index is not None:
+            self._indexes.move_to_end(i)
+            return index
+        index = self._indexes[i] = _StoredReferenceIndex(self, i)
+        if len(self._indexes) > self.cache_size:
+            self._indexes.popitem(last=False)
+        return index
+
+    def tokens(self, i):
+        """
+        Return the token ids of the ith reference.
+
+        :param i: int.
+        :return: an array of token ids, as given by Vocabulary.encode().
+        """
+        tokens = self._tokens[self._offsets[i] : self._offsets[i + 1]]
+        # The keys are native bytes, while the file may come from another byte order.
+        return array.array(TYPECODE, tokens.astype(_DTYPE, copy=False).tobytes())
+
+    def ngram_counts(self, i, n):
+        """
+        Return the counts of the packed n-grams of the ith reference,
+        the same as ReferenceIndex.ngram_counts(n, packed=True).
+
+        :param i: int.
+        :param n: one of the orders of the store.
+        :return: collections.Counter.
+        """
+        start, stop = self._ngram_offsets[n][i : i + 2].tolist()
+        counts = self._counts[n][start:stop].tolist()
+        ngrams = self._ngrams[n][start:stop].astype(_DTYPE, copy=False)
+        if n == 1:
+            keys = ngrams[:, 0].tolist()
+        else:
+            buffer = ngrams.tobytes()
+            size = ngrams.itemsize * n
+            keys = [buffer[k : k + size] for k in range(0, len(buffer), size)]
+        ngram_counts = collections.Counter()
+        # Skip the generic path of Counter.update(), since the keys are distinct.
+        dict.update(ngram_counts, zip(keys, counts))
+        return ngram_counts
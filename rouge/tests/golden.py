@@ -0,0 +1,281 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Scores of the perl script recorded for the test data, so that the tests compare with them
+instead of running the perl script for every pair.
+
+The functions have the signatures of those of rouge.tests.wrapper. By default they look up
+the recorded scores, and skip the test if there are none. With ROUGE_TEST_MODE=live, they
+run the perl script through rouge.tests.wrapper, which needs Pythonrouge.
+
+To record the scores again, run:
+    python -m rouge.tests.golden
+This runs the ROUGE-1.5.5.pl bundled in rouge.wrapper with SPL configs, which are never parsed
+as XML. Still, the script loads XML::DOM, which needs XML::Parser, and DB_File at startup,
+so perl must have them.
+"""
+import hashlib
+import json
+import os
+import unittest
+
+from rouge.tests import load_sentence_pairs, load_summary_pairs, summary, reference
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "data", "ROUGE-golden.json")
+FORMAT_VERSION = 1
+
+# The environment variable choosing the mode, and its values.
+MODE_VARIABLE = "ROUGE_TEST_MODE"
+GOLDEN = "golden"
+LIVE = "live"
+
+# The options of each run of the perl script, which together give every method the tests use.
+# ROUGE-S and ROUGE-SU cannot be computed by the same run.
+_RECORD_RUNS = (
+    dict(max_ngram=4, wlcs_weight=1.2, skip_distance=4, skip_with_unigram=True),
+    dict(skip_distance=4, no_rouge_l=True),
+)
+
+# The golden file, once loaded.
+_golden = None
+
+
+def _sentence_text(sentence):
+    # The example pair of rouge.tests is passed to the wrapper as lists of words.
+    return sentence if isinstance(sentence, str) else " ".join(sentence)
+
+
+def golden_key(summary_sentences, reference_sentences):
+    """
+    Hash a summary and its reference into the key of their scores.
+
+    >>> golden_key(['a b'], ['c']) == golden_key([['a', 'b']], ['c'])
+    True
+
+    :param summary_sentences: a list of sentences, each a string or a list of words.
+    :param reference_sentences: a list of sentences, each a string or a list of words.
+    :return: str.
+    """
+    data = json.dumps(
+        [list(map(_sentence_text, summary_sentences)), list(map(_sentence_text, reference_sentences))]
+    )
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _load_golden():
+    global _golden
+    if _golden is None and os.path.exists(GOLDEN_PATH):
+        with open(GOLDEN_PATH) as f:
+            _golden = json.load(f)
+        if _golden["version"] != FORMAT_VERSION:
+            raise ValueError("unsupported golden file version: %r" % _golden["version"])
+    return _golden
+
+
+def _wrapper():
+    # Imported lazily, since it needs Pythonrouge.
+    from rouge.tests import wrapper
+
+    return wrapper
+
+
+def _score(method, summary_sentences, reference_sentences, live_fn, *args):
+    """
+    Look up the recorded score of a method, or compute it with live_fn in live mode.
+
+    :return: a 3-tuple, recall, precision and f1.
+    :raise unittest.SkipTest: if there is no golden file.
+    :raise KeyError: if the golden file has no score of the pair.
+    """
+    if os.environ.get(MODE_VARIABLE, GOLDEN) == LIVE:
+        return getattr(_wrapper(), live_fn)(*args)
+    golden = _load_golden()
+    if golden is None:
+        raise unittest.SkipTest("no golden scores in %s" % GOLDEN_PATH)
+    key = golden_key(summary_sentences, reference_sentences)
+    try:
+        scores = golden["scores"][key]
+    except KeyError:
+        raise KeyError("no golden score of %r, record them again" % key)
+    return tuple(scores[golden["methods"].index(method)])
+
+
+def rouge_n_sentence_level(summary_sentence, reference_sentence, n, alpha=None):
+    return _score(
+        "ROUGE-%d" % n,
+        [summary_sentence],
+        [reference_sentence],
+        "rouge_n_sentence_level",
+        summary_sentence,
+        reference_sentence,
+        n,
+    )
+
+
+def rouge_n_summary_level(summary_sentences, reference_sentences, n, alpha=None):
+    return _score(
+        "ROUGE-%d" % n,
+        summary_sentences,
+        reference_sentences,
+        "rouge_n_summary_level",
+        summary_sentences,
+        reference_sentences,
+        n,
+    )
+
+
+def rouge_l_sentence_level(summary_sentence, reference_sentence, alpha=None):
+    return _score(
+        "ROUGE-L",
+        [summary_sentence],
+        [reference_sentence],
+        "rouge_l_sentence_level",
+        summary_sentence,
+        reference_sentence,
+    )
+
+
+def rouge_l_summary_level(summary_sentences, reference_sentences, alpha=None):
+    return _score(
+        "ROUGE-L",
+        summary_sentences,
+        reference_sentences,
+        "rouge_l_summary_level",
+        summary_sentences,
+        reference_sentences,
+    )
+
+
+def rouge_w_sentence_level(summary_sentence, reference_sentence):
+    return _score(
+        "ROUGE-W-1.2",
+        [summary_sentence],
+        [reference_sentence],
+        "rouge_w_sentence_level",
+        summary_sentence,
+        reference_sentence,
+    )
+
+
+def rouge_w_summary_level(summary_sentences, reference_sentences):
+    return _score(
+        "ROUGE-W-1.2",
+        summary_sentences,
+        reference_sentences,
+        "rouge_w_summary_level",
+        summary_sentences,
+        reference_sentences,
+    )
+
+
+def rouge_s_sentence_level(summary_sentence, reference_sentence):
+    return _score(
+        "ROUGE-S4",
+        [summary_sentence],
+        [reference_sentence],
+        "rouge_s_sentence_level",
+        summary_sentence,
+        reference_sentence,
+    )
+
+
+def rouge_s_summary_level(summary_sentences, reference_sentences):
+    return _score(
+        "ROUGE-S4",
+        summary_sentences,
+        reference_sentences,
+        "rouge_s_summary_level",
+        summary_sentences,
+        reference_sentences,
+    )
+
+
+def rouge_su_sentence_level(summary_sentence, reference_sentence):
+    return _score(
+        "ROUGE-SU4",
+        [summary_sentence],
+        [reference_sentence],
+        "rouge_su_sentence_level",
+        summary_sentence,
+        reference_sentence,
+    )
+
+
+def rouge_su_summary_level(summary_sentences, reference_sentences):
+    return _score(
+        "ROUGE-SU4",
+        summary_sentences,
+        reference_sentences,
+        "rouge_su_summary_level",
+        summary_sentences,
+        reference_sentences,
+    )
+
+
+def _iter_cases():
+    """
+    :return: an iterator of the (summary sentences, reference sentences) compared by the tests.
+    """
+    yield [summary], [reference]
+    for _, theirs in load_sentence_pairs():
+        yield [theirs[0]], [theirs[1]]
+    for _, theirs in load_summary_pairs():
+        yield theirs
+
+
+def record(path=None):
+    """
+    Score every case of the tests with the perl script, in a single run per set of options,
+    and write the scores to the golden file.
+
+    :param path: Default is GOLDEN_PATH.
+    """
+    from rouge.wrapper.perl import run_evals
+
+    if path is None:
+        path = GOLDEN_PATH
+    cases = {}
+    for summary_sentences, reference_sentences in _iter_cases():
+        cases[golden_key(summary_sentences, reference_sentences)] = (
+            [_sentence_text(sentence).split() for sentence in summary_sentences],
+            [[_sentence_text(sentence).split() for sentence in reference_sentences]],
+        )
+    scores = {}
+    for kwargs in _RECORD_RUNS:
+        scores.update(run_evals(cases.values(), **kwargs))
+
+    methods = list(scores)
+    # One pair per line, so that the file diffs well.
+    lines = []
+    for index, key in enumerate(cases):
+        pair_scores = [list(scores[method][index]) for method in methods]
+        lines.append("%s: %s" % (json.dumps(key), json.dumps(pair_scores)))
+    with open(path, "w") as f:
+        f.write('{"version": %d, "methods": %s, "scores": {\n' % (FORMAT_VERSION, json.dumps(methods)))
+        f.write(",\n".join(lines))
+        f.write("\n}}\n")
+
+
+if __name__ == "__main__":
+    record()
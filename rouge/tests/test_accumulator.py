@@ -0,0 +1,108 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing RougeAccumulator and its files."""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from rouge.tests import load_sentence_pairs
+
+from rouge import metrics
+from rouge.accumulator import RougeAccumulator
+from rouge.accumulator import load_accumulators, merge_accumulator_files, save_accumulators
+from rouge.batch import macro_average, micro_average
+
+
+METRICS = {
+    "rouge_2": lambda summary, reference: metrics.rouge_n_sentence_level_stats(summary, reference, 2),
+    "rouge_l": metrics.rouge_l_sentence_level_stats,
+    "rouge_w": metrics.rouge_w_sentence_level_stats,
+}
+
+
+def accumulate(pairs):
+    accumulators = {name: RougeAccumulator() for name in METRICS}
+    for summary, reference in pairs:
+        for name, stats_fn in METRICS.items():
+            accumulators[name].add(stats_fn(summary, reference))
+    return accumulators
+
+
+class TestRougeAccumulator(unittest.TestCase):
+    def setUp(self):
+        self.pairs = [ours for ours, _ in load_sentence_pairs()]
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_averages(self):
+        for name, accumulator in accumulate(self.pairs).items():
+            stats = accumulator.stats()
+            for alpha in (0.5, 0.9):
+                for first, second in zip(accumulator.micro_average(alpha), micro_average(stats, alpha)):
+                    self.assertAlmostEqual(first, second)
+                for first, second in zip(accumulator.macro_average(alpha), macro_average(stats, alpha)):
+                    self.assertAlmostEqual(first, second)
+
+    def test_merge(self):
+        # The scores do not depend on how the corpus is sharded.
+        expected = accumulate(self.pairs)
+        random.seed(1)
+        for num_shards in (1, 3, 7):
+            shards = [self.pairs[i::num_shards] for i in range(num_shards)]
+            random.shuffle(shards)
+            merged = {name: RougeAccumulator() for name in METRICS}
+            for shard in shards:
+                for name, accumulator in accumulate(shard).items():
+                    merged[name].merge(accumulator)
+            for name, accumulator in merged.items():
+                self.assertEqual(len(accumulator), len(self.pairs))
+                self.assertEqual(accumulator.micro_average(), expected[name].micro_average())
+                self.assertEqual(accumulator.macro_average(), expected[name].macro_average())
+
+    def test_files(self):
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.path, "shard%d.json" % i)
+            save_accumulators(path, accumulate(self.pairs[i::3]))
+            paths.append(path)
+        loaded = load_accumulators(paths[0])
+        self.assertEqual(loaded["rouge_w"].stats(), accumulate(self.pairs[::3])["rouge_w"].stats())
+
+        merged = merge_accumulator_files(paths)
+        expected = accumulate(self.pairs)
+        for name, accumulator in merged.items():
+            self.assertEqual(accumulator.micro_average(), expected[name].micro_average())
+
+    def test_weight(self):
+        accumulator = RougeAccumulator()
+        accumulator.add(metrics.RougeStats(1, 2, 3))
+        with self.assertRaises(ValueError):
+            accumulator.add(metrics.RougeStats(1.0, 2.0, 3.0, 1.2))
+        empty = RougeAccumulator()
+        self.assertEqual(empty.macro_average(), (0.0, 0.0, 0.0))
+        self.assertEqual(len(empty.merge(accumulator)), 1)
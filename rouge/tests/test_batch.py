@@ -0,0 +1,141 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the vectorized batch metrics."""
+import array
+import random
+import unittest
+
+from rouge.tests import load_sentence_pairs
+
+from rouge.batch import pad_sentences, rouge_l_batch, rouge_n_batch
+from rouge.metrics import rouge_l_sentence_level, rouge_n_sentence_level
+from rouge.vocabulary import Vocabulary
+
+
+def _load_corpus():
+    pairs = [ours for ours, _ in load_sentence_pairs()]
+    # Empty sentences on either side.
+    pairs += [([], []), ([], ["a"]), (["a"], [])]
+    return [summary for summary, _ in pairs], [reference for _, reference in pairs]
+
+
+class BatchTestCase(unittest.TestCase):
+    def assertScoresEqual(self, batch_score, scores):
+        self.assertEqual(len(batch_score.recall), len(scores))
+        for i, score in enumerate(scores):
+            self.assertEqual(
+                (
+                    batch_score.recall[i],
+                    batch_score.precision[i],
+                    batch_score.f1_measure[i],
+                ),
+                tuple(score),
+            )
+
+
+class TestRougeNBatch(BatchTestCase):
+    def test_sentence_level(self):
+        summaries, references = _load_corpus()
+        for n in (1, 2, 3, 4):
+            for alpha in (None, 0.9):
+                scores = [
+                    rouge_n_sentence_level(summary, reference, n, alpha)
+                    for summary, reference in zip(summaries, references)
+                ]
+                batch_score = rouge_n_batch(summaries, references, n, alpha)
+                self.assertScoresEqual(batch_score, scores)
+
+    def test_interned(self):
+        summaries, references = _load_corpus()
+        vocab = Vocabulary()
+        batch_score = rouge_n_batch(
+            vocab.encode_sentences(summaries), vocab.encode_sentences(references), 2
+        )
+        scores = [
+            rouge_n_sentence_level(summary, reference, 2)
+            for summary, reference in zip(summaries, references)
+        ]
+        self.assertScoresEqual(batch_score, scores)
+
+    def test_large_ids(self):
+        # Ids this large cannot be packed into int64 and take the dense path.
+        rng = random.Random(0)
+        tokens = [rng.randrange(1 << 40) for _ in range(5)]
+        summaries, references = [], []
+        for _ in range(50):
+            for sentences in (summaries, references):
+                sentence = [rng.choice(tokens) for _ in range(rng.randint(0, 10))]
+                sentences.append(array.array("q", sentence))
+        scores = [
+            rouge_n_sentence_level(list(summary), list(reference), 4)
+            for summary, reference in zip(summaries, references)
+        ]
+        self.assertScoresEqual(rouge_n_batch(summaries, references, 4), scores)
+
+    def test_empty(self):
+        batch_score = rouge_n_batch([], [], 1)
+        self.assertEqual(len(batch_score.f1_measure), 0)
+
+    def test_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            rouge_n_batch([["a"]], [], 1)
+
+
+class TestRougeLBatch(BatchTestCase):
+    def _rouge_l_batch(self, summaries, references, alpha=None):
+        vocab = Vocabulary()
+        summaries, summary_lengths = pad_sentences(summaries, vocab)
+        references, reference_lengths = pad_sentences(references, vocab)
+        return rouge_l_batch(summaries, summary_lengths, references, reference_lengths, alpha)
+
+    def test_sentence_level(self):
+        summaries, references = _load_corpus()
+        for alpha in (None, 0.9):
+            scores = [
+                rouge_l_sentence_level(summary, reference, alpha)
+                for summary, reference in zip(summaries, references)
+            ]
+            self.assertScoresEqual(self._rouge_l_batch(summaries, references, alpha), scores)
+
+    def test_long_sentences(self):
+        # References spanning several 64-bit words, so that additions carry.
+        rng = random.Random(0)
+        summaries, references = [], []
+        for _ in range(100):
+            for sentences in (summaries, references):
+                sentences.append([rng.randrange(3) for _ in range(rng.randint(0, 300))])
+        scores = [
+            rouge_l_sentence_level(summary, reference)
+            for summary, reference in zip(summaries, references)
+        ]
+        self.assertScoresEqual(self._rouge_l_batch(summaries, references), scores)
+
+    def test_empty(self):
+        batch_score = self._rouge_l_batch([], [])
+        self.assertEqual(len(batch_score.f1_measure), 0)
+
+    def test_length_mismatch(self):
+        summaries, summary_lengths = pad_sentences([["a"]])
+        with self.assertRaises(ValueError):
+            rouge_l_batch(summaries, summary_lengths, summaries[:0], summary_lengths[:0])
@@ -0,0 +1,148 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the benchmark workloads, runner and regression gating."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from rouge.benchmarks import workloads
+from rouge.benchmarks.runner import METRICS, LEVELS, DEFAULT_THRESHOLD
+from rouge.benchmarks.runner import compare, load_results, run_benchmarks, save_results
+
+
+def _result(pairs_per_second, peak_memory, pairs=10, tokens=100):
+    return {
+        "pairs": pairs,
+        "tokens": tokens,
+        "pairs_per_second": pairs_per_second,
+        "peak_memory": peak_memory,
+    }
+
+
+class TestWorkloads(unittest.TestCase):
+    @unittest.skipUnless(os.path.isdir(workloads.TESTDATA_DIR), "no testdata")
+    def test_testdata(self):
+        workload = workloads.load_testdata(limit=100)
+        self.assertEqual(len(workload.pairs), 100)
+        summary, reference = workload.pairs[0]
+        self.assertEqual(summary, "thanks ! __eou__".split())
+
+    def test_synthetic(self):
+        long = workloads.long_documents(count=20, length=30)
+        self.assertEqual(len(long.pairs), 20)
+        self.assertEqual(long, workloads.long_documents(count=20, length=30))
+        self.assertTrue(all(1 <= len(sentence) <= 60 for pair in long.pairs for sentence in pair))
+
+        duplicate = workloads.high_duplicates(long.pairs, count=100, distinct=5)
+        self.assertEqual(len(duplicate.pairs), 100)
+        self.assertEqual(len({tuple(map(tuple, pair)) for pair in duplicate.pairs}), 5)
+
+    def test_make_summaries(self):
+        workload = workloads.long_documents(count=25, summary_size=10)
+        summaries = workloads.make_summaries(workload)
+        self.assertEqual([len(summary) for summary, _ in summaries], [10, 10, 5])
+        self.assertEqual(summaries[1][1][0], workload.pairs[10][1])
+
+
+class TestRunner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_run_benchmarks(self):
+        long = workloads.long_documents(count=4, length=5, summary_size=2)
+        duplicate = workloads.high_duplicates(long.pairs, count=6, distinct=2)
+        names = []
+        results = run_benchmarks(
+            [long, duplicate],
+            repeat=1,
+            min_time=0,
+            callback=lambda name, result: names.append(name),
+        )
+        expected = [
+            "%s/%s/%s" % (workload.name, metric, level)
+            for workload in (long, duplicate)
+            for level in workload.levels
+            for metric in METRICS
+        ]
+        self.assertEqual(names, expected)
+        self.assertEqual(list(results), expected)
+        tokens = sum(len(s) + len(r) for s, r in long.pairs)
+        for name, result in results.items():
+            self.assertEqual(result["pairs"], 6 if name.startswith("duplicate") else 4)
+            self.assertGreater(result["pairs_per_second"], 0)
+            self.assertGreater(result["peak_memory"], 0)
+        result = results["long/rouge_l/summary"]
+        self.assertEqual(result["tokens"], tokens)
+        self.assertAlmostEqual(
+            result["tokens_per_second"] / result["pairs_per_second"], tokens / 4
+        )
+
+    def test_levels(self):
+        workload = workloads.long_documents(count=2, length=3)
+        results = run_benchmarks(
+            [workload], ["rouge_l"], levels=LEVELS, repeat=1, min_time=0
+        )
+        self.assertEqual(
+            sorted(results), ["long/rouge_l/%s" % level for level in sorted(LEVELS)]
+        )
+
+    def test_save_and_load(self):
+        path = os.path.join(self.directory, "results.json")
+        results = {"a/rouge_l/sentence": _result(10.0, 100)}
+        save_results(path, results)
+        self.assertEqual(load_results(path), results)
+
+
+class TestCompare(unittest.TestCase):
+    def test_throughput(self):
+        baseline = {"a": _result(100.0, 0), "b": _result(100.0, 0)}
+        slower = 100.0 * (1 - DEFAULT_THRESHOLD) - 1
+        results = {"a": _result(slower, 0), "b": _result(90.0, 0), "c": _result(1.0, 0)}
+        [regression] = compare(results, baseline)
+        self.assertEqual(regression.benchmark, "a")
+        self.assertEqual(regression.measure, "pairs_per_second")
+        self.assertAlmostEqual(regression.change, 1 - slower / 100)
+        self.assertEqual(compare(results, baseline, threshold=0.5), [])
+        self.assertEqual(len(compare(results, baseline, threshold=0.05)), 2)
+
+    def test_memory(self):
+        baseline = {"a": _result(1.0, 1 << 20), "b": _result(1.0, 1000)}
+        results = {"a": _result(1.0, 2 << 20), "b": _result(1.0, 2000)}
+        # b grows by less than the slack.
+        [regression] = compare(results, baseline)
+        self.assertEqual(regression.measure, "peak_memory")
+        self.assertEqual(regression.change, 1.0)
+        self.assertEqual(compare(results, baseline, memory_threshold=1.5), [])
+
+    def test_different_workload(self):
+        with self.assertRaises(ValueError):
+            compare({"a": _result(1.0, 0, pairs=5)}, {"a": _result(1.0, 0)})
+
+
+if __name__ == "__main__":
+    unittest.main()
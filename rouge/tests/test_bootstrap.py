@@ -0,0 +1,144 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the bootstrap confidence intervals against a port of the perl script."""
+import random
+import unittest
+
+from rouge.bootstrap import _perl_resample_indices
+from rouge.bootstrap import bootstrap_confidence_intervals
+from rouge.metrics import RougeStats, score_from_stats
+
+
+class PerlRandom:
+    """The drand48 generator behind srand() and rand() of perl."""
+
+    def __init__(self, seed):
+        self.state = 0x330E + (seed << 16)
+
+    def rand(self, n):
+        self.state = (self.state * 0x5DEECE66D + 0xB) & ((1 << 48) - 1)
+        return self.state / 2 ** 48 * n
+
+
+def perl_bootstrap(scores, num_resamples, confidence):
+    """A port of bootstrapResampling() and the confidence intervals of the perl script."""
+    samples = [[], [], []]
+    for i in range(num_resamples):
+        generator = PerlRandom(i)
+        sums = [0, 0, 0]
+        for _ in scores:
+            score = scores[int(generator.rand(len(scores)))]
+            sums = [total + value for total, value in zip(sums, score)]
+        for sample, total in zip(samples, sums):
+            sample.append(total / len(scores))
+    delta = num_resamples * ((100 - confidence) / 2.0) / 100.0
+    upper = int(num_resamples - delta - 1)
+    lower = int(delta)
+    ratio = num_resamples - delta - 1 - upper
+    intervals = []
+    for sample in samples:
+        sample.sort()
+        intervals.append(
+            (
+                sum(sample) / len(sample),
+                sample[lower] + (sample[lower + 1] - sample[lower]) * ratio,
+                sample[upper] + (sample[upper + 1] - sample[upper]) * ratio,
+            )
+        )
+    return intervals
+
+
+def random_stats(size, weight=None):
+    stats = []
+    for _ in range(size):
+        ref_total = random.randint(0, 20)
+        cand_total = random.randint(1, 20)
+        hits = random.randint(0, min(ref_total, cand_total))
+        stats.append(RougeStats(hits, ref_total, cand_total, weight))
+    return stats
+
+
+class TestBootstrap(unittest.TestCase):
+    def setUp(self):
+        random.seed(1)
+
+    def assertIntervalsAlmostEqual(self, first, second):
+        for first_interval, second_interval in zip(first, second):
+            for a, b in zip(first_interval, second_interval):
+                self.assertAlmostEqual(a, b)
+
+    def test_perl_indices(self):
+        # Printed by perl -e 'srand(999); print int(rand(100000))' and so on.
+        self.assertEqual(
+            _perl_resample_indices(100000, [999])[0, :5].tolist(),
+            [10233, 63577, 80348, 92574, 77501],
+        )
+        self.assertEqual(
+            _perl_resample_indices(10, [1]).tolist(), [[0, 4, 8, 3, 5, 0, 1, 9, 7, 3]]
+        )
+
+    def test_macro(self):
+        for size, num_resamples, confidence in ((1, 10, 95), (30, 100, 95), (57, 40, 80)):
+            stats = random_stats(size)
+            expected = perl_bootstrap(
+                [score_from_stats(s, 0.5) for s in stats], num_resamples, confidence
+            )
+            self.assertIntervalsAlmostEqual(
+                bootstrap_confidence_intervals(
+                    stats, 0.5, confidence, num_resamples, block_size=size
+                ),
+                expected,
+            )
+
+    def test_micro(self):
+        stats = random_stats(40, weight=1.2)
+        intervals = bootstrap_confidence_intervals(stats, num_resamples=50, average="micro")
+        for interval in intervals:
+            self.assertLessEqual(interval.low, interval.mean)
+            self.assertLessEqual(interval.mean, interval.high)
+        pooled = RougeStats(*(sum(values) for values in list(zip(*stats))[:3]), 1.2)
+        # Every resample of identical instances pools to the same score.
+        for interval, value in zip(
+            bootstrap_confidence_intervals([pooled] * 5, num_resamples=10, average="micro"),
+            score_from_stats(pooled),
+        ):
+            self.assertAlmostEqual(interval.low, value)
+            self.assertAlmostEqual(interval.high, value)
+
+    def test_seed(self):
+        stats = random_stats(100)
+        first = bootstrap_confidence_intervals(stats, seed=3, num_resamples=200)
+        self.assertEqual(first, bootstrap_confidence_intervals(stats, seed=3, num_resamples=200))
+        self.assertEqual(
+            first,
+            bootstrap_confidence_intervals(stats, seed=3, num_resamples=200, block_size=1),
+        )
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            bootstrap_confidence_intervals([])
+        with self.assertRaises(ValueError):
+            bootstrap_confidence_intervals(random_stats(3), confidence=0)
+        with self.assertRaises(ValueError):
+            bootstrap_confidence_intervals(random_stats(3), average="median")
@@ -0,0 +1,137 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+"""Testing StatsCache and cached_stats."""
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+from rouge.tests import load_sentence_pairs
+
+from rouge import metrics
+from rouge import cache as rouge_cache
+from rouge.cache import StatsCache, cache_key, cached_rouge_n_stats, cached_stats
+from rouge.vocabulary import Vocabulary
+
+
+class CountingStats:
+    """Count the calls to a stats function."""
+
+    def __init__(self, stats_fn):
+        self.stats_fn = stats_fn
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.stats_fn(*args, **kwargs)
+
+
+class TestStatsCache(unittest.TestCase):
+    def setUp(self):
+        self.pairs = [ours for ours, _ in load_sentence_pairs()]
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "stats.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cached_stats(self):
+        for name, stats_fn, params in [
+            ("rouge_n", metrics.rouge_n_sentence_level_stats, {"n": 2}),
+            ("rouge_l", metrics.rouge_l_sentence_level_stats, None),
+            ("rouge_w", metrics.rouge_w_sentence_level_stats, {"weight": 1.5}),
+        ]:
+            expected = [stats_fn(s, r, **(params or {})) for s, r in self.pairs]
+            with StatsCache(self.path) as cache:
+                counting = CountingStats(stats_fn)
+                self.assertEqual(expected, cached_stats(cache, name, counting, self.pairs, params))
+                self.assertEqual(len(set(map(repr, self.pairs))), counting.calls)
+                counting.calls = 0
+                self.assertEqual(expected, cached_stats(cache, name, counting, self.pairs, params))
+                self.assertEqual(0, counting.calls)
+
+    def test_cached_rouge_n_stats(self):
+        orders = (1, 2, 3)
+        expected = {
+            n: [metrics.rouge_n_sentence_level_stats(s, r, n) for s, r in self.pairs] for n in orders
+        }
+        counting = CountingStats(metrics.rouge_n_multi_sentence_level_stats)
+        with StatsCache(self.path) as cache, unittest.mock.patch.object(
+            rouge_cache, "rouge_n_multi_sentence_level_stats", counting
+        ):
+            # The entries are shared with cached_stats().
+            cached_stats(cache, "rouge_n", metrics.rouge_n_sentence_level_stats, self.pairs, {"n": 2})
+            self.assertEqual(expected, cached_rouge_n_stats(cache, self.pairs, orders))
+            # One pass per distinct pair, though the order 2 was cached.
+            self.assertEqual(len(set(map(repr, self.pairs))), counting.calls)
+            counting.calls = 0
+            self.assertEqual(expected, cached_rouge_n_stats(cache, self.pairs, orders))
+            self.assertEqual(0, counting.calls)
+
+    def test_persistence(self):
+        stats_fn = metrics.rouge_l_sentence_level_stats
+        with StatsCache(self.path) as cache:
+            cached_stats(cache, "rouge_l", stats_fn, self.pairs[:10])
+        with StatsCache(self.path) as cache:
+            counting = CountingStats(stats_fn)
+            stats = cached_stats(cache, "rouge_l", counting, self.pairs[:20])
+            self.assertEqual(10, counting.calls)
+            self.assertEqual([stats_fn(s, r) for s, r in self.pairs[:20]], stats)
+
+    def test_keys(self):
+        summary, reference = self.pairs[0]
+        key = cache_key("rouge_n", {"n": 1}, summary, reference)
+        self.assertNotEqual(key, cache_key("rouge_n", {"n": 2}, summary, reference))
+        self.assertNotEqual(key, cache_key("rouge_l", {"n": 1}, summary, reference))
+        self.assertNotEqual(key, cache_key("rouge_n", {"n": 1}, reference, summary))
+
+        vocabulary = Vocabulary()
+        interned = cache_key("rouge_n", {"n": 1}, vocabulary.encode(summary), vocabulary.encode(reference))
+        self.assertNotEqual(key, interned)
+
+        with unittest.mock.patch.object(rouge_cache, "CACHE_VERSION", rouge_cache.CACHE_VERSION + 1):
+            self.assertNotEqual(key, cache_key("rouge_n", {"n": 1}, summary, reference))
+
+    def test_eviction(self):
+        stats_fn = metrics.rouge_l_sentence_level_stats
+        with StatsCache(self.path) as cache:
+            cached_stats(cache, "rouge_l", stats_fn, self.pairs[:30])
+        with StatsCache(self.path, max_entries=40) as cache:
+            # Used again, so the first 10 pairs outlive the next 20.
+            cached_stats(cache, "rouge_l", stats_fn, self.pairs[:10])
+            cached_stats(cache, "rouge_l", stats_fn, self.pairs[30:50])
+            self.assertEqual(40, len(cache))
+            counting = CountingStats(stats_fn)
+            cached_stats(cache, "rouge_l", counting, self.pairs[:10] + self.pairs[30:50])
+            self.assertEqual(0, counting.calls)
+
+        with StatsCache(self.path) as cache:
+            self.assertEqual(30, cache.evict(max_entries=10))
+            self.assertEqual(10, len(cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
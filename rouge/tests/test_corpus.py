@@ -0,0 +1,154 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the parallel corpus scorer."""
+import unittest
+
+from rouge.tests import load_sentence_pairs
+
+from rouge.corpus import iter_sentence_scores, iter_sentence_stats, score_corpus
+from rouge.metrics import (
+    rouge_l_sentence_level,
+    rouge_l_summary_level,
+    rouge_n_sentence_level,
+    rouge_n_summary_level,
+    rouge_su_sentence_level,
+    rouge_su_summary_level,
+    rouge_w_sentence_level,
+    rouge_w_summary_level,
+    score_from_stats,
+)
+
+
+def _load_corpus():
+    pairs = [ours for ours, _ in load_sentence_pairs()][:30]
+    return [summary for summary, _ in pairs], [reference for _, reference in pairs]
+
+
+class TestScoreCorpus(unittest.TestCase):
+    def assertCorpusEqual(self, scores, summaries, references):
+        expected = {
+            "rouge_n_2": (
+                lambda s, r: rouge_n_sentence_level(s, r, 2, alpha=0.8),
+                lambda s, r: rouge_n_summary_level(s, r, 2, alpha=0.8),
+            ),
+            "rouge_l": (
+                lambda s, r: rouge_l_sentence_level(s, r, alpha=0.8),
+                lambda s, r: rouge_l_summary_level(s, r, alpha=0.8),
+            ),
+            "rouge_w": (
+                lambda s, r: rouge_w_sentence_level(s, r, weight=1.5, alpha=0.8),
+                lambda s, r: rouge_w_summary_level(s, r, weight=1.5, alpha=0.8),
+            ),
+            "rouge_su": (
+                lambda s, r: rouge_su_sentence_level(s, r, skip_distance=2, alpha=0.8),
+                lambda s, r: rouge_su_summary_level(s, r, skip_distance=2, alpha=0.8),
+            ),
+        }
+        self.assertEqual(list(scores), list(expected))
+        for name, (sentence_level, summary_level) in expected.items():
+            self.assertEqual(
+                scores[name].sentence_scores,
+                [sentence_level(s, r) for s, r in zip(summaries, references)],
+            )
+            self.assertEqual(
+                scores[name].system_score, summary_level(summaries, references)
+            )
+
+    def _score_corpus(self, summaries, references, **kwargs):
+        return score_corpus(
+            summaries,
+            references,
+            ["rouge_n_2", "rouge_l", "rouge_w", "rouge_su"],
+            alpha=0.8,
+            weight=1.5,
+            skip_distance=2,
+            **kwargs
+        )
+
+    def test_inline(self):
+        summaries, references = _load_corpus()
+        scores = self._score_corpus(summaries, references, workers=1, chunksize=7)
+        self.assertCorpusEqual(scores, summaries, references)
+
+    def test_workers(self):
+        summaries, references = _load_corpus()
+        scores = self._score_corpus(summaries, references, workers=2, chunksize=4)
+        self.assertCorpusEqual(scores, summaries, references)
+
+    def test_duplicates(self):
+        summaries, references = _load_corpus()
+        # Repeated pairs, and repeated references of other summaries.
+        summaries = summaries + summaries[:10] + [summaries[0]] * 3
+        references = references + references[:10] + [references[5]] * 3
+        for workers in (1, 2):
+            scores = self._score_corpus(summaries, references, workers=workers, chunksize=6)
+            self.assertCorpusEqual(scores, summaries, references)
+
+    def test_empty(self):
+        scores = self._score_corpus([], [], workers=1)
+        self.assertEqual(scores["rouge_l"].sentence_scores, [])
+        self.assertEqual(scores["rouge_l"].system_score.f1_measure, 0.0)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            score_corpus([["a"]], [], workers=1)
+        with self.assertRaises(ValueError):
+            score_corpus([["a"]], [["a"]], ["rouge_x"], workers=1)
+        with self.assertRaises(ValueError):
+            score_corpus([["a"]], [["a"]], ["rouge_n_"], workers=1)
+        for name in ["rouge_n_01", "rouge_n_0", "rouge_n_\u0662"]:
+            with self.assertRaisesRegex(ValueError, "rouge_l, rouge_w"):
+                score_corpus([["a"]], [["a"]], [name], workers=1)
+
+
+class TestIterSentenceScores(unittest.TestCase):
+    def test_stream(self):
+        summaries, references = _load_corpus()
+        metrics = ["rouge_l", "rouge_n_1", "rouge_s"]
+        expected = score_corpus(summaries, references, metrics, workers=1)
+        for workers in (1, 2):
+            # A generator, consumed lazily.
+            pairs = ((s, r) for s, r in zip(summaries, references))
+            scores = list(
+                iter_sentence_scores(pairs, metrics, workers=workers, chunksize=4)
+            )
+            self.assertEqual(len(scores), len(summaries))
+            for name in metrics:
+                self.assertEqual(
+                    [score[name] for score in scores], expected[name].sentence_scores
+                )
+
+    def test_empty(self):
+        self.assertEqual(list(iter_sentence_scores([], workers=1)), [])
+
+    def test_stats(self):
+        summaries, references = _load_corpus()
+        metrics = ["rouge_w", "rouge_n_2", "rouge_su"]
+        pairs = list(zip(summaries, references))
+        scores = list(iter_sentence_scores(pairs, metrics, workers=1, alpha=0.3, weight=1.5))
+        stats = list(iter_sentence_stats(pairs, metrics, workers=2, chunksize=4, weight=1.5))
+        self.assertEqual(len(stats), len(scores))
+        for pair_stats, pair_scores in zip(stats, scores):
+            for name in metrics:
+                self.assertEqual(score_from_stats(pair_stats[name], 0.3), pair_scores[name])
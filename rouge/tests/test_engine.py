@@ -0,0 +1,193 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the engines of the DP kernels."""
+import random
+import unittest
+
+from rouge.tests import load_sentence_pairs, load_summary_pairs
+
+from rouge import metrics
+from rouge.metrics import Engine, VerifyingEngine
+from rouge.metrics import get_engine, set_engine, register_engine
+
+STATS_FNS = [
+    (metrics.rouge_l_sentence_level_stats, metrics.rouge_l_summary_level_stats),
+    (metrics.rouge_w_sentence_level_stats, metrics.rouge_w_summary_level_stats),
+]
+
+
+def _broken_lcs_length(x, y, masks=None):
+    return 0
+
+
+BROKEN = Engine("broken", _broken_lcs_length, metrics._lcs_elements, metrics._wlcs_elements)
+
+
+class EngineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = get_engine()
+
+    def tearDown(self):
+        set_engine(self.engine)
+        metrics._ENGINES.pop(BROKEN.name, None)
+
+
+class TestEngines(EngineTestCase):
+    def test_same_stats(self):
+        rng = random.Random(0)
+        sentences = [ours for ours, _ in load_sentence_pairs()]
+        sentences += [
+            [[rng.randrange(4) for _ in range(rng.randint(0, 30))] for _ in range(2)]
+            for _ in range(200)
+        ]
+        summaries = [ours for ours, _ in load_summary_pairs()]
+        for sentence_fn, summary_fn in STATS_FNS:
+            for summary, reference in sentences:
+                self.assertEqual(
+                    sentence_fn(summary, reference, engine="fast"),
+                    sentence_fn(summary, reference, engine="reference"),
+                )
+            for summary, reference in summaries:
+                self.assertEqual(
+                    summary_fn(summary, reference, engine="fast"),
+                    summary_fn(summary, reference, engine="reference"),
+                )
+
+    def test_set_engine(self):
+        register_engine(BROKEN)
+        summary, reference = "a b c".split(), "a c".split()
+        self.assertIs(set_engine("broken"), BROKEN)
+        self.assertEqual(metrics.rouge_l_sentence_level(summary, reference).recall, 0)
+        # The engine of a call overrides the one that is set.
+        self.assertEqual(
+            metrics.rouge_l_sentence_level(summary, reference, engine="fast").recall, 1
+        )
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            set_engine("slow")
+        with self.assertRaises(ValueError):
+            register_engine(Engine(metrics.VERIFY, None, None, None))
+
+
+class TestVerifyingEngine(EngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pairs = [ours for ours, _ in load_sentence_pairs()]
+
+    def test_no_divergence(self):
+        verifier = set_engine(VerifyingEngine(fraction=0.5, seed=0))
+        for summary, reference in self.pairs:
+            metrics.rouge_l_sentence_level(summary, reference)
+        self.assertEqual(verifier.served, {"fast": len(self.pairs)})
+        self.assertTrue(0 < verifier.verified < len(self.pairs))
+        self.assertEqual(verifier.divergences, [])
+
+    def test_divergence(self):
+        verifier = VerifyingEngine(BROKEN, fraction=1.0)
+        with self.assertLogs(metrics.logger, "WARNING"):
+            for summary, reference in self.pairs:
+                stats = metrics.rouge_l_sentence_level_stats(summary, reference, engine=verifier)
+                # The stats of the reference engine are served.
+                expected = metrics.rouge_l_sentence_level_stats(
+                    summary, reference, engine="reference"
+                )
+                self.assertEqual(stats, expected)
+        diverged = sum(1 for summary, reference in self.pairs if set(summary) & set(reference))
+        self.assertEqual(len(verifier.divergences), diverged)
+        self.assertEqual(
+            verifier.served, {"broken": len(self.pairs) - diverged, "reference": diverged}
+        )
+        self.assertEqual(verifier.divergences[0].function, "rouge_l_sentence_level_stats")
+
+    def test_fraction(self):
+        verifier = VerifyingEngine(BROKEN, fraction=0.0)
+        for summary, reference in self.pairs:
+            self.assertEqual(
+                metrics.rouge_l_sentence_level_stats(summary, reference, engine=verifier).hits, 0
+            )
+        self.assertEqual(verifier.verified, 0)
+        self.assertEqual(verifier.served, {"broken": len(self.pairs)})
+
+    def test_by_name(self):
+        verifier = set_engine("verify")
+        self.assertIsInstance(verifier, VerifyingEngine)
+        self.assertIs(get_engine("verify"), verifier)
+        served = sum(verifier.served.values())
+        metrics.rouge_l_sentence_level(*self.pairs[0])
+        metrics.rouge_l_sentence_level(*self.pairs[0], engine="verify")
+        self.assertEqual(sum(verifier.served.values()), served + 2)
+
+    def test_max_divergences(self):
+        verifier = VerifyingEngine(BROKEN, fraction=1.0, max_divergences=2)
+        with self.assertLogs(metrics.logger, "WARNING"):
+            for summary, reference in self.pairs:
+                metrics.rouge_l_sentence_level_stats(summary, reference, engine=verifier)
+        self.assertGreater(verifier.diverged, 2)
+        self.assertEqual(len(verifier.divergences), 2)
+        summary, reference = next(
+            pair for pair in self.pairs if set(pair[0]) & set(pair[1])
+        )
+        self.assertEqual(verifier.divergences[0].sizes, (len(summary), len(reference)))
+
+    def test_multi_reference(self):
+        index = next(i for i, (s, r) in enumerate(self.pairs) if set(s) & set(r))
+        summary, _ = self.pairs[index]
+        references = [reference for _, reference in self.pairs[index : index + 3]]
+        verifier = VerifyingEngine(BROKEN, fraction=1.0)
+        for function in (
+            metrics.rouge_l_sentence_level_multi_reference,
+            metrics.rouge_w_sentence_level_multi_reference,
+        ):
+            self.assertEqual(
+                function(summary, references, engine="fast"),
+                function(summary, references, engine="reference"),
+            )
+        with self.assertLogs(metrics.logger, "WARNING"):
+            score = metrics.rouge_l_sentence_level_multi_reference(
+                summary, references, engine=verifier
+            )
+        self.assertEqual(
+            score, metrics.rouge_l_sentence_level_multi_reference(summary, references)
+        )
+        self.assertEqual(verifier.served, {"reference": 1})
+        self.assertEqual(
+            verifier.divergences[0].function, "rouge_l_sentence_level_multi_reference_stats"
+        )
+
+        summaries = [ours for ours, _ in load_summary_pairs()][:3]
+        summary_sentences = summaries[0][0]
+        references = [reference for _, reference in summaries]
+        for function in (
+            metrics.rouge_l_summary_level_multi_reference,
+            metrics.rouge_w_summary_level_multi_reference,
+        ):
+            self.assertEqual(
+                function(summary_sentences, references, engine="fast"),
+                function(summary_sentences, references, engine="reference"),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the recorded perl scores."""
+import ast
+import os
+import unittest
+
+from rouge.tests import golden
+
+
+def _parse(module_name):
+    with open(os.path.join(os.path.dirname(__file__), module_name + ".py")) as f:
+        return ast.parse(f.read())
+
+
+class TestGolden(unittest.TestCase):
+    def test_live_functions(self):
+        # The wrapper needs Pythonrouge, so its functions are found without importing it.
+        wrapper_functions = {
+            node.name
+            for node in _parse("wrapper").body
+            if isinstance(node, ast.FunctionDef)
+        }
+        live_functions = [
+            node.args[3].value
+            for node in ast.walk(_parse("golden"))
+            if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "_score"
+        ]
+        public_functions = [name for name in vars(golden) if name.startswith("rouge_")]
+        self.assertEqual(sorted(live_functions), sorted(public_functions))
+        self.assertLessEqual(set(live_functions), wrapper_functions)
+
+    def test_golden_key(self):
+        self.assertEqual(
+            golden.golden_key(["a b"], ["c"]), golden.golden_key([["a", "b"]], ["c"])
+        )
+        self.assertNotEqual(golden.golden_key(["a b"], ["c"]), golden.golden_key(["a"], ["b c"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
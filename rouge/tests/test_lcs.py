@@ -0,0 +1,150 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the LCS kernels."""
+import random
+import unittest
+
+from rouge.metrics import _lcs_length
+from rouge.metrics import _lcs_elements
+from rouge.metrics import _wlcs_elements
+from rouge.metrics import _weight_fn
+from rouge.metrics import _weight_tables
+
+
+def _naive_lcs_length(x, y):
+    """
+    Textbook O(nm) DP, used as the oracle for the fast kernels.
+    """
+    table = [[0] * (len(y) + 1) for _ in range(len(x) + 1)]
+    for i in range(1, len(x) + 1):
+        for j in range(1, len(y) + 1):
+            if x[i - 1] == y[j - 1]:
+                table[i][j] = table[i - 1][j - 1] + 1
+            else:
+                table[i][j] = max(table[i - 1][j], table[i][j - 1])
+    return table[len(x)][len(y)]
+
+
+def _naive_elements(x, y, update=None):
+    """
+    Full table DP with the same tie breaking as the kernels.
+    If update is given, compute the weighted LCS with update(k) as the gain of
+    extending a run of k consecutive matches.
+    """
+    n, m = len(x), len(y)
+    length = [[0] * (m + 1) for _ in range(n + 1)]
+    run = [[0] * (m + 1) for _ in range(n + 1)]
+    trace = {}
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            if x[i - 1] == y[j - 1]:
+                k = run[i - 1][j - 1]
+                length[i][j] = length[i - 1][j - 1] + (update(k) if update else 1)
+                run[i][j] = k + 1
+                trace[i, j] = "d"
+            elif length[i - 1][j] > length[i][j - 1]:
+                length[i][j] = length[i - 1][j]
+                trace[i, j] = "u"
+            else:
+                length[i][j] = length[i][j - 1]
+                trace[i, j] = "l"
+    elements = set()
+    i, j = n, m
+    while i and j:
+        if trace[i, j] == "d":
+            i, j = i - 1, j - 1
+            elements.add((i, j))
+        elif trace[i, j] == "u":
+            i -= 1
+        else:
+            j -= 1
+    return elements
+
+
+def _random_sentences(seed, count, vocab_size=5, max_len=40):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield [
+            [rng.randrange(vocab_size) for _ in range(rng.randint(0, max_len))]
+            for _ in range(2)
+        ]
+
+
+class TestLcsLength(unittest.TestCase):
+    def test_random(self):
+        for x, y in _random_sentences(seed=1, count=300):
+            self.assertEqual(_lcs_length(x, y), _naive_lcs_length(x, y), msg=(x, y))
+
+    def test_long(self):
+        # Longer than a machine word on both sides.
+        for x, y in _random_sentences(seed=2, count=10, vocab_size=20, max_len=300):
+            self.assertEqual(_lcs_length(x, y), _naive_lcs_length(x, y))
+
+    def test_empty(self):
+        self.assertEqual(_lcs_length([], []), 0)
+        self.assertEqual(_lcs_length("abc", ""), 0)
+        self.assertEqual(_lcs_length("", "abc"), 0)
+
+
+class TestLcsElements(unittest.TestCase):
+    def test_lcs_elements(self):
+        for x, y in _random_sentences(seed=3, count=300):
+            self.assertEqual(_lcs_elements(x, y), _naive_elements(x, y), msg=(x, y))
+
+    def test_wlcs_elements(self):
+        def update(k):
+            return _weight_fn(k + 1) - _weight_fn(k)
+
+        for x, y in _random_sentences(seed=4, count=300, vocab_size=3):
+            self.assertEqual(
+                _wlcs_elements(x, y), _naive_elements(x, y, update), msg=(x, y)
+            )
+
+    def test_hirschberg(self):
+        def update(k):
+            return _weight_fn(k + 1) - _weight_fn(k)
+
+        # Small thresholds force the linear space algorithm down to tiny blocks.
+        for x, y in _random_sentences(seed=5, count=200, vocab_size=4, max_len=30):
+            lcs = _naive_elements(x, y)
+            wlcs = _naive_elements(x, y, update)
+            for threshold in (0, 1, 7, 64):
+                self.assertEqual(_lcs_elements(x, y, threshold=threshold), lcs)
+                self.assertEqual(_wlcs_elements(x, y, threshold=threshold), wlcs)
+
+    def test_weight_tables(self):
+        for weight in (None, 1.5, 2):
+            for size in (0, 1, 5, 100):
+                powers, increments = _weight_tables(size, weight)
+                for k in range(size):
+                    self.assertEqual(powers[k], _weight_fn(k, weight))
+                    self.assertEqual(
+                        increments[k], _weight_fn(k + 1, weight) - _weight_fn(k, weight)
+                    )
+        with self.assertRaises(ValueError):
+            _weight_tables(1, weight=1.0)
+
+    def test_empty(self):
+        self.assertEqual(_lcs_elements([], "abc"), set())
+        self.assertEqual(_wlcs_elements("abc", []), set())
@@ -0,0 +1,145 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the multi-reference metrics against the single reference ones."""
+import unittest
+
+from rouge.tests import load_sentence_pairs
+from rouge.tests import load_summary_pairs
+
+from rouge import metrics
+from rouge.metrics import ReferenceIndex, RougeScore
+from rouge.vocabulary import Vocabulary
+
+
+# Pairs of a multi-reference metric and its single reference counterpart.
+SENTENCE_LEVEL = [
+    (metrics.rouge_n_sentence_level_multi_reference, metrics.rouge_n_sentence_level, {"n": 1}),
+    (metrics.rouge_n_sentence_level_multi_reference, metrics.rouge_n_sentence_level, {"n": 2}),
+    (metrics.rouge_l_sentence_level_multi_reference, metrics.rouge_l_sentence_level, {}),
+    (metrics.rouge_w_sentence_level_multi_reference, metrics.rouge_w_sentence_level, {}),
+    (metrics.rouge_s_sentence_level_multi_reference, metrics.rouge_s_sentence_level, {}),
+    (metrics.rouge_su_sentence_level_multi_reference, metrics.rouge_su_sentence_level, {}),
+]
+
+SUMMARY_LEVEL = [
+    (metrics.rouge_n_summary_level_multi_reference, metrics.rouge_n_summary_level, {"n": 2}),
+    (metrics.rouge_l_summary_level_multi_reference, metrics.rouge_l_summary_level, {}),
+    (metrics.rouge_w_summary_level_multi_reference, metrics.rouge_w_summary_level, {}),
+    (metrics.rouge_s_summary_level_multi_reference, metrics.rouge_s_summary_level, {}),
+    (metrics.rouge_su_summary_level_multi_reference, metrics.rouge_su_summary_level, {}),
+]
+
+NUM_REFERENCES = 3
+
+
+def best(scores):
+    best_score = scores[0]
+    for score in scores[1:]:
+        if score.recall > best_score.recall:
+            best_score = score
+    return best_score
+
+
+def jackknife(scores):
+    subsets = [best(scores[:i] + scores[i + 1:]) for i in range(len(scores))]
+    return RougeScore(*(sum(values) / len(subsets) for values in zip(*subsets)))
+
+
+class TestMultiReference(unittest.TestCase):
+    def setUp(self):
+        pairs = [ours for ours, _ in load_sentence_pairs()]
+        references = [reference for _, reference in pairs]
+        self.sentence_cases = [
+            (summary, [references[(i + k) % len(references)] for k in range(NUM_REFERENCES)])
+            for i, (summary, _) in enumerate(pairs)
+        ]
+        summaries = [ours for ours, _ in load_summary_pairs()]
+        self.summary_cases = [
+            (summary_sentences, [reference for _, reference in summaries])
+            for summary_sentences, _ in summaries
+        ]
+
+    def check_modes(self, cases, metrics_list):
+        for summary, references in cases:
+            for metric, single_metric, kwargs in metrics_list:
+                scores = [single_metric(summary, reference, **kwargs) for reference in references]
+                self.assertEqual(metric(summary, references, mode="max", **kwargs), best(scores))
+                self.assertEqual(
+                    metric(summary, references, mode="jackknife", **kwargs), jackknife(scores)
+                )
+                # One reference is the same in every mode.
+                for mode in metrics.MULTI_REFERENCE_MODES:
+                    self.assertEqual(
+                        metric(summary, references[:1], mode=mode, **kwargs), scores[0]
+                    )
+
+    def test_sentence_level(self):
+        self.check_modes(self.sentence_cases, SENTENCE_LEVEL)
+
+    def test_summary_level(self):
+        self.check_modes(self.summary_cases, SUMMARY_LEVEL)
+
+    def test_average(self):
+        # The hits and counts of all references are pooled.
+        for summary, references in self.sentence_cases:
+            for n in (1, 2):
+                summary_ngrams = metrics._count_ngrams(summary, n)
+                hits = sum(
+                    metrics._clipped_ngram_count(summary_ngrams, metrics._count_ngrams(reference, n))
+                    for reference in references
+                )
+                self.assertEqual(
+                    metrics.rouge_n_sentence_level_multi_reference(summary, references, n),
+                    metrics._f1_measure(
+                        hits,
+                        sum(metrics._num_ngrams(reference, n) for reference in references),
+                        len(references) * metrics._num_ngrams(summary, n),
+                    ),
+                )
+            hits = sum(metrics._lcs_length(summary, reference) for reference in references)
+            self.assertEqual(
+                metrics.rouge_l_sentence_level_multi_reference(summary, references),
+                metrics._f1_measure(
+                    hits, sum(map(len, references)), len(references) * len(summary)
+                ),
+            )
+
+    def test_reference_index(self):
+        vocab = Vocabulary()
+        for summary, references in self.sentence_cases:
+            indexes = [ReferenceIndex.from_sentence(reference) for reference in references]
+            interned = [vocab.encode(reference) for reference in references]
+            for metric, _, kwargs in SENTENCE_LEVEL:
+                for mode in metrics.MULTI_REFERENCE_MODES:
+                    expected = metric(summary, references, mode=mode, **kwargs)
+                    self.assertEqual(metric(summary, indexes, mode=mode, **kwargs), expected)
+                    self.assertEqual(
+                        metric(vocab.encode(summary), interned, mode=mode, **kwargs), expected
+                    )
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            metrics.rouge_l_sentence_level_multi_reference(["a"], [["a"]], mode="min")
+        with self.assertRaises(ValueError):
+            metrics.rouge_n_sentence_level_multi_reference(["a"], [], 1)
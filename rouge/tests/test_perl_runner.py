@@ -0,0 +1,209 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+"""Testing the batch runner of the perl script and the parser of its output."""
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from rouge.tests.test_bootstrap import perl_bootstrap
+
+from rouge.bootstrap import ConfidenceInterval
+from rouge.metrics import RougeScore, RougeStats
+from rouge.metrics import rouge_l_summary_level, rouge_n_summary_level
+from rouge.wrapper.perl import DEFAULT_ALPHA, PERL, ROUGE_HOME, RougeParams
+from rouge.wrapper.perl import _perl_intervals, _perl_order
+from rouge.wrapper.perl import parse_average_output, parse_eval_output, perl_averages
+from rouge.wrapper.perl import run_evals, run_evals_sharded, split_config, write_config
+
+# Output of ROUGE-1.5.5.pl -n 1 -d -z SPL with two evaluations.
+OUTPUT = """\
+---------------------------------------------
+1 ROUGE-1 Average_R: 0.62500 (95%-conf.int. 0.50000 - 0.75000)
+1 ROUGE-1 Average_P: 0.87500 (95%-conf.int. 0.75000 - 1.00000)
+1 ROUGE-1 Average_F: 0.70834 (95%-conf.int. 0.66667 - 0.75000)
+.............................................
+1 ROUGE-1 Eval 1.1 R:0.50000 P:1.00000 F:0.66667
+1 ROUGE-1 Eval 2.1 R:0.75000 P:0.75000 F:0.75000
+---------------------------------------------
+1 ROUGE-L Average_R: 0.62500 (95%-conf.int. 0.50000 - 0.75000)
+1 ROUGE-L Average_P: 0.87500 (95%-conf.int. 0.75000 - 1.00000)
+1 ROUGE-L Average_F: 0.70834 (95%-conf.int. 0.66667 - 0.75000)
+.............................................
+1 ROUGE-L Eval 1.1 R:0.50000 P:1.00000 F:0.66667
+1 ROUGE-L Eval 2.1 R:0.50000 P:0.50000 F:0.50000
+"""
+
+# Output of ROUGE-1.5.5.pl -n 1 -d -t 2 -x -z SPL with two evaluations.
+COUNT_OUTPUT = """\
+---------------------------------------------
+1 ROUGE-1 M_count: 8 P_count: 6 H_count: 5
+.............................................
+1 ROUGE-1 Eval 1.1 R:4 P:2 F:2
+1 ROUGE-1 Eval 2.1 R:4 P:4 F:3
+"""
+
+
+def _has_perl_modules():
+    try:
+        command = [PERL, "-I", ROUGE_HOME, "-MXML::DOM", "-MDB_File", "-e", "1"]
+        return subprocess.call(command, stderr=subprocess.DEVNULL) == 0
+    except OSError:
+        return False
+
+
+class TestPerlRunner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_make_options(self):
+        params = RougeParams("rouge.config", system_id="1", wlcs_weight=1.2, config_format="SPL")
+        options = params.make_options()
+        self.assertEqual(["-w", "1.2", "-z", "SPL", "rouge.config", "1"], options[-6:])
+
+    def test_write_config(self):
+        evals = [
+            ([["a", "b"], ["c"]], [[["a", "c"]]]),
+            ([["d"]], [[["d"]], [["e"], ["f"]]]),
+        ]
+        config_file, count = write_config(self.directory, evals)
+        self.assertEqual(2, count)
+        with open(config_file) as f:
+            lines = [line.split() for line in f]
+        self.assertEqual([2, 3], [len(line) for line in lines])
+
+        def read(path):
+            with open(path) as f:
+                return f.read()
+
+        self.assertEqual("a b\nc\n", read(lines[0][0]))
+        self.assertEqual("a c\n", read(lines[0][1]))
+        self.assertEqual("d\n", read(lines[1][0]))
+        self.assertEqual("e\nf\n", read(lines[1][2]))
+
+    def test_write_config_errors(self):
+        with self.assertRaises(ValueError):
+            write_config(self.directory, [([["a"]], [])])
+        with self.assertRaises(ValueError):
+            write_config(os.path.join(self.directory, "a b"), [])
+
+    def test_parse_eval_output(self):
+        scores = parse_eval_output(OUTPUT)
+        self.assertEqual(["ROUGE-1", "ROUGE-L"], list(scores))
+        self.assertEqual(
+            {"1": RougeScore(0.5, 1.0, 0.66667), "2": RougeScore(0.5, 0.5, 0.5)},
+            scores["ROUGE-L"],
+        )
+
+    def test_parse_eval_output_counts(self):
+        scores = parse_eval_output(COUNT_OUTPUT, counts=True)
+        self.assertEqual(
+            {"1": RougeStats(2, 4, 2), "2": RougeStats(3, 4, 4)},
+            scores["ROUGE-1"],
+        )
+
+    def test_parse_average_output(self):
+        averages = parse_average_output(OUTPUT)
+        self.assertEqual(["ROUGE-1", "ROUGE-L"], list(averages))
+        self.assertEqual(ConfidenceInterval(0.70834, 0.66667, 0.75), averages["ROUGE-L"].f1_measure)
+        self.assertEqual({"ROUGE-1": RougeStats(5, 8, 6)}, parse_average_output(COUNT_OUTPUT))
+
+    def test_split_config(self):
+        config_file = os.path.join(self.directory, "rouge.config")
+        with open(config_file, "w") as f:
+            f.write("# peer model\n1.peer 1.model\n\n2.peer 2.model\n3.peer 3.model\n")
+        shard_configs = split_config(config_file, 2)
+        self.assertEqual([0, 2], [offset for _, offset in shard_configs])
+        with open(shard_configs[1][0]) as f:
+            self.assertEqual("3.peer 3.model\n", f.read())
+
+    def test_perl_averages(self):
+        random.seed(7)
+        scores = [RougeScore(*(round(random.random(), 5) for _ in range(3))) for _ in range(12)]
+        # The perl script resamples the evaluations in the order of "1.1", "10.1", ..., "2.1", ...
+        perl_order = scores[:1] + scores[9:] + scores[1:9]
+        expected = perl_bootstrap(perl_order, 50, 90)
+        averages = perl_averages(scores, confidence=90, num_resamples=50)
+        for actual, values in zip(averages, expected):
+            self.assertEqual(actual, ConfidenceInterval(*(round(value, 5) for value in values)))
+
+    def test_perl_averages_exact(self):
+        # The perl script adds up the scores one by one, unlike the pairwise summation of numpy,
+        # which rounds differently on this many evaluations.
+        random.seed(11)
+        scores = [RougeScore(*(round(random.random(), 5) for _ in range(3))) for _ in range(300)]
+        perl_order = [scores[index] for index in _perl_order(len(scores))]
+        expected = perl_bootstrap(perl_order, 40, 95)
+        intervals = _perl_intervals(perl_order, None, DEFAULT_ALPHA, 95, 40)
+        self.assertEqual([tuple(values) for values in expected], [tuple(i) for i in intervals])
+
+    def test_perl_averages_counts(self):
+        stats = [RougeStats(2, 4, 2), RougeStats(3, 4, 4)]
+        totals = perl_averages(stats, RougeParams.COUNT_TOKEN_WITH_RAW_COUNTS)
+        self.assertEqual(RougeStats(5, 8, 6), totals)
+        recall = perl_averages(stats, RougeParams.COUNT_TOKEN, num_resamples=10).recall
+        self.assertTrue(0.5 <= recall.low <= recall.mean <= recall.high <= 0.75)
+
+    @unittest.skipUnless(_has_perl_modules(), "needs perl with XML::Parser and DB_File")
+    def test_run_evals_sharded(self):
+        evals = [
+            ([["a", "b", "c"][: 1 + i % 3]], [[["a", "c", "b", "d"][i % 4 :]]]) for i in range(13)
+        ]
+        config_file, _ = write_config(self.directory, evals)
+        params = RougeParams(
+            config_file, system_id="1", config_format="SPL", max_ngram=2, resampling_points=100
+        )
+        output = subprocess.check_output([PERL] + params.make_options(), universal_newlines=True)
+
+        scores, averages = run_evals_sharded(
+            evals, shards=3, workers=2, max_ngram=2, resampling_points=100
+        )
+        self.assertEqual(run_evals(evals, max_ngram=2, resampling_points=100), scores)
+        self.assertEqual(parse_average_output(output), averages)
+
+    @unittest.skipUnless(_has_perl_modules(), "needs perl with XML::Parser and DB_File")
+    def test_run_evals(self):
+        evals = [
+            ([["the", "cat", "sat"]], [[["the", "cat", "sat", "down"]]]),
+            ([["a", "dog"], ["ran"]], [[["a", "big", "dog", "ran"]]]),
+        ]
+        scores = run_evals(evals, max_ngram=2)
+        for i, (summary, (reference,)) in enumerate(evals):
+            for method, expected in [
+                ("ROUGE-1", rouge_n_summary_level(summary, reference, 1)),
+                ("ROUGE-2", rouge_n_summary_level(summary, reference, 2)),
+                ("ROUGE-L", rouge_l_summary_level(summary, reference)),
+            ]:
+                for actual, value in zip(scores[method][i], expected):
+                    self.assertAlmostEqual(actual, value, places=4)
+
+
+if __name__ == "__main__":
+    unittest.main()
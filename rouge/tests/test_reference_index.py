@@ -0,0 +1,98 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing ReferenceIndex in place of the references."""
+import unittest
+
+from rouge.tests import load_sentence_pairs
+from rouge.tests import load_summary_pairs
+
+from rouge import metrics
+from rouge.metrics import ReferenceIndex
+from rouge.vocabulary import Vocabulary
+
+
+SENTENCE_LEVEL = [
+    (metrics.rouge_n_sentence_level, {"n": 1}),
+    (metrics.rouge_n_sentence_level, {"n": 2}),
+    (metrics.rouge_n_multi_sentence_level, {}),
+    (metrics.rouge_l_sentence_level, {}),
+    (metrics.rouge_w_sentence_level, {}),
+    (metrics.rouge_s_sentence_level, {}),
+    (metrics.rouge_su_sentence_level, {"skip_distance": 1}),
+]
+
+SUMMARY_LEVEL = [
+    (metrics.rouge_n_summary_level, {"n": 1}),
+    (metrics.rouge_n_summary_level, {"n": 3}),
+    (metrics.rouge_n_multi_summary_level, {}),
+    (metrics.rouge_l_summary_level, {}),
+    (metrics.rouge_w_summary_level, {}),
+    (metrics.rouge_s_summary_level, {}),
+    (metrics.rouge_su_summary_level, {}),
+]
+
+
+class TestReferenceIndex(unittest.TestCase):
+    def test_sentence_level(self):
+        pairs = [ours for ours, _ in load_sentence_pairs()]
+        indexes = [ReferenceIndex.from_sentence(reference) for _, reference in pairs]
+        # Score twice, so that the second time reads the cached statistics.
+        for _ in range(2):
+            for (summary, reference), index in zip(pairs, indexes):
+                for metric, kwargs in SENTENCE_LEVEL:
+                    self.assertEqual(
+                        metric(summary, index, **kwargs),
+                        metric(summary, reference, **kwargs),
+                    )
+
+    def test_summary_level(self):
+        for (summary_sentences, reference_sentences), _ in load_summary_pairs():
+            index = ReferenceIndex(reference_sentences)
+            for _ in range(2):
+                for metric, kwargs in SUMMARY_LEVEL:
+                    self.assertEqual(
+                        metric(summary_sentences, index, **kwargs),
+                        metric(summary_sentences, reference_sentences, **kwargs),
+                    )
+
+    def test_concatenation(self):
+        # At sentence level, an index of several sentences stands for their concatenation.
+        for (summary_sentences, reference_sentences), _ in load_summary_pairs():
+            index = ReferenceIndex(reference_sentences)
+            reference = [word for sentence in reference_sentences for word in sentence]
+            for metric, kwargs in SENTENCE_LEVEL:
+                self.assertEqual(
+                    metric(summary_sentences[0], index, **kwargs),
+                    metric(summary_sentences[0], reference, **kwargs),
+                )
+
+    def test_interned(self):
+        vocab = Vocabulary()
+        for (summary, reference), _ in load_sentence_pairs():
+            index = ReferenceIndex.from_sentence(vocab.encode(reference))
+            for metric, kwargs in SENTENCE_LEVEL:
+                self.assertEqual(
+                    metric(vocab.encode(summary), index, **kwargs),
+                    metric(summary, reference, **kwargs),
+                )
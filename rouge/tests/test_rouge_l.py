@@ -23,8 +23,8 @@
 """Testing ROUGE-L."""
 import unittest
 
-from rouge.tests.wrapper import rouge_l_sentence_level as _rouge_l_sentence_level
-from rouge.tests.wrapper import rouge_l_summary_level as _rouge_l_summary_level
+from rouge.tests.golden import rouge_l_sentence_level as _rouge_l_sentence_level
+from rouge.tests.golden import rouge_l_summary_level as _rouge_l_summary_level
 
 from rouge.tests import summary, reference
 from rouge.tests import load_sentence_pairs
@@ -28,11 +28,13 @@ from rouge.tests import load_summary_pairs
 from rouge.tests import summary
 from rouge.tests import reference
 
-from rouge.tests.wrapper import rouge_n_sentence_level as _rouge_n_sentence_level
-from rouge.tests.wrapper import rouge_n_summary_level as _rouge_n_summary_level
+from rouge.tests.golden import rouge_n_sentence_level as _rouge_n_sentence_level
+from rouge.tests.golden import rouge_n_summary_level as _rouge_n_summary_level
 
 from rouge.metrics import rouge_n_sentence_level
 from rouge.metrics import rouge_n_summary_level
+from rouge.metrics import rouge_n_multi_sentence_level
+from rouge.metrics import rouge_n_multi_summary_level
 
 
 class TestRougeN(unittest.TestCase):
@@ -99,3 +101,23 @@ class TestRougeN(unittest.TestCase):
                              """
                         % (ours_data, theirs_data, ours_score, theirs_score, n),
                     )
+
+    def test_multi(self):
+        for (summary_sentence, reference_sentence), _ in load_sentence_pairs():
+            scores = rouge_n_multi_sentence_level(
+                summary_sentence, reference_sentence, self.N_TO_TEST
+            )
+            self.assertEqual(list(scores), self.N_TO_TEST)
+            for n, score in scores.items():
+                self.assertEqual(
+                    score, rouge_n_sentence_level(summary_sentence, reference_sentence, n)
+                )
+
+        for (summary_sentences, reference_sentences), _ in load_summary_pairs():
+            scores = rouge_n_multi_summary_level(
+                summary_sentences, reference_sentences, self.N_TO_TEST
+            )
+            for n, score in scores.items():
+                self.assertEqual(
+                    score, rouge_n_summary_level(summary_sentences, reference_sentences, n)
+                )
@@ -23,8 +23,8 @@
 """Testing ROUGE-W."""
 import unittest
 
-from rouge.tests.wrapper import rouge_w_sentence_level as _rouge_w_sentence_level
-from rouge.tests.wrapper import rouge_w_summary_level as _rouge_w_summary_level
+from rouge.tests.golden import rouge_w_sentence_level as _rouge_w_sentence_level
+from rouge.tests.golden import rouge_w_summary_level as _rouge_w_summary_level
 
 from rouge.tests import summary, reference
 from rouge.tests import load_sentence_pairs
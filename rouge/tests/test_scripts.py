@@ -0,0 +1,140 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the command line scripts end to end."""
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from rouge.tests import load_sentence_pairs
+
+from rouge.accumulator import RougeAccumulator
+from rouge.metrics import rouge_n_sentence_level_stats, rouge_w_sentence_level_stats
+from rouge.metrics import score_from_stats
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCRIPTS = os.path.join(ROOT, "scripts")
+
+
+@unittest.skipUnless(importlib.util.find_spec("agenda"), "needs agenda for rouge_score.py")
+class TestRougeScore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.pairs = [theirs for _, theirs in load_sentence_pairs()]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_lines(self, name, lines):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as f:
+            f.writelines(line + "\n" for line in lines)
+        return path
+
+    def write_corpus(self, pairs):
+        summary = self.write_lines("summary.txt", [summary for summary, _ in pairs])
+        reference = self.write_lines("reference.txt", [reference for _, reference in pairs])
+        return summary, reference
+
+    def load_output(self, output_dir, name):
+        with open(os.path.join(output_dir, name + ".json")) as f:
+            return json.load(f)
+
+    def run_script(self, script, *args):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+        return subprocess.run(
+            [sys.executable, os.path.join(SCRIPTS, script)] + list(args),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            env=env,
+        )
+
+    def test_missing_line(self):
+        summary = self.write_lines("summary.txt", ["a b", "c d"])
+        reference = self.write_lines("reference.txt", ["a b"])
+        output_dir = os.path.join(self.directory, "output")
+        for stream in [[], ["--stream"]]:
+            args = [summary, reference, "-L", "--output_dir", output_dir] + stream
+            result = self.run_script("rouge_score.py", *args)
+            self.assertNotEqual(0, result.returncode)
+            self.assertIn("%s has no line 2" % reference, result.stderr)
+
+    def test_stream(self):
+        summary, reference = self.write_corpus(self.pairs)
+        output_dir = os.path.join(self.directory, "stream")
+        args = [summary, reference, "--output_dir", output_dir, "-N", "2", "-W", "-w", "1.5"]
+        args += ["-a", "0.3", "--stream", "--chunksize", "3"]
+        result = self.run_script("rouge_score.py", *args)
+        self.assertEqual(0, result.returncode, result.stderr)
+
+        tokens = [(summary.split(" "), reference.split(" ")) for summary, reference in self.pairs]
+        for name, params, stats_fn in [
+            ("rouge_n_2", {"n": 2}, lambda s, r: rouge_n_sentence_level_stats(s, r, 2)),
+            ("rouge_w", {"weight": 1.5}, lambda s, r: rouge_w_sentence_level_stats(s, r, 1.5)),
+        ]:
+            accumulator = RougeAccumulator()
+            accumulator.update(stats_fn(s, r) for s, r in tokens)
+            output = self.load_output(output_dir, name)
+            self.assertEqual(["name", "params", "scores", "system_micro"], sorted(output))
+            self.assertEqual((name, params), (output["name"], output["params"]))
+            self.assertEqual(len(self.pairs), len(output["scores"]))
+            for score, stats in zip(output["scores"], accumulator.stats()):
+                self.assertAlmostEqual(score, score_from_stats(stats, 0.3).f1_measure)
+            system_micro = accumulator.micro_average(0.3).f1_measure
+            self.assertAlmostEqual(output["system_micro"], system_micro)
+
+    def test_merge_shards(self):
+        def score_shard(name, pairs, *options):
+            summary, reference = self.write_corpus(pairs)
+            path = os.path.join(self.directory, name + ".json")
+            output_dir = os.path.join(self.directory, name)
+            args = [summary, reference, "--output_dir", output_dir, "-N", "1", "2", "-L", "-W"]
+            result = self.run_script("rouge_score.py", *args, "--accumulator", path, *options)
+            self.assertEqual(0, result.returncode, result.stderr)
+            return path
+
+        def merge(*paths):
+            report = os.path.join(self.directory, "report.json")
+            result = self.run_script("merge_rouge.py", *paths, "-o", report, "-a", "0.3")
+            self.assertEqual(0, result.returncode, result.stderr)
+            with open(report) as f:
+                return json.load(f)
+
+        cut = len(self.pairs) // 3
+        single = score_shard("single", self.pairs)
+        first = score_shard("first", self.pairs[:cut])
+        second = score_shard("second", self.pairs[cut:], "--stream", "--chunksize", "7")
+        expected = merge(single)
+        self.assertEqual(["rouge_l", "rouge_n_1", "rouge_n_2", "rouge_w"], sorted(expected))
+        self.assertEqual(len(self.pairs), expected["rouge_l"]["count"])
+        self.assertEqual(expected, merge(first, second))
+
+
+if __name__ == "__main__":
+    unittest.main()
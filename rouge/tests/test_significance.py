@@ -0,0 +1,115 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the paired significance tests against naive loops over the same draws."""
+import random
+import unittest
+
+import numpy as np
+
+from rouge.batch import macro_average, micro_average
+from rouge.metrics import RougeStats
+from rouge.significance import paired_bootstrap_test, permutation_test
+
+
+def random_stats(size, weight=None):
+    stats = []
+    for _ in range(size):
+        ref_total = random.randint(1, 20)
+        cand_total = random.randint(1, 20)
+        hits = random.randint(0, min(ref_total, cand_total))
+        stats.append(RougeStats(hits, ref_total, cand_total, weight))
+    return stats
+
+
+def score(stats, average):
+    if average == "macro":
+        return np.array(macro_average(stats))
+    return np.array(micro_average(stats))
+
+
+def naive_bootstrap(system, baseline, num_resamples, average, seed):
+    indices = np.random.default_rng(seed).integers(len(system), size=(num_resamples, len(system)))
+    observed = score(system, average) - score(baseline, average)
+    extreme = np.zeros(3)
+    for row in indices:
+        difference = score([system[i] for i in row], average) - score(
+            [baseline[i] for i in row], average
+        )
+        extreme += np.abs(difference - observed) >= np.abs(observed) - 1e-12
+    return observed, extreme / num_resamples
+
+
+def naive_permutation(system, baseline, num_rounds, average, seed):
+    swaps = np.random.default_rng(seed).integers(2, size=(num_rounds, len(system)))
+    observed = score(system, average) - score(baseline, average)
+    extreme = np.zeros(3)
+    for row in swaps:
+        first = [b if swap else a for a, b, swap in zip(system, baseline, row)]
+        second = [a if swap else b for a, b, swap in zip(system, baseline, row)]
+        difference = score(first, average) - score(second, average)
+        extreme += np.abs(difference) >= np.abs(observed) - 1e-12
+    return observed, (extreme + 1) / (num_rounds + 1)
+
+
+class TestSignificance(unittest.TestCase):
+    def setUp(self):
+        random.seed(1)
+
+    def check(self, test, naive, weight=None):
+        system = random_stats(30, weight)
+        baseline = random_stats(30, weight)
+        for average in ("macro", "micro"):
+            result = test(system, baseline, None, 50, average, 7)
+            observed, p_values = naive(system, baseline, 50, average, 7)
+            for field, difference, p_value in zip(result, observed, p_values):
+                self.assertAlmostEqual(field.difference, difference)
+                self.assertAlmostEqual(field.p_value, p_value)
+
+    def test_paired_bootstrap(self):
+        self.check(paired_bootstrap_test, naive_bootstrap)
+        self.check(paired_bootstrap_test, naive_bootstrap, weight=1.2)
+
+    def test_permutation(self):
+        self.check(permutation_test, naive_permutation)
+        self.check(permutation_test, naive_permutation, weight=1.2)
+
+    def test_metrics(self):
+        # Testing several metrics at once gives the same results as one at a time.
+        system = {"rouge_1": random_stats(40), "rouge_w": random_stats(40, weight=1.5)}
+        baseline = {"rouge_1": random_stats(40), "rouge_w": random_stats(40, weight=1.5)}
+        for test in (paired_bootstrap_test, permutation_test):
+            results = test(system, baseline, average="micro", block_size=100)
+            for name in system:
+                self.assertEqual(
+                    results[name],
+                    test(system[name], baseline[name], average="micro", block_size=100),
+                )
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            paired_bootstrap_test(random_stats(3), random_stats(4))
+        with self.assertRaises(ValueError):
+            permutation_test({"a": random_stats(3)}, {"b": random_stats(3)})
+        with self.assertRaises(ValueError):
+            permutation_test([], [])
@@ -0,0 +1,66 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the skip-bigram counting against brute force."""
+import collections
+import random
+import unittest
+
+from rouge.metrics import _count_skip_grams
+from rouge.metrics import _get_skip_bigrams
+from rouge.metrics import _num_skip_grams
+
+
+def _naive_skip_grams(words, skip_distance, unigrams):
+    """
+    Enumerate every pair of positions like the perl script does.
+    """
+    counts = collections.Counter()
+    for i in range(len(words) - 1):
+        if unigrams:
+            counts[(words[i],)] += 1
+        for j in range(i + 1, len(words)):
+            if skip_distance < 0 or j - i - 1 <= skip_distance:
+                counts[(words[i], words[j])] += 1
+    return counts
+
+
+class TestSkipBigrams(unittest.TestCase):
+    def test_count(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            words = [rng.randrange(4) for _ in range(rng.randint(0, 30))]
+            for skip_distance in (-1, 0, 1, 4, 40):
+                for unigrams in (False, True):
+                    expected = _naive_skip_grams(words, skip_distance, unigrams)
+                    counts = _count_skip_grams(words, skip_distance, unigrams)
+                    self.assertEqual(counts, expected)
+                    self.assertEqual(
+                        _num_skip_grams(words, skip_distance, unigrams),
+                        sum(expected.values()),
+                    )
+                    if not unigrams:
+                        self.assertEqual(
+                            collections.Counter(_get_skip_bigrams(words, skip_distance)),
+                            expected,
+                        )
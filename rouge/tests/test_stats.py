@@ -0,0 +1,149 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the sufficient statistics of the metrics and their reducers."""
+import unittest
+
+from rouge.tests import load_sentence_pairs
+from rouge.tests import load_summary_pairs
+
+from rouge import metrics
+from rouge.batch import macro_average, micro_average, scores_from_stats
+from rouge.batch import pad_sentences, rouge_l_batch_stats, rouge_n_batch_stats
+from rouge.metrics import RougeStats, score_from_stats
+from rouge.vocabulary import Vocabulary
+
+
+# Pairs of a metric and its stats variant.
+SENTENCE_LEVEL = [
+    (metrics.rouge_n_sentence_level, metrics.rouge_n_sentence_level_stats, {"n": 2}),
+    (metrics.rouge_l_sentence_level, metrics.rouge_l_sentence_level_stats, {}),
+    (metrics.rouge_w_sentence_level, metrics.rouge_w_sentence_level_stats, {"weight": 1.5}),
+    (metrics.rouge_s_sentence_level, metrics.rouge_s_sentence_level_stats, {}),
+    (metrics.rouge_su_sentence_level, metrics.rouge_su_sentence_level_stats, {}),
+]
+
+SUMMARY_LEVEL = [
+    (metrics.rouge_n_summary_level, metrics.rouge_n_summary_level_stats, {"n": 1}),
+    (metrics.rouge_l_summary_level, metrics.rouge_l_summary_level_stats, {}),
+    (metrics.rouge_w_summary_level, metrics.rouge_w_summary_level_stats, {}),
+    (metrics.rouge_s_summary_level, metrics.rouge_s_summary_level_stats, {}),
+    (metrics.rouge_su_summary_level, metrics.rouge_su_summary_level_stats, {}),
+]
+
+ALPHAS = (0.0, 0.5, 0.9)
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.sentence_pairs = [ours for ours, _ in load_sentence_pairs()]
+        self.summary_pairs = [ours for ours, _ in load_summary_pairs()]
+
+    def check_metrics(self, pairs, metrics_list):
+        for summary, reference in pairs:
+            for metric, stats_metric, kwargs in metrics_list:
+                stats = stats_metric(summary, reference, **kwargs)
+                for alpha in ALPHAS:
+                    self.assertEqual(
+                        score_from_stats(stats, alpha),
+                        metric(summary, reference, alpha=alpha, **kwargs),
+                    )
+
+    def test_sentence_level(self):
+        self.check_metrics(self.sentence_pairs, SENTENCE_LEVEL)
+
+    def test_summary_level(self):
+        self.check_metrics(self.summary_pairs, SUMMARY_LEVEL)
+
+    def test_multi(self):
+        for summary, reference in self.sentence_pairs:
+            stats = metrics.rouge_n_multi_sentence_level_stats(summary, reference)
+            for n, order_stats in stats.items():
+                self.assertEqual(
+                    order_stats, metrics.rouge_n_sentence_level_stats(summary, reference, n)
+                )
+
+    def test_weight(self):
+        summary, reference = self.sentence_pairs[0]
+        stats = metrics.rouge_w_sentence_level_stats(summary, reference)
+        self.assertEqual(stats.weight, metrics.DEFAULT_WEIGHT_FACTOR)
+        self.assertIsNone(metrics.rouge_l_sentence_level_stats(summary, reference).weight)
+
+
+class TestReducers(unittest.TestCase):
+    def setUp(self):
+        pairs = [ours for ours, _ in load_sentence_pairs()]
+        self.summaries = [summary for summary, _ in pairs]
+        self.references = [reference for _, reference in pairs]
+
+    def check_reducers(self, stats, metric, **kwargs):
+        scores = [
+            metric(summary, reference, alpha=0.9, **kwargs)
+            for summary, reference in zip(self.summaries, self.references)
+        ]
+        batch_scores = scores_from_stats(stats, alpha=0.9)
+        for values, expected in zip(batch_scores, zip(*scores)):
+            for value, expected_value in zip(values, expected):
+                self.assertAlmostEqual(value, expected_value)
+        for value, values in zip(macro_average(stats, alpha=0.9), zip(*scores)):
+            self.assertAlmostEqual(value, sum(values) / len(values))
+        pooled = RougeStats(*(sum(values) for values in list(zip(*stats))[:3]), stats[0].weight)
+        for value, expected in zip(micro_average(stats, alpha=0.9), score_from_stats(pooled, 0.9)):
+            self.assertAlmostEqual(value, expected)
+
+    def test_records(self):
+        for metric, stats_metric, kwargs in SENTENCE_LEVEL:
+            stats = [
+                stats_metric(summary, reference, **kwargs)
+                for summary, reference in zip(self.summaries, self.references)
+            ]
+            self.check_reducers(stats, metric, **kwargs)
+
+    def test_batch(self):
+        stats = [
+            metrics.rouge_n_sentence_level_stats(summary, reference, 2)
+            for summary, reference in zip(self.summaries, self.references)
+        ]
+        batch_stats = rouge_n_batch_stats(self.summaries, self.references, 2)
+        self.assertEqual([RougeStats(*values) for values in zip(*batch_stats[:3])], stats)
+        self.assertEqual(micro_average(batch_stats), micro_average(stats))
+
+        vocab = Vocabulary()
+        summaries, summary_lengths = pad_sentences(self.summaries, vocab)
+        references, reference_lengths = pad_sentences(self.references, vocab)
+        batch_stats = rouge_l_batch_stats(summaries, summary_lengths, references, reference_lengths)
+        self.assertEqual(
+            micro_average(batch_stats),
+            micro_average(
+                metrics.rouge_l_sentence_level_stats(summary, reference)
+                for summary, reference in zip(self.summaries, self.references)
+            ),
+        )
+
+    def test_empty(self):
+        self.assertEqual(micro_average([]), (0.0, 0.0, 0.0))
+        self.assertEqual(macro_average([]), (0.0, 0.0, 0.0))
+
+    def test_mixed_weights(self):
+        with self.assertRaises(ValueError):
+            micro_average([RougeStats(1, 2, 3), RougeStats(1, 2, 3, 1.2)])
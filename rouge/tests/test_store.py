@@ -0,0 +1,100 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing the on-disk reference store."""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from rouge.tests import load_sentence_pairs
+
+from rouge import metrics
+from rouge.store import load_references, save_references
+from rouge.vocabulary import Vocabulary
+
+
+class TestReferenceStore(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.pairs = [ours for ours, _ in load_sentence_pairs()]
+        # Empty and short references, with fewer tokens than the highest order.
+        self.pairs += [(["a"], []), (["a", "b"], ["a"]), (["b", "a"], ["a", "b"])]
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_metrics(self):
+        save_references(self.path, [reference for _, reference in self.pairs])
+        store = load_references(self.path)
+        self.assertEqual(len(store), len(self.pairs))
+        for i, (summary, reference) in enumerate(self.pairs):
+            summary_ids = store.vocabulary.encode(summary)
+            self.assertEqual(store.vocabulary.decode(store[i].tokens), reference)
+            for n in (1, 2, 3, 4, 5):
+                self.assertEqual(
+                    metrics.rouge_n_sentence_level(summary_ids, store[i], n),
+                    metrics.rouge_n_sentence_level(summary, reference, n),
+                )
+            self.assertEqual(
+                metrics.rouge_l_sentence_level(summary_ids, store[i]),
+                metrics.rouge_l_sentence_level(summary, reference),
+            )
+
+    def test_interned(self):
+        vocab = Vocabulary()
+        references = [vocab.encode(reference) for _, reference in self.pairs]
+        save_references(self.path, references, vocab, orders=(2,))
+        store = load_references(self.path)
+        self.assertEqual(store.orders, (2,))
+        self.assertEqual(len(store.vocabulary), len(vocab))
+        for i, reference in enumerate(references):
+            self.assertEqual(store[i].ngram_counts(2, packed=True), metrics._count_ngrams(reference, 2, True))
+
+    def test_cache(self):
+        save_references(self.path, [reference for _, reference in self.pairs[:3]])
+        store = load_references(self.path, cache_size=2)
+        first = store[0]
+        counts = first.ngram_counts(2, packed=True)
+        self.assertIs(counts, store[0].ngram_counts(2, packed=True))
+        second = store[1]
+        self.assertIs(first, store[-3])
+        # The least recently used index is now the one of the second reference.
+        store[2]
+        self.assertIs(first, store[0])
+        self.assertIsNot(second, store[1])
+
+    def test_errors(self):
+        save_references(self.path, [["a"]])
+        store = load_references(self.path)
+        with self.assertRaises(IndexError):
+            store[1]
+        meta_file = os.path.join(self.path, "meta.json")
+        with open(meta_file) as f:
+            meta = json.load(f)
+        meta["version"] += 1
+        with open(meta_file, "w") as f:
+            json.dump(meta, f)
+        with self.assertRaises(ValueError):
+            load_references(self.path)
@@ -0,0 +1,116 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Testing Vocabulary and the metrics on interned sentences."""
+import array
+import unittest
+
+from rouge.tests import load_sentence_pairs
+from rouge.tests import load_summary_pairs
+
+from rouge import metrics
+from rouge.vocabulary import Vocabulary
+
+
+class TestVocabulary(unittest.TestCase):
+    def test_round_trip(self):
+        vocab = Vocabulary()
+        for (summary_sentence, reference_sentence), _ in load_sentence_pairs():
+            for sentence in (summary_sentence, reference_sentence):
+                self.assertEqual(vocab.decode(vocab.encode(sentence)), sentence)
+
+    def test_dense(self):
+        vocab = Vocabulary("abcab")
+        self.assertEqual(len(vocab), 3)
+        self.assertEqual(list(vocab.encode("cba")), [2, 1, 0])
+        self.assertIn("a", vocab)
+        self.assertNotIn("d", vocab)
+
+
+class TestInternedMetrics(unittest.TestCase):
+    SENTENCE_LEVEL = [
+        (metrics.rouge_n_sentence_level, {"n": 1}),
+        (metrics.rouge_n_sentence_level, {"n": 2}),
+        (metrics.rouge_n_sentence_level, {"n": 4}),
+        (metrics.rouge_l_sentence_level, {}),
+        (metrics.rouge_w_sentence_level, {}),
+        (metrics.rouge_s_sentence_level, {}),
+    ]
+
+    SUMMARY_LEVEL = [
+        (metrics.rouge_n_summary_level, {"n": 1}),
+        (metrics.rouge_n_summary_level, {"n": 3}),
+        (metrics.rouge_l_summary_level, {}),
+        (metrics.rouge_w_summary_level, {}),
+        (metrics.rouge_s_summary_level, {}),
+    ]
+
+    def test_sentence_level(self):
+        vocab = Vocabulary()
+        for (summary_sentence, reference_sentence), _ in load_sentence_pairs():
+            summary_ids = vocab.encode(summary_sentence)
+            reference_ids = vocab.encode(reference_sentence)
+            for metric, kwargs in self.SENTENCE_LEVEL:
+                self.assertEqual(
+                    metric(summary_ids, reference_ids, **kwargs),
+                    metric(summary_sentence, reference_sentence, **kwargs),
+                )
+                # Mixing interned and plain ids falls back to the generic path.
+                self.assertEqual(
+                    metric(summary_ids, list(reference_ids), **kwargs),
+                    metric(summary_sentence, reference_sentence, **kwargs),
+                )
+
+    def test_summary_level(self):
+        vocab = Vocabulary()
+        for (summary_sentences, reference_sentences), _ in load_summary_pairs():
+            summary_ids = vocab.encode_sentences(summary_sentences)
+            reference_ids = vocab.encode_sentences(reference_sentences)
+            for metric, kwargs in self.SUMMARY_LEVEL:
+                self.assertEqual(
+                    metric(summary_ids, reference_ids, **kwargs),
+                    metric(summary_sentences, reference_sentences, **kwargs),
+                )
+
+    def test_multi(self):
+        vocab = Vocabulary()
+        for (summary_sentence, reference_sentence), _ in load_sentence_pairs():
+            self.assertEqual(
+                metrics.rouge_n_multi_sentence_level(
+                    vocab.encode(summary_sentence), vocab.encode(reference_sentence)
+                ),
+                metrics.rouge_n_multi_sentence_level(summary_sentence, reference_sentence),
+            )
+
+    def test_typecode(self):
+        vocab = Vocabulary()
+        summary = vocab.encode("the cat sat".split())
+        reference = array.array("l", vocab.encode("the cat sat down".split()))
+        for metric in [
+            lambda: metrics.rouge_n_sentence_level(summary, reference, 2),
+            lambda: metrics.rouge_n_multi_sentence_level(reference, summary),
+            lambda: metrics.rouge_n_sentence_level_multi_reference(summary, [reference], 1),
+            lambda: metrics.rouge_n_summary_level([summary], [reference], 1),
+        ]:
+            with self.assertRaisesRegex(TypeError, "type code 'i', not 'l'"):
+                metric()
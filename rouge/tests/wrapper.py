@@ -26,6 +26,8 @@ Wrapper of Pythonrouge to provide similar interface of rouge.
 import logging
 from pythonrouge import Pythonrouge
 
+from rouge.wrapper.perl import run_evals
+
 logging.basicConfig(level=logging.INFO)
 
 _METRIC_KEYS = ("R", "P", "F")
@@ -218,5 +220,60 @@ def rouge_w_summary_level(summary_sentences, reference_sentences):
     return _parse_output(prefix, score)
 
 
-def _make_rouge_s(summary, reference):
-    return _make_rouge()
+def _rouge_s4(summary_sentences, reference_sentences):
+    """
+    Compute ROUGE-S with skip distance 4 and without unigrams, the default of
+    rouge_s_sentence_level(). Pythonrouge only has ROUGE-SU4, so the perl script
+    is run directly with -2 4 and without -u.
+    :param summary_sentences: a list of sentences, each a string.
+    :param reference_sentences: a list of sentences, each a string.
+    :return: a 3-tuple.
+    """
+    scores = run_evals(
+        [
+            (
+                [sentence.split() for sentence in summary_sentences],
+                [[sentence.split() for sentence in reference_sentences]],
+            )
+        ],
+        skip_distance=4,
+        no_rouge_l=True,
+    )
+    return tuple(scores["ROUGE-S4"][0])
+
+
+def rouge_s_sentence_level(summary_sentence, reference_sentence):
+    return _rouge_s4([summary_sentence], [reference_sentence])
+
+
+def rouge_s_summary_level(summary_sentences, reference_sentences):
+    return _rouge_s4(summary_sentences, reference_sentences)
+
+
+def _make_rouge_su4(summary, reference):
+    # Skip distance 4 and unigrams, the default of rouge_su_sentence_level().
+    return _make_rouge(
+        summary=summary,
+        reference=reference,
+        ROUGE_SU4=True,
+    )
+
+
+def rouge_su_sentence_level(summary_sentence, reference_sentence):
+    rouge = _make_rouge_su4(
+        summary=[[summary_sentence]],
+        reference=[[[reference_sentence]]],
+    )
+    prefix = "ROUGE-SU4-"
+    score = rouge.calc_score()
+    return _parse_output(prefix, score)
+
+
+def rouge_su_summary_level(summary_sentences, reference_sentences):
+    rouge = _make_rouge_su4(
+        summary=[summary_sentences],
+        reference=[[reference_sentences]],
+    )
+    prefix = "ROUGE-SU4-"
+    score = rouge.calc_score()
+    return _parse_output(prefix, score)
@@ -0,0 +1,110 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Interning of tokens into dense ints.
+"""
+
+import array
+
+__all__ = ["Vocabulary"]
+
+# Type code of the arrays of token ids.
+TYPECODE = "i"
+
+
+class Vocabulary:
+    """
+    Vocabulary maps tokens to dense ints, the first token seen being 0.
+
+    Every metric accepts sentences of token ids in place of sentences of tokens.
+    When both sides are arrays returned by encode(), ROUGE-N packs each n-gram into
+    a single key, which is cheaper to hash than a tuple of strings. The arrays also take
+    much less memory than lists of strings on a large corpus.
+
+    Sentences to be compared must be encoded by the same Vocabulary.
+
+    >>> vocab = Vocabulary()
+    >>> vocab.encode('the police killed the gunman'.split())
+    array('i', [0, 1, 2, 0, 3])
+    >>> vocab.decode([3, 0])
+    ['gunman', 'the']
+    >>> len(vocab)
+    4
+    """
+
+    def __init__(self, tokens=()):
+        """
+
+        :param tokens: an iterable of tokens to intern up front.
+        """
+        self._ids = {}
+        self._tokens = []
+        for token in tokens:
+            self.intern(token)
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def __contains__(self, token):
+        return token in self._ids
+
+    def intern(self, token):
+        """
+        Return the id of token, adding it to the vocabulary if not seen yet.
+
+        :param token: a hashable token.
+        :return: int.
+        """
+        token_id = self._ids.get(token)
+        if token_id is None:
+            token_id = self._ids[token] = len(self._tokens)
+            self._tokens.append(token)
+        return token_id
+
+    def encode(self, sentence):
+        """
+        Turn a sentence into an array of token ids.
+
+        :param sentence: a list of tokens.
+        :return: array.array.
+        """
+        return array.array(TYPECODE, map(self.intern, sentence))
+
+    def encode_sentences(self, sentences):
+        """
+        Turn a list of sentences into a list of arrays of token ids.
+
+        :param sentences: a list of sentences.
+        :return: a list of array.array.
+        """
+        return [self.encode(sentence) for sentence in sentences]
+
+    def decode(self, ids):
+        """
+        Turn a sequence of token ids back into a list of tokens.
+
+        :param ids: a sequence of int.
+        :return: a list of tokens.
+        """
+        return [self._tokens[token_id] for token_id in ids]
@@ -23,8 +23,23 @@
 
 import os
 import collections
+import concurrent.futures
+import re
+import subprocess
 import tempfile
 
+import numpy as np
+
+from rouge.batch import scores_from_stats
+from rouge.bootstrap import (
+    DEFAULT_CONFIDENCE,
+    DEFAULT_NUM_RESAMPLES,
+    ConfidenceInterval,
+    _iter_resample_indices,
+    _percentile_interval,
+)
+from rouge.metrics import RougeScore, RougeStats
+
 ROUGE_HOME = os.path.join(os.path.dirname(__file__), "ROUGE-1.5.5")
 assert os.path.isdir(ROUGE_HOME), "ROUGE_HOME is broken!"
 
@@ -36,6 +51,38 @@ assert os.path.isfile(ROUGE_EXECUTABLE), "ROUGE_EXECUTABLE is broken!"
 
 _ROUGE_README = os.path.join(ROUGE_HOME, "README.txt")
 
+# The command to run the perl script with.
+PERL = "perl"
+
+# The peer ID of the summaries of a config file written by write_config().
+PEER_ID = "1"
+
+# The default weight on the recall of the perl script, unlike that of rouge.metrics.
+DEFAULT_ALPHA = 0.5
+
+# The number of resamples of each shard run by run_evals_sharded(), whose averages are not used.
+# The perl script reads past the resamples if there is only one.
+_SHARD_RESAMPLES = 2
+
+# A line of the per evaluation scores printed with -d, like
+# "1 ROUGE-L Eval 12.1 R:0.50000 P:0.33333 F:0.40000".
+_EVAL_LINE = re.compile(
+    r"^(?P<peer>\S+) (?P<method>\S+) Eval (?P<test>\S+) R:(?P<r>\S+) P:(?P<p>\S+) F:(?P<f>\S+)$"
+)
+
+# A line of the averages, like
+# "1 ROUGE-L Average_R: 0.50000 (95%-conf.int. 0.40000 - 0.60000)".
+_AVERAGE_LINE = re.compile(
+    r"^(?P<peer>\S+) (?P<method>\S+) Average_(?P<kind>[RPF]): (?P<mean>\S+)"
+    r" \(\S+ (?P<low>\S+) - (?P<high>\S+)\)$"
+)
+
+# A line of the total counts with counting_unit 2, like
+# "1 ROUGE-L M_count: 12 P_count: 10 H_count: 6".
+_COUNT_LINE = re.compile(
+    r"^(?P<peer>\S+) (?P<method>\S+) M_count: (?P<m>\S+) P_count: (?P<p>\S+) H_count: (?P<h>\S+)$"
+)
+
 
 def print_readme():
     """
@@ -239,6 +286,10 @@ class RougeParams:
             options.extend(["-r", self.resampling_points])
         if self.scoring_formula is not None:
             options.extend(["-f", self.scoring_formula])
+        if self.wlcs_weight is not None:
+            options.extend(["-w", self.wlcs_weight])
+        if self.config_format is not None:
+            options.extend(["-z", self.config_format])
 
         options.append(self.config_file)
 
@@ -250,3 +301,364 @@ class RougeParams:
 
     def make_cmdline(self):
         return " ".join(self.make_options())
+
+
+def _write_sentences(path, sentences):
+    with open(path, "w") as f:
+        for sentence in sentences:
+            f.write(" ".join(sentence))
+            f.write("\n")
+
+
+def write_config(directory, evals):
+    """
+    Write the summaries of evaluations in SPL format, one sentence per line, and a config
+    file with the peer and the models of an evaluation per line, as read by the perl script
+    with config_format "SPL". The evaluations are numbered from 1 in order.
+
+    :param directory: the directory to write the files in. It must not contain spaces.
+    :param evals: an iterable of (summary, references), where summary is a list of sentences
+        and references is a list of reference summaries, each a list of sentences.
+        A sentence is a list of tokens.
+    :return: a 2-tuple, the path of the config file and the number of evaluations.
+    :raise ValueError: if directory contains spaces, or an evaluation has no reference.
+    """
+    if re.search(r"\s", directory):
+        raise ValueError("the perl script splits config lines on spaces: %r" % directory)
+    config_file = os.path.join(directory, "rouge.config")
+    count = 0
+    with open(config_file, "w") as config:
+        for count, (summary, references) in enumerate(evals, 1):
+            if not references:
+                raise ValueError("evaluation %d has no reference" % count)
+            peer_path = os.path.join(directory, "%d.peer.spl" % count)
+            _write_sentences(peer_path, summary)
+            paths = [peer_path]
+            for model, reference in enumerate(references, 1):
+                paths.append(os.path.join(directory, "%d.model.%d.spl" % (count, model)))
+                _write_sentences(paths[-1], reference)
+            config.write(" ".join(paths))
+            config.write("\n")
+    return config_file, count
+
+
+def _parse_number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_eval_output(output, counts=False):
+    """
+    Parse the per evaluation scores printed by the perl script with -d (print_when_eval).
+
+    >>> output = '''
+    ... 1 ROUGE-1 Average_R: 0.62500 (95%-conf.int. 0.50000 - 0.75000)
+    ... .............................................
+    ... 1 ROUGE-1 Eval 1.1 R:0.50000 P:1.00000 F:0.66667
+    ... 1 ROUGE-1 Eval 2.1 R:0.75000 P:0.75000 F:0.75000
+    ... '''
+    >>> parse_eval_output(output)['ROUGE-1']['2']
+    RougeScore(recall=0.75, precision=0.75, f1_measure=0.75)
+
+    :param output: the standard output of the perl script.
+    :param counts: if True, the script was run with counting_unit 1 or 2, and each evaluation
+        has the counts of the model tokens, the peer tokens and the hits instead of scores.
+    :return: a dict mapping each method, like "ROUGE-2" or "ROUGE-SU4", to a dict mapping
+        each eval ID to RougeScore, or RougeStats if counts.
+    """
+    scores = collections.defaultdict(dict)
+    for line in output.splitlines():
+        match = _EVAL_LINE.match(line.strip())
+        if match is None:
+            continue
+        # The test ID is the eval ID and the peer ID, joined by a dot.
+        eval_id = match.group("test")[: -len(match.group("peer")) - 1]
+        if counts:
+            score = RougeStats(
+                hits=_parse_number(match.group("f")),
+                ref_total=_parse_number(match.group("r")),
+                cand_total=_parse_number(match.group("p")),
+            )
+        else:
+            score = RougeScore(*(float(match.group(kind)) for kind in "rpf"))
+        scores[match.group("method")][eval_id] = score
+    return dict(scores)
+
+
+def run_evals(evals, **kwargs):
+    """
+    Score many evaluations with a single run of the perl script, and return the score of
+    each of them. Note that the perl script lowercases the text and ignores the characters
+    other than letters, digits and dashes.
+
+    :param evals: an iterable of (summary, references). See write_config().
+    :param kwargs: options of RougeParams, other than config_file, system_id,
+        config_format and print_when_eval.
+    :return: a dict mapping each method, like "ROUGE-2" or "ROUGE-L", to a list of the
+        scores of evals in order. The scores are RougeScore, or RougeStats with
+        counting_unit COUNT_TOKEN or COUNT_TOKEN_WITH_RAW_COUNTS.
+    :raise subprocess.CalledProcessError: if the perl script fails.
+    :raise ValueError: if the output misses an evaluation.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        config_file, count = write_config(directory, evals)
+        params = _make_params(config_file, kwargs)
+        output = _run_perl(params)
+    return _scores_in_order(parse_eval_output(output, _has_counts(params)), count)
+
+
+def _make_params(config_file, kwargs):
+    return RougeParams(
+        config_file,
+        system_id=PEER_ID,
+        config_format="SPL",
+        print_when_eval=True,
+        **kwargs
+    )
+
+
+def _has_counts(params):
+    return params.counting_unit in (
+        RougeParams.COUNT_TOKEN,
+        RougeParams.COUNT_TOKEN_WITH_RAW_COUNTS,
+    )
+
+
+def _run_perl(params):
+    """
+    :param params: RougeParams.
+    :return: the standard output of the perl script.
+    :raise subprocess.CalledProcessError: if the perl script fails.
+    """
+    return subprocess.run(
+        [PERL] + params.make_options(),
+        stdout=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    ).stdout
+
+
+def _scores_in_order(scores, count):
+    """
+    :param scores: a dict mapping each method to a dict mapping eval IDs to scores.
+    :param count: the number of evaluations, whose IDs are 1 to count.
+    :return: a dict mapping each method to the list of scores of the evaluations in order.
+    :raise ValueError: if an evaluation has no score.
+    """
+    scores_in_order = {}
+    for method, scores_by_id in scores.items():
+        try:
+            scores_in_order[method] = [
+                scores_by_id[str(eval_id)] for eval_id in range(1, count + 1)
+            ]
+        except KeyError as e:
+            raise ValueError("no %s score for evaluation %s" % (method, e))
+    return scores_in_order
+
+
+def parse_average_output(output):
+    """
+    Parse the averages printed by the perl script.
+
+    >>> output = '''
+    ... 1 ROUGE-1 Average_R: 0.62500 (95%-conf.int. 0.50000 - 0.75000)
+    ... 1 ROUGE-1 Average_P: 0.87500 (95%-conf.int. 0.75000 - 1.00000)
+    ... 1 ROUGE-1 Average_F: 0.70834 (95%-conf.int. 0.66667 - 0.75000)
+    ... '''
+    >>> parse_average_output(output)['ROUGE-1'].recall
+    ConfidenceInterval(mean=0.625, low=0.5, high=0.75)
+
+    :param output: the standard output of the perl script.
+    :return: a dict mapping each method to RougeScore of ConfidenceInterval,
+        or to RougeStats of the total counts with counting_unit 2.
+    """
+    averages = collections.defaultdict(dict)
+    for line in output.splitlines():
+        line = line.strip()
+        match = _AVERAGE_LINE.match(line)
+        if match is not None:
+            interval = ConfidenceInterval(
+                *(float(match.group(field)) for field in ConfidenceInterval._fields)
+            )
+            averages[match.group("method")][match.group("kind")] = interval
+            continue
+        match = _COUNT_LINE.match(line)
+        if match is not None:
+            averages[match.group("method")] = RougeStats(
+                hits=_parse_number(match.group("h")),
+                ref_total=_parse_number(match.group("m")),
+                cand_total=_parse_number(match.group("p")),
+            )
+    return {
+        method: RougeScore(*map(average.get, "RPF")) if isinstance(average, dict) else average
+        for method, average in averages.items()
+    }
+
+
+def _perl_order(count):
+    """
+    Return the indices of evaluations in the order the perl script resamples them,
+    which is that of their test IDs sorted as strings.
+
+    >>> _perl_order(11)
+    [0, 9, 10, 1, 2, 3, 4, 5, 6, 7, 8]
+    """
+    return sorted(range(count), key=lambda index: "%d.%s" % (index + 1, PEER_ID))
+
+
+def _round(value):
+    # The perl script prints the averages with "%7.5f".
+    return float("%.5f" % value)
+
+
+def _perl_sum(values):
+    """
+    Add up values along the last axis one by one, like the perl script. The pairwise
+    summation of numpy may differ from it in the last bit, and so in a rounded digit.
+
+    >>> values = np.full(16, 0.1)
+    >>> float(_perl_sum(values)) == sum(values.tolist())
+    True
+    """
+    return np.cumsum(values, axis=-1)[..., -1]
+
+
+def _perl_intervals(scores, counting_unit, alpha, confidence, num_resamples):
+    """
+    :param scores: a list of RougeScore, or RougeStats with counting_unit 1, in perl order.
+    :return: RougeScore of ConfidenceInterval, before rounding.
+    """
+    columns = np.array(scores, dtype=np.float64).T[:3]
+    sums = np.empty((len(columns), num_resamples))
+    for start, stop, indices in _iter_resample_indices(len(scores), num_resamples):
+        for column, column_sums in zip(columns, sums):
+            column_sums[start:stop] = _perl_sum(column[indices])
+    if counting_unit == RougeParams.COUNT_TOKEN:
+        resamples = scores_from_stats(RougeStats(*sums), alpha)
+    else:
+        resamples = sums / len(scores)
+    intervals = []
+    for values in resamples:
+        values = np.sort(values)
+        mean = float(_perl_sum(values)) / num_resamples
+        intervals.append(ConfidenceInterval(mean, *_percentile_interval(values, confidence)))
+    return RougeScore(*intervals)
+
+
+def perl_averages(scores, counting_unit=None, alpha=None, confidence=None, num_resamples=None):
+    """
+    Compute the averages the perl script reports from the scores of every evaluation,
+    like those of run_evals(). They are the means over the bootstrap resamples of the
+    perl script, which are drawn the same way, added up in the same order, and rounded alike.
+
+    They are exactly those of the perl script, since it rounds the score of each evaluation
+    to the 5 decimals printed with -d before averaging them. The exception is the weighted
+    counts of ROUGE-W with counting_unit 1, which it prints with 15 significant digits only.
+
+    >>> scores = [RougeScore(0.5, 1.0, 0.66667), RougeScore(0.75, 0.75, 0.75)]
+    >>> perl_averages(scores, num_resamples=10).recall
+    ConfidenceInterval(mean=0.6125, low=0.5, high=0.75)
+
+    :param scores: a list of RougeScore, or RougeStats with counting_unit 1 or 2.
+    :param counting_unit: see RougeParams.
+    :param alpha: weight on the recall. Default is DEFAULT_ALPHA.
+    :param confidence: the confidence level, in percent. Default is DEFAULT_CONFIDENCE.
+    :param num_resamples: Default is DEFAULT_NUM_RESAMPLES.
+    :return: RougeScore of ConfidenceInterval, or RougeStats of the total counts
+        with counting_unit 2.
+    :raise ValueError: if scores is empty.
+    """
+    if alpha is None:
+        alpha = DEFAULT_ALPHA
+    if confidence is None:
+        confidence = DEFAULT_CONFIDENCE
+    if num_resamples is None:
+        num_resamples = DEFAULT_NUM_RESAMPLES
+    if not scores:
+        raise ValueError("scores must not be empty")
+    scores = [scores[index] for index in _perl_order(len(scores))]
+
+    if counting_unit == RougeParams.COUNT_TOKEN_WITH_RAW_COUNTS:
+        return RougeStats(*(sum(column) for column in list(zip(*scores))[:3]))
+    intervals = _perl_intervals(scores, counting_unit, alpha, confidence, num_resamples)
+    return RougeScore(*(ConfidenceInterval(*map(_round, interval)) for interval in intervals))
+
+
+def split_config(config_file, shards):
+    """
+    Split a config file of config_format SPL or SIMPLE, with the peer and the models of an
+    evaluation per line, into config files of consecutive evaluations.
+
+    :param config_file: the path of the config file.
+    :param shards: the number of shards.
+    :return: a list of 2-tuples, the path of the config file of a shard and the number of
+        evaluations before it.
+    """
+    with open(config_file) as f:
+        # The perl script skips comments and blank lines.
+        lines = [line for line in f if not line.startswith("#") and line.strip()]
+    size = -(-len(lines) // shards) or 1
+    shard_configs = []
+    for start in range(0, len(lines), size):
+        path = "%s.%d" % (config_file, len(shard_configs))
+        with open(path, "w") as f:
+            f.writelines(lines[start : start + size])
+        shard_configs.append((path, start))
+    return shard_configs
+
+
+def run_evals_sharded(evals, shards=None, workers=None, **kwargs):
+    """
+    Like run_evals(), but split the evaluations into shards, run the perl script on the
+    shards concurrently, and merge the scores. The averages are computed from the scores
+    of all the evaluations by perl_averages(), and are those of a single run of the perl script.
+
+    The shards are run with few bootstrap resamples, since their averages are not used:
+    perl_averages() redraws the resamples of the perl script over all the evaluations, so the
+    means and the confidence intervals are its own, not only close to them.
+
+    :param evals: an iterable of (summary, references). See write_config().
+    :param shards: the number of shards. Default is workers.
+    :param workers: the number of perl processes at a time. Default is the number of CPUs.
+    :param kwargs: options of RougeParams, see run_evals().
+    :return: a 2-tuple. The scores of evals by method like those of run_evals(),
+        and the averages by method like those of perl_averages().
+    :raise subprocess.CalledProcessError: if the perl script fails.
+    :raise ValueError: if the output misses an evaluation, or there is no evaluation.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if shards is None:
+        shards = workers
+    shard_kwargs = dict(kwargs)
+    if kwargs.get("counting_unit") != RougeParams.COUNT_TOKEN_WITH_RAW_COUNTS:
+        shard_kwargs["resampling_points"] = _SHARD_RESAMPLES
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_file, count = write_config(directory, evals)
+        shard_configs = split_config(config_file, shards)
+        params = [_make_params(path, shard_kwargs) for path, _ in shard_configs]
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            outputs = list(executor.map(_run_perl, params))
+
+    counts = _has_counts(_make_params(config_file, kwargs))
+    scores = collections.defaultdict(dict)
+    for (_, offset), output in zip(shard_configs, outputs):
+        for method, scores_by_id in parse_eval_output(output, counts).items():
+            for eval_id, score in scores_by_id.items():
+                scores[method][str(int(eval_id) + offset)] = score
+    scores = _scores_in_order(scores, count)
+
+    averages = {
+        method: perl_averages(
+            method_scores,
+            counting_unit=kwargs.get("counting_unit"),
+            alpha=kwargs.get("alpha"),
+            confidence=kwargs.get("confidence_interval"),
+            num_resamples=kwargs.get("resampling_points"),
+        )
+        for method, method_scores in scores.items()
+    }
+    return scores, averages
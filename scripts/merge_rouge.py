@@ -0,0 +1,70 @@
+# MIT License
+#
+# Copyright (c) 2019 Cong Feng
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Merge the ROUGE accumulators of corpus shards into the system scores."""
+import argparse
+import json
+import logging
+import sys
+
+from rouge.accumulator import merge_accumulator_files
+from rouge.accumulator import save_accumulators
+
+logger = logging.getLogger(__name__)
+
+
+def make_report(accumulators, alpha=None):
+    """
+    :param accumulators: a dict of RougeAccumulator by metric.
+    :param alpha: weight on the recall.
+    :return: a dict of the number of pairs and the micro and macro scores by metric.
+    """
+    return {
+        name: {
+            'count': len(accumulator),
+            'micro': accumulator.micro_average(alpha)._asdict(),
+            'macro': accumulator.macro_average(alpha)._asdict(),
+        }
+        for name, accumulator in accumulators.items()
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('shards', nargs='+', help='accumulator files of the shards, in corpus order')
+    parser.add_argument('-o', '--output', help='report file. Default is stdout')
+    parser.add_argument('-a', '--alpha', help='weight factor for the recall in the F1-measure', type=float)
+    parser.add_argument('--merged', help='also save the merged accumulators to this file')
+    args = parser.parse_args()
+
+    logger.info('merging %d shards', len(args.shards))
+    accumulators = merge_accumulator_files(args.shards)
+    if args.merged:
+        save_accumulators(args.merged, accumulators)
+    report = make_report(accumulators, args.alpha)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
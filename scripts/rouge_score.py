@@ -29,6 +29,8 @@ from __future__ import unicode_literals
 import argparse
 from agenda.metric_helper import write_score
 from pathlib import Path
+import itertools
+import json
 import logging
 
 from rouge import *
@@ -36,21 +38,34 @@ from rouge import *
 logger = logging.getLogger(__name__)
 
 
+def _accumulate(stats):
+    accumulator = RougeAccumulator()
+    accumulator.update(stats)
+    return accumulator
+
+
 class MetricWrapper:
 
-    def __init__(self, name, sentence_score, summary_score, alpha, **kwargs):
+    def __init__(self, name, sentence_stats, summary_score, alpha, **kwargs):
         self.alpha = alpha
         self.name = name
-        self._sentence_score = sentence_score
+        self._sentence_stats = sentence_stats
         self._summary_score = summary_score
         self._kwargs = kwargs
 
-    def sentence_score(self, sum, ref):
-        return self._sentence_score(sum, ref, alpha=self.alpha, **self._kwargs).f1_measure
-
     def summary_score(self, sum, ref):
         return self._summary_score(sum, ref, alpha=self.alpha, **self._kwargs).f1_measure
 
+    def sentence_stats(self, summary, reference, cache=None):
+        if cache is None:
+            return [self._sentence_stats(s, r, **self._kwargs) for s, r in zip(summary, reference)]
+        # the stats don't depend on alpha, so it is left out of the cache key.
+        return cached_stats(cache, self.name, self._sentence_stats, zip(summary, reference), self._kwargs)
+
+    def sentence_scores(self, summary, reference, cache=None):
+        stats = self.sentence_stats(summary, reference, cache)
+        return [score_from_stats(s, alpha=self.alpha).f1_measure for s in stats]
+
     @property
     def params(self):
         # don't send empty dict.
@@ -59,9 +74,12 @@ class MetricWrapper:
     def output_file(self, dir: Path):
         return dir.joinpath(self.name).with_suffix('.json')
 
-    def eval(self, summary, reference, output_dir):
+    def eval(self, summary, reference, output_dir, cache=None, accumulators=None):
         logger.info('computing %s', self.name)
-        scores = [self.sentence_score(s, r) for s, r in zip(summary, reference)]
+        stats = self.sentence_stats(summary, reference, cache)
+        if accumulators is not None:
+            accumulators[self.name] = _accumulate(stats)
+        scores = [score_from_stats(s, alpha=self.alpha).f1_measure for s in stats]
         system = self.summary_score(summary, reference)
         write_score(
             name=self.name,
@@ -72,53 +90,158 @@ class MetricWrapper:
         )
 
 
-def _read_corpus(file):
-    def _break_into_words(line):
+class RougeNWrapper:
+    """
+    Compute ROUGE-N for all the requested n in one pass over the corpus.
+    Each n is written to its own output file, like a MetricWrapper.
+    """
+
+    def __init__(self, orders, alpha):
+        self.orders = orders
+        self.alpha = alpha
+
+    def output_file(self, dir: Path, n):
+        return dir.joinpath('rouge_n_%d' % n).with_suffix('.json')
+
+    def sentence_stats(self, summary, reference, cache=None):
         """
-        Turn a already-tokenized line into a list of words.
-        :param line: string, already tokenized. All tokens are separated by space.
-        :return: List[string], broken into words.
+        :return: a dict mapping each n to the list of RougeStats of the pairs.
         """
-        return line.strip().split(' ')
+        if cache is None:
+            stats = {n: [] for n in self.orders}
+            for s, r in zip(summary, reference):
+                for n, order_stats in rouge_n_multi_sentence_level_stats(s, r, self.orders).items():
+                    stats[n].append(order_stats)
+            return stats
+        # one pass over the pairs missing from the cache, like without it.
+        return cached_rouge_n_stats(cache, zip(summary, reference), self.orders)
+
+    def sentence_scores(self, summary, reference, cache=None):
+        return {
+            n: [score_from_stats(s, alpha=self.alpha).f1_measure for s in order_stats]
+            for n, order_stats in self.sentence_stats(summary, reference, cache).items()
+        }
+
+    def eval(self, summary, reference, output_dir, cache=None, accumulators=None):
+        logger.info('computing rouge_n for n in %s', self.orders)
+        stats = self.sentence_stats(summary, reference, cache)
+        system = rouge_n_multi_summary_level(summary, reference, self.orders, alpha=self.alpha)
+        for n in self.orders:
+            if accumulators is not None:
+                accumulators['rouge_n_%d' % n] = _accumulate(stats[n])
+            write_score(
+                name='rouge_n_%d' % n,
+                params={'n': n},
+                system=system[n].f1_measure,
+                output=self.output_file(output_dir, n),
+                scores=[score_from_stats(s, alpha=self.alpha).f1_measure for s in stats[n]]
+            )
 
+
+def _break_into_words(line):
+    """
+    Turn a already-tokenized line into a list of words.
+    :param line: string, already tokenized. All tokens are separated by space.
+    :return: List[string], broken into words.
+    """
+    return line.strip().split(' ')
+
+
+def _read_corpus(file):
     with open(file) as f:
         return [_break_into_words(line) for line in f.readlines()]
 
 
+def _missing_line(summary_file, reference_file, line_number, summary_ended):
+    shorter, longer = (summary_file, reference_file) if summary_ended else (reference_file, summary_file)
+    return ValueError('%s has no line %d, unlike %s' % (shorter, line_number, longer))
+
+
+def _read_pairs(summary_file, reference_file):
+    """
+    Read the summary and reference files in lockstep, one pair of lines at a time.
+    :return: an iterator of (summary, reference).
+    :raise ValueError: if a file has fewer lines than the other.
+    """
+    with open(summary_file) as summary, open(reference_file) as reference:
+        lines = itertools.zip_longest(summary, reference)
+        for line_number, (summary_line, reference_line) in enumerate(lines, 1):
+            if summary_line is None or reference_line is None:
+                raise _missing_line(summary_file, reference_file, line_number, summary_line is None)
+            yield _break_into_words(summary_line), _break_into_words(reference_line)
+
+
+class StreamingScoreWriter:
+    """
+    Write the sentence scores of a metric to its output file as they come.
+    The summary level score of "system" needs the whole corpus, so instead the stats
+    of the pairs are pooled online, and their score is written as "system_micro".
+    The file has the other fields of the one of write_score().
+    """
+
+    def __init__(self, name, params, output: Path, alpha):
+        self.alpha = alpha
+        self.count = 0
+        self.totals = [0, 0, 0]
+        self.weight = None
+        self._file = open(output, 'w')
+        self._file.write('{"name": %s, "params": %s, "scores": [' % (json.dumps(name), json.dumps(params)))
+
+    def write(self, stats):
+        if self.count:
+            self._file.write(', ')
+        self._file.write(json.dumps(score_from_stats(stats, alpha=self.alpha).f1_measure))
+        self.count += 1
+        self.totals = [total + value for total, value in zip(self.totals, stats)]
+        self.weight = stats.weight
+
+    @property
+    def system_micro(self):
+        return score_from_stats(RougeStats(*self.totals, self.weight), alpha=self.alpha).f1_measure
+
+    def close(self):
+        self._file.write('], "system_micro": %s}\n' % json.dumps(self.system_micro))
+        self._file.close()
+
+
 class Runner:
 
-    def __init__(self, summary_file, reference_file, output_dir):
+    def __init__(self, summary_file, reference_file, output_dir, cache=None, accumulator=None):
         logger.info('summary_file: %s', summary_file)
         logger.info('reference_file: %s', reference_file)
         logger.info('output_dir: %s', output_dir)
 
         self.summary = _read_corpus(summary_file)
         self.reference = _read_corpus(reference_file)
+        if len(self.summary) != len(self.reference):
+            line_number = min(len(self.summary), len(self.reference)) + 1
+            raise _missing_line(summary_file, reference_file, line_number, len(self.summary) < len(self.reference))
         self.output_dir = Path(output_dir)
+        self.cache = cache
+        self.accumulator = accumulator
 
     def eval_metric(self, args):
+        accumulators = {} if self.accumulator else None
         for wrapper in self.get_metrics(args):
             wrapper.eval(
                 summary=self.summary,
                 reference=self.reference,
                 output_dir=self.output_dir,
+                cache=self.cache,
+                accumulators=accumulators,
             )
+        if self.accumulator:
+            logger.info('saving the accumulators to %s', self.accumulator)
+            save_accumulators(self.accumulator, accumulators)
 
     def get_metrics(self, args):
         if args.rouge_n:
-            for n in args.rouge_n:
-                yield MetricWrapper(
-                    name='rouge_n_%d' % n,
-                    sentence_score=rouge_n_sentence_level,
-                    summary_score=rouge_n_summary_level,
-                    alpha=args.alpha,
-                    n=n,
-                )
+            yield RougeNWrapper(orders=args.rouge_n, alpha=args.alpha)
 
         if args.rouge_l:
             yield MetricWrapper(
                 name='rouge_l',
-                sentence_score=rouge_l_sentence_level,
+                sentence_stats=rouge_l_sentence_level_stats,
                 summary_score=rouge_l_summary_level,
                 alpha=args.alpha,
             )
@@ -126,13 +249,75 @@ class Runner:
         if args.rouge_w:
             yield MetricWrapper(
                 name='rouge_w',
-                sentence_score=rouge_w_sentence_level,
+                sentence_stats=rouge_w_sentence_level_stats,
                 summary_score=rouge_w_summary_level,
                 alpha=args.alpha,
                 weight=args.weight,
             )
 
 
+class StreamingRunner:
+    """
+    Score the corpus in bounded-size chunks without loading it in memory.
+    """
+
+    def __init__(self, summary_file, reference_file, output_dir, workers, chunksize, accumulator=None):
+        logger.info('summary_file: %s', summary_file)
+        logger.info('reference_file: %s', reference_file)
+        logger.info('output_dir: %s', output_dir)
+
+        self.summary_file = summary_file
+        self.reference_file = reference_file
+        self.output_dir = Path(output_dir)
+        self.workers = workers
+        self.chunksize = chunksize
+        self.accumulator = accumulator
+
+    def get_metrics(self, args):
+        """
+        :return: a dict mapping each metric name to its params.
+        """
+        metrics = {}
+        for n in args.rouge_n or ():
+            metrics['rouge_n_%d' % n] = {'n': n}
+        if args.rouge_l:
+            metrics['rouge_l'] = None
+        if args.rouge_w:
+            metrics['rouge_w'] = {'weight': args.weight}
+        return metrics
+
+    def eval_metric(self, args):
+        metrics = self.get_metrics(args)
+        logger.info('streaming %s', ', '.join(metrics))
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        writers = {
+            name: StreamingScoreWriter(
+                name, params, self.output_dir.joinpath(name).with_suffix('.json'), args.alpha)
+            for name, params in metrics.items()
+        }
+        # Unlike the writers, the accumulators keep the stats of every pair.
+        accumulators = {name: RougeAccumulator() for name in metrics} if self.accumulator else None
+        try:
+            pairs = _read_pairs(self.summary_file, self.reference_file)
+            for stats in iter_sentence_stats(
+                    pairs,
+                    metrics,
+                    workers=self.workers,
+                    chunksize=self.chunksize,
+                    weight=args.weight,
+            ):
+                for name, pair_stats in stats.items():
+                    writers[name].write(pair_stats)
+                    if accumulators is not None:
+                        accumulators[name].add(pair_stats)
+        finally:
+            for writer in writers.values():
+                writer.close()
+        if accumulators is not None:
+            logger.info('saving the accumulators to %s', self.accumulator)
+            save_accumulators(self.accumulator, accumulators)
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument("summary", help="a file of summaries, one sentence per line.")
@@ -145,7 +330,40 @@ if __name__ == '__main__':
     parser.add_argument('-N', dest='rouge_n', type=int, nargs='*', help='compute ROUGE-N for all specified n')
     parser.add_argument('-W', dest='rouge_w', action='store_true', help='compute ROUGE-W')
     parser.add_argument('-L', dest='rouge_l', action='store_true', help='compute ROUGE-L')
+
+    # Options for streaming:
+    parser.add_argument('--stream', action='store_true',
+                        help='score in constant memory. Instead of the summary level "system" score, '
+                             'the output has "system_micro", the score of the pooled sentence stats')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes for --stream')
+    parser.add_argument('--chunksize', type=int, help='number of sentence pairs per task for --stream')
+
+    # Options for caching:
+    parser.add_argument('--cache', help='a database of sentence stats reused across runs. The system score is not cached')
+    parser.add_argument('--cache_size', type=int, help='max number of sentence pairs kept in --cache')
+
+    # Options for sharding:
+    parser.add_argument('--accumulator',
+                        help='also save the stats of the sentence pairs to this file, to be merged with those of '
+                             'other shards by merge_rouge.py. It keeps the stats of every pair, even with --stream')
+
+    parser.add_argument('--engine', choices=['reference', 'fast', 'verify'],
+                        help='the DP kernels of ROUGE-L and ROUGE-W. verify checks a fraction of fast against reference')
     args = parser.parse_args()
+    engine = set_engine(args.engine)
+
+    if args.stream:
+        if args.cache:
+            parser.error('--cache is not supported with --stream')
+        runner = StreamingRunner(
+            args.summary, args.reference, args.output_dir, args.workers, args.chunksize, args.accumulator)
+        runner.eval_metric(args)
+    elif args.cache:
+        with StatsCache(args.cache, max_entries=args.cache_size) as cache:
+            Runner(args.summary, args.reference, args.output_dir, cache, args.accumulator).eval_metric(args)
+    else:
+        Runner(args.summary, args.reference, args.output_dir, accumulator=args.accumulator).eval_metric(args)
 
-    runner = Runner(args.summary, args.reference, args.output_dir)
-    runner.eval_metric(args)
+    if isinstance(engine, VerifyingEngine):
+        logger.info('verified %d calls, served %s, %d divergences',
+                    engine.verified, dict(engine.served), engine.diverged)
@@ -42,6 +42,7 @@ setup(
     packages=[
         "rouge",
         "rouge.tests",
+        "rouge.benchmarks",
     ],
     package_data={
         "rouge.tests": ["data/*"],
@@ -49,6 +50,7 @@ setup(
     scripts=[
         "scripts/example.py",
         "scripts/rouge_score.py",
+        "scripts/merge_rouge.py",
     ],
     classifiers=[
         "Intended Audience :: Science/Research",